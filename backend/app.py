@@ -1,10 +1,26 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
+import json
+import math
 import os
+import socket
+import threading
+import time
 
+from cache import TTLCache
 from scraper import VigoShopScraper
-from copy_generator import CopyGenerator
+from selector_stats import SelectorStats
+from copy_generator import MODEL_DOWNGRADES, CopyGenerator, normalize_markets
+from engagement import annotate, score_variants
+from resilience import CircuitBreaker, RetryPolicy
+from router import ModelRouter
+from scheduler import PriorityScheduler
+from limiter import AdaptiveLimiter
+from async_engine import AsyncGenerationEngine
+from pipeline import ScrapeGeneratePipeline
+from batch_generator import parse_products
+from jobs import JobQueue, JobWorker
 
 # Load environment variables
 load_dotenv()
@@ -26,8 +42,37 @@ CORS(app, resources={
     }
 })
 
+# Maximum number of URLs accepted by /scrape/batch
+MAX_BATCH_URLS = 500
+
+# Maximum number of variants accepted by /score
+MAX_SCORE_VARIANTS = 10000
+
+# Best-of-N limits for /generate
+BEST_OF_MAX_N = int(os.getenv('BEST_OF_MAX_N', 5))
+BEST_OF_TOKEN_BUDGET = int(os.getenv('BEST_OF_TOKEN_BUDGET', 20000))
+BEST_OF_CONCURRENCY = int(os.getenv('BEST_OF_CONCURRENCY', 6))
+
+# Maximum number of markets in one multi-market /generate request
+MAX_MARKETS = 10
+
+# Maximum number of products accepted by POST /jobs
+MAX_JOB_PRODUCTS = int(os.getenv('MAX_JOB_PRODUCTS', 100000))
+
+# Default latency budget of /generate; slower models are routed around
+GENERATION_LATENCY_BUDGET_MS = float(os.getenv('GENERATION_LATENCY_BUDGET_MS', 15000))
+
 # Initialize services
-scraper = VigoShopScraper()
+scraper = VigoShopScraper(
+    pool_size=int(os.getenv('SCRAPER_POOL_SIZE', 10)),
+    stream=os.getenv('SCRAPER_STREAM', 'true').lower() == 'true',
+    max_body_bytes=int(os.getenv('SCRAPER_MAX_BODY_BYTES', 2_000_000)),
+    selector_stats=SelectorStats(path=os.getenv('SELECTOR_STATS_PATH') or None),
+    cache=TTLCache(
+        ttl=float(os.getenv('SCRAPE_CACHE_TTL', 600)),
+        max_size=int(os.getenv('SCRAPE_CACHE_SIZE', 1000))
+    )
+)
 copy_generator_error = None
 
 # Debug: Check anthropic version
@@ -38,8 +83,39 @@ try:
 except Exception as e:
     anthropic_version = f"Error: {e}"
 
+# Interactive /generate traffic always goes ahead of queued pipeline and job
+# work; the AIMD limiter moves the concurrency limit with the upstream rate limits
+generation_scheduler = PriorityScheduler(
+    max_concurrency=int(os.getenv('SCHEDULER_MAX_CONCURRENCY', 16)),
+    max_tokens=int(os.getenv('SCHEDULER_MAX_TOKENS', 200000))
+)
+adaptive_limiter = None
+if os.getenv('ADAPTIVE_CONCURRENCY', 'true').lower() == 'true':
+    adaptive_limiter = AdaptiveLimiter(
+        generation_scheduler,
+        min_concurrency=int(os.getenv('ADAPTIVE_MIN_CONCURRENCY', 1)),
+        max_concurrency=int(os.getenv('ADAPTIVE_MAX_CONCURRENCY', 64))
+    )
+
 try:
-    copy_generator = CopyGenerator()
+    copy_generator = CopyGenerator(
+        cache=TTLCache(
+            ttl=float(os.getenv('GENERATION_CACHE_TTL', 300)),
+            max_size=int(os.getenv('GENERATION_CACHE_SIZE', 500))
+        ),
+        deadline=float(os.getenv('GENERATION_TIMEOUT', 60)),
+        retry_policy=RetryPolicy(max_attempts=int(os.getenv('GENERATION_MAX_ATTEMPTS', 3))),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5)),
+            reset_timeout=float(os.getenv('BREAKER_RESET_TIMEOUT', 30))
+        ),
+        router=ModelRouter(
+            downgrades=MODEL_DOWNGRADES,
+            window_seconds=float(os.getenv('ROUTER_WINDOW_SECONDS', 300))
+        ),
+        scheduler=generation_scheduler,
+        limiter=adaptive_limiter
+    )
 except Exception as e:
     import traceback
     copy_generator_error = f"{str(e)} | anthropic_version={anthropic_version}"
@@ -48,6 +124,43 @@ except Exception as e:
     print(traceback.format_exc())
     copy_generator = None
 
+# Async engine: keeps many Claude calls in flight from one process (used by
+# /generate when GENERATION_ENGINE=async, and by bulk jobs)
+generation_engine = None
+if copy_generator:
+    generation_engine = AsyncGenerationEngine(
+        copy_generator,
+        max_concurrency=int(os.getenv('GENERATION_MAX_CONCURRENCY', 20)),
+        timeout=float(os.getenv('GENERATION_TIMEOUT', 60)),
+        hedge_percentile=float(os.getenv('GENERATION_HEDGE_PERCENTILE', 0.9)),
+        hedge_delay=float(os.getenv('GENERATION_HEDGE_DELAY', 4.0))
+    )
+use_async_engine = os.getenv('GENERATION_ENGINE', 'sync').lower() == 'async'
+
+# Background catalog jobs; rows are processed by `python jobs.py worker`, or
+# by JOBS_WORKERS threads in this process so they share the scheduler. The
+# database is only created once a job is submitted or a worker starts.
+job_queue = JobQueue(os.getenv('JOBS_DB_PATH', 'jobs.db'))
+if copy_generator:
+    for worker_number in range(int(os.getenv('JOBS_WORKERS', 0))):
+        job_worker = JobWorker(job_queue, copy_generator, worker_id=f'{socket.gethostname()}-{os.getpid()}-{worker_number}')
+        threading.Thread(target=job_worker.run, daemon=True).start()
+
+# Scrape -> generate pipeline behind /pipeline
+pipeline = None
+if copy_generator:
+    pipeline = ScrapeGeneratePipeline(
+        scraper,
+        copy_generator,
+        scrape_workers=int(os.getenv('PIPELINE_SCRAPE_WORKERS', 4)),
+        generate_workers=int(os.getenv('PIPELINE_GENERATE_WORKERS', 4)),
+        queue_size=int(os.getenv('PIPELINE_QUEUE_SIZE', 8))
+    )
+
+def sse_event(event: str, payload) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -64,7 +177,14 @@ def health_check():
             'anthropic_env_var_exists': anthropic_key_exists,
             'copy_generator_exists': copy_generator is not None,
             'initialization_error': copy_generator_error
-        }
+        },
+        'scrape_cache': scraper.cache.stats() if scraper.cache else None,
+        'generation_cache': copy_generator.cache.stats() if copy_generator and copy_generator.cache else None,
+        'generation_engine': generation_engine.stats() if generation_engine else None,
+        'circuit_breaker': copy_generator.breaker.stats() if copy_generator else None,
+        'model_router': copy_generator.router.stats() if copy_generator and copy_generator.router else None,
+        'scheduler': generation_scheduler.stats(),
+        'adaptive_limiter': adaptive_limiter.stats() if adaptive_limiter else None
     })
 
 @app.route('/scrape', methods=['POST'])
@@ -120,6 +240,95 @@ def scrape_product():
             'error': f'Failed to scrape product: {str(e)}'
         }), 500
 
+@app.route('/scrape/batch', methods=['POST'])
+def scrape_batch():
+    """
+    Scrape many vigoshop.si product URLs concurrently
+
+    Request body:
+    {
+        "urls": ["https://vigoshop.si/izdelek/product-1/", "..."]
+    }
+
+    Returns:
+    {
+        "success": true,
+        "data": {
+            "results": [
+                {"url": "...", "success": true, "data": { ... }, "timing_ms": { ... }},
+                {"url": "...", "success": false, "error": "...", "timing_ms": { ... }}
+            ],
+            "succeeded": 1,
+            "failed": 1,
+            "elapsed_ms": 1234.5
+        }
+    }
+    """
+    try:
+        data = request.get_json()
+        urls = data.get('urls')
+
+        if not urls or not isinstance(urls, list):
+            return jsonify({
+                'success': False,
+                'error': 'A non-empty list of URLs is required'
+            }), 400
+
+        if len(urls) > MAX_BATCH_URLS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_BATCH_URLS} URLs can be scraped in one batch'
+            }), 400
+
+        batch_result = scraper.scrape_batch(
+            [str(url) for url in urls],
+            max_workers=int(os.getenv('SCRAPER_BATCH_WORKERS', 16)),
+            per_host_limit=int(os.getenv('SCRAPER_BATCH_PER_HOST', 8))
+        )
+
+        return jsonify({
+            'success': True,
+            'data': batch_result
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to scrape batch: {str(e)}'
+        }), 500
+
+@app.route('/stats/selectors', methods=['GET'])
+def selector_stats():
+    """
+    Per-selector hit statistics of the scraper
+
+    Returns:
+    {
+        "success": true,
+        "data": {
+            "name": {
+                "extractions": 120,
+                "found_rate": 1.0,
+                "selectors": [
+                    {"selector": "h1.product_title", "attempts": 120, "hits": 118, "hit_rate": 0.983},
+                    ...
+                ]
+            },
+            ...
+        }
+    }
+    """
+    if not scraper.selector_stats:
+        return jsonify({
+            'success': False,
+            'error': 'Selector statistics are disabled'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': scraper.selector_stats.snapshot()
+    })
+
 @app.route('/generate', methods=['POST'])
 def generate_copy():
     """
@@ -132,7 +341,15 @@ def generate_copy():
         "features": "Feature 1 | Feature 2 | Feature 3",
         "market": "SI",
         "objective": "Conversion",
-        "description": "Optional full description"
+        "description": "Optional full description",
+        "force_refresh": false,
+        "stream": false,
+        "parallel": false,
+        "hedge": false,
+        "latency_budget_ms": 15000,
+        "best_of": 1,
+        "target_score": 90,
+        "markets": ["SI", "DE", "IT"]
     }
 
     Returns:
@@ -142,8 +359,36 @@ def generate_copy():
             "variant_1": { ... },
             "variant_2": { ... },
             "variant_3": { ... }
+        },
+        "meta": {
+            "model": "claude-haiku-4-5-20251001",
+            "cache": "hit",
+            "fallback": false,
+            "latency_ms": 0.4
         }
     }
+
+    With "stream": true the response is a text/event-stream instead: one
+    "variant" event ({"key": "variant_1", "variant": { ... }}) per variant as
+    soon as Claude has finished it, followed by a "done" event with the meta.
+
+    With "parallel": true each variant is generated by its own concurrent
+    call; "hedge": true additionally duplicates calls that run slower than
+    the recent latency percentile (GENERATION_HEDGE_PERCENTILE).
+
+    With "best_of": N (2..BEST_OF_MAX_N) up to N candidates per angle are
+    sampled concurrently and the highest engagement score wins. Sampling of
+    an angle stops early at target_score, and no new candidates start once
+    the token budget (BEST_OF_TOKEN_BUDGET) is spent.
+
+    If the requested model's recent p95 latency would exceed latency_budget_ms
+    (or it is failing), a faster model serves the request; meta.model is the
+    model actually used and meta.requested_model the one asked for.
+
+    With "markets": [...] (instead of "market") all markets are generated
+    concurrently and data is keyed by market ({"SI": {"variant_1": ...}, ...}).
+    A failing market falls back to the template on its own; meta.markets
+    holds each market's meta and meta.fallback_markets the ones that fell back.
     """
     try:
         if not copy_generator:
@@ -154,8 +399,55 @@ def generate_copy():
 
         data = request.get_json()
 
+        try:
+            best_of = int(data.get('best_of') or 1)
+            target_score = int(data.get('target_score', 90))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'best_of and target_score must be whole numbers'
+            }), 400
+        if not 1 <= best_of <= BEST_OF_MAX_N:
+            return jsonify({
+                'success': False,
+                'error': f'best_of must be between 1 and {BEST_OF_MAX_N}'
+            }), 400
+
+        try:
+            latency_budget_ms = float(data.get('latency_budget_ms') or GENERATION_LATENCY_BUDGET_MS)
+            max_chars = int(data.get('max_chars', 150))  # Default to 150 characters
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'latency_budget_ms must be a number and max_chars a whole number'
+            }), 400
+        if not math.isfinite(latency_budget_ms) or latency_budget_ms <= 0 or max_chars < 1:
+            return jsonify({
+                'success': False,
+                'error': 'latency_budget_ms and max_chars must be positive'
+            }), 400
+
+        markets = data.get('markets')
+        if markets is not None:
+            if not isinstance(markets, list) or not all(isinstance(m, str) and m.strip() for m in markets):
+                return jsonify({
+                    'success': False,
+                    'error': 'markets must be a non-empty list of market codes'
+                }), 400
+            markets = list(dict.fromkeys(m.strip().upper() for m in markets))
+            if not markets or len(markets) > MAX_MARKETS:
+                return jsonify({
+                    'success': False,
+                    'error': f'Between 1 and {MAX_MARKETS} markets can be generated in one request'
+                }), 400
+            if data.get('stream') or best_of > 1:
+                return jsonify({
+                    'success': False,
+                    'error': 'markets cannot be combined with stream or best_of'
+                }), 400
+
         # Validate required fields
-        required_fields = ['product_name', 'price', 'features', 'market', 'objective']
+        required_fields = ['product_name', 'price', 'features', 'objective'] + ([] if markets else ['market'])
         missing_fields = [field for field in required_fields if not data.get(field)]
 
         if missing_fields:
@@ -164,22 +456,69 @@ def generate_copy():
                 'error': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
 
-        # Generate copy
-        variants = copy_generator.generate_ad_copy(
+        generation_args = dict(
             product_name=data['product_name'],
             price=data['price'],
             features=data['features'],
-            market=data['market'],
             objective=data['objective'],
             description=data.get('description', ''),
             style_prompt=data.get('style_prompt', ''),  # Optional style customization
             model=data.get('model', 'claude-haiku'),  # Default to Claude Haiku 4.5
-            max_chars=data.get('max_chars', 150)  # Default to 150 characters
+            max_chars=max_chars,
+            force_refresh=bool(data.get('force_refresh', False)),
+            latency_budget_ms=latency_budget_ms
         )
 
+        if markets:
+            if use_async_engine:
+                results, meta = generation_engine.generate_multi_market_sync(markets, **generation_args)
+            else:
+                results, meta = copy_generator.generate_multi_market(markets, **generation_args)
+
+            return jsonify({
+                'success': True,
+                'data': {market: annotate(variants) for market, variants in results.items()},
+                'meta': meta
+            })
+
+        generation_args['market'] = data['market']
+
+        if data.get('stream'):
+            def scored_events():
+                for event, payload in copy_generator.stream_ad_copy(**generation_args):
+                    if event == 'variant':
+                        payload['variant']['engagement_score'] = score_variants([payload['variant']])[0]
+                    yield sse_event(event, payload)
+
+            return Response(
+                stream_with_context(scored_events()),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
+        # Generate copy
+        if best_of > 1 and generation_engine:
+            generation_args.pop('force_refresh')
+            variants, meta = generation_engine.generate_best_of_sync(
+                n=best_of,
+                target_score=target_score,
+                token_budget=BEST_OF_TOKEN_BUDGET,
+                concurrency=BEST_OF_CONCURRENCY,
+                **generation_args
+            )
+        elif data.get('parallel') and generation_engine:
+            variants, meta = generation_engine.generate_parallel_sync(
+                hedge=bool(data.get('hedge', False)), **generation_args
+            )
+        elif use_async_engine:
+            variants, meta = generation_engine.generate_sync(**generation_args)
+        else:
+            variants, meta = copy_generator.generate_ad_copy_with_meta(**generation_args)
+
         return jsonify({
             'success': True,
-            'data': variants
+            'data': annotate(variants),
+            'meta': meta
         })
 
     except Exception as e:
@@ -188,6 +527,265 @@ def generate_copy():
             'error': f'Failed to generate copy: {str(e)}'
         }), 500
 
+@app.route('/pipeline', methods=['POST'])
+def run_pipeline():
+    """
+    Scrape vigoshop.si product URLs and generate ad copy for each in one call
+
+    Request body:
+    {
+        "urls": ["https://vigoshop.si/izdelek/product-1/", "..."],  (or "url": "...")
+        "market": "SI",
+        "objective": "Conversion",
+        "style_prompt": "",
+        "model": "claude-haiku",
+        "max_chars": 150,
+        "latency_budget_ms": 15000
+    }
+
+    Returns an application/x-ndjson stream with one line per URL, in
+    completion order, as soon as its copy is ready:
+    {"index": 0, "url": "...", "success": true, "product": { ... },
+     "data": {"variant_1": { ... }, ...}, "meta": { ... },
+     "timing_ms": {"scrape": 812.3, "queued": 0.1, "generate": 4210.5}}
+    Failed URLs carry "success": false, the failing "stage" and "error".
+    A final line {"done": true, "succeeded": N, "failed": M, "elapsed_ms": ...}
+    ends the stream.
+    """
+    if not pipeline:
+        return jsonify({
+            'success': False,
+            'error': 'Claude API not configured. Please set ANTHROPIC_API_KEY environment variable.'
+        }), 500
+
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'A JSON object request body is required'
+            }), 400
+
+        urls = data.get('urls') or ([data['url']] if data.get('url') else None)
+
+        if not urls or not isinstance(urls, list):
+            return jsonify({
+                'success': False,
+                'error': 'A URL or a non-empty list of URLs is required'
+            }), 400
+
+        if len(urls) > MAX_BATCH_URLS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_BATCH_URLS} URLs can be processed in one pipeline call'
+            }), 400
+
+        generation_args = dict(
+            market=data.get('market', 'SI'),
+            objective=data.get('objective', 'Conversion'),
+            style_prompt=data.get('style_prompt', ''),
+            model=data.get('model', 'claude-haiku'),
+            max_chars=data.get('max_chars', 150),
+            latency_budget_ms=float(data.get('latency_budget_ms') or GENERATION_LATENCY_BUDGET_MS)
+        )
+
+        def lines():
+            started = time.perf_counter()
+            succeeded = failed = 0
+            for result in pipeline.run([str(url) for url in urls], **generation_args):
+                if result['success']:
+                    annotate(result['data'])
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+            yield json.dumps({
+                'done': True,
+                'succeeded': succeeded,
+                'failed': failed,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+            }) + '\n'
+
+        return Response(
+            stream_with_context(lines()),
+            mimetype='application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to start pipeline: {str(e)}'
+        }), 500
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Enqueue a catalog generation job
+
+    Request: multipart/form-data with a "file" (CSV with header row, or
+    NDJSON) and optional form fields "markets" (comma-separated),
+    "objective", "style_prompt", "model" and "max_chars"; or a JSON body
+    {"products": [...], "markets": [...], "objective": ..., ...}.
+    Products have product_name, price, features and optionally description,
+    objective, style_prompt and market.
+
+    Returns (202):
+    {
+        "success": true,
+        "data": {"id": "...", "status": "queued", "total": 120, "rows": { ... }, ...}
+    }
+    """
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            text = upload.read().decode('utf-8-sig')
+            products = parse_products(text.splitlines(), (upload.filename or '').lower().endswith('.csv'))
+            fields = request.form
+            markets = [m.strip() for m in fields.get('markets', '').split(',') if m.strip()]
+            source = upload.filename
+        else:
+            fields = request.get_json(silent=True)
+            fields = fields if isinstance(fields, dict) else {}
+            products = fields.get('products')
+            markets = fields.get('markets') or []
+            source = None
+
+        if not products or not isinstance(products, list):
+            return jsonify({
+                'success': False,
+                'error': 'A CSV/NDJSON file or a non-empty products list is required'
+            }), 400
+
+        if not all(isinstance(product, dict) for product in products):
+            return jsonify({
+                'success': False,
+                'error': 'Every product must be a JSON object'
+            }), 400
+
+        if len(products) > MAX_JOB_PRODUCTS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_JOB_PRODUCTS} products can be submitted in one job'
+            }), 400
+
+        if not isinstance(markets, list) or not all(isinstance(market, str) for market in markets):
+            return jsonify({
+                'success': False,
+                'error': 'markets must be a list of market codes'
+            }), 400
+        try:
+            markets = normalize_markets(markets)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        options = {key: fields[key] for key in ('objective', 'style_prompt', 'model') if fields.get(key)}
+        if fields.get('max_chars'):
+            options['max_chars'] = int(fields['max_chars'])
+
+        job_id = job_queue.create_job(products, markets=markets or None, options=options, source=source)
+        return jsonify({
+            'success': True,
+            'data': job_queue.status(job_id)
+        }), 202
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid upload: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to create job: {str(e)}'
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Progress of a job: row counts by status, progress and finish time"""
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'data': status})
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """
+    Download the finished rows of a job as NDJSON (one line per product and market)
+
+    Can be called while the job is still running; only finished rows are included.
+    """
+    if job_queue.status(job_id) is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    def lines():
+        for line in job_queue.results(job_id):
+            yield json.dumps(line, ensure_ascii=False) + '\n'
+
+    return Response(
+        stream_with_context(lines()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{job_id}.jsonl"'}
+    )
+
+@app.route('/score', methods=['POST'])
+def score():
+    """
+    Engagement scores (0-100) for ad copy variants
+
+    Request body:
+    {
+        "variants": [
+            {"hook": "...", "body": "...", "cta": "...", "character_count": 142},
+            ...
+        ]
+    }
+
+    Returns:
+    {
+        "success": true,
+        "data": {
+            "scores": [78, 85, ...]
+        }
+    }
+    """
+    try:
+        data = request.get_json()
+        variants = data.get('variants')
+
+        if not variants or not isinstance(variants, list) or not all(isinstance(v, dict) for v in variants):
+            return jsonify({
+                'success': False,
+                'error': 'A non-empty list of variant objects is required'
+            }), 400
+
+        if len(variants) > MAX_SCORE_VARIANTS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_SCORE_VARIANTS} variants can be scored in one request'
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'scores': score_variants(variants)
+            }
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to score variants: {str(e)}'
+        }), 500
+
 @app.route('/examples', methods=['GET'])
 def get_examples():
     """
@@ -0,0 +1,568 @@
+import asyncio
+import copy
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from anthropic import AsyncAnthropic
+
+from copy_generator import (
+    VARIANT_ANGLES, VARIANT_MAX_TOKENS, CopyGenerator, estimate_tokens, generation_cache_key, missing_variants,
+    multi_market_meta, sum_usage, total_tokens, usage_meta
+)
+from engagement import score_variant
+from resilience import CircuitOpenError, Deadline, DeadlineExceeded
+from scheduler import PRIORITY, use_priority
+
+
+class AsyncGenerationEngine:
+    """
+    Async generation path built on the AsyncAnthropic client
+
+    Keeps many Claude calls in flight from a single process: calls are
+    bounded by a concurrency semaphore and a per-call timeout. The engine
+    owns an event loop running in a background thread, so it can be used
+    from synchronous code (Flask request threads, bulk scripts) via run()
+    and the *_sync helpers. Prompt building, parsing, caching and the
+    template fallback are shared with CopyGenerator.
+    """
+
+    def __init__(
+        self,
+        generator: CopyGenerator,
+        max_concurrency: int = 20,
+        timeout: float = 60.0,
+        hedge_percentile: float = 0.9,
+        hedge_delay: float = 4.0,
+        hedge_min_samples: int = 20
+    ):
+        """
+        Args:
+            generator: CopyGenerator providing prompts, parsing, cache and fallback
+            max_concurrency: Maximum number of Claude calls in flight
+            timeout: Default per-call timeout in seconds
+            hedge_percentile: A hedged single-variant call gets a duplicate once it
+                runs longer than this percentile of recent call latencies
+            hedge_delay: Hedge delay in seconds until hedge_min_samples latencies are known
+            hedge_min_samples: Latency samples needed before the percentile is used
+        """
+        self.generator = generator
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.client = None
+        self.in_flight = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._angle_latencies = deque(maxlen=500)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='generation-engine', daemon=True)
+        self._thread.start()
+        self._semaphore = None
+        self.run(self._setup())
+
+    async def _setup(self):
+        # Client and semaphore must be created on the engine's own loop
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.generator.anthropic_key:
+            self.client = AsyncAnthropic(api_key=self.generator.anthropic_key, max_retries=0)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the engine's loop and wait for its result (thread-safe)
+
+        The coroutine keeps the caller's traffic class (scheduler.use_priority).
+        """
+        return asyncio.run_coroutine_threadsafe(_in_priority(coro, PRIORITY.get()), self._loop).result(timeout)
+
+    async def generate(
+        self,
+        product_name: str,
+        price: str,
+        features: str,
+        market: str,
+        objective: str,
+        description: str = "",
+        style_prompt: str = "",
+        model: str = "fast",
+        max_chars: int = 150,
+        force_refresh: bool = False,
+        timeout: Optional[float] = None,
+        latency_budget_ms: Optional[float] = None
+    ) -> Tuple[Dict, Dict]:
+        """
+        Generate 3 ad copy variants without blocking the event loop
+
+        Takes the same arguments as CopyGenerator.generate_ad_copy_with_meta,
+        plus an optional timeout for the whole call (retries included).
+
+        Returns:
+            (variants, meta)
+        """
+        started = time.perf_counter()
+        selected_model, meta = self.generator.route_model(model, latency_budget_ms)
+
+        async def generate() -> Dict:
+            if not self.client:
+                raise ValueError("Anthropic API key not configured")
+
+            prompt_args = (product_name, price, features, market, objective, description, style_prompt, max_chars)
+            prompt = self.generator._build_prompt(*prompt_args)
+            deadline = Deadline(timeout if timeout is not None else self.timeout)
+            message = await self._create_recorded(
+                self.generator._message_params(market, prompt, selected_model), deadline.remaining()
+            )
+            variants = self.generator._parse_response(message.content[0].text, max_chars)
+            usages = [usage_meta(message.usage)]
+
+            # Ask only for the variants a broken or truncated answer lacks
+            missing = missing_variants(variants)
+            if missing:
+                message = await self._create_recorded(
+                    self.generator._follow_up_params(prompt_args, selected_model, missing), deadline.remaining()
+                )
+                usages.append(usage_meta(message.usage))
+                variants = self.generator._merge_follow_up(variants, message.content[0].text, missing, max_chars)
+                meta['follow_up'] = missing
+            meta['usage'] = sum_usage(usages)
+            return variants
+
+        try:
+            cache = self.generator.cache
+            if cache is None:
+                variants = await generate()
+            else:
+                key = generation_cache_key(
+                    product_name, price, features, market, objective, description,
+                    style_prompt, selected_model, max_chars
+                )
+                # Single-flight: concurrent requests for the same copy share one call
+                variants, meta['cache'] = await cache.get_or_load_async(key, generate, refresh=force_refresh)
+                variants = copy.deepcopy(variants)
+
+        except Exception as e:
+            print(f"Error generating copy: {str(e)}")
+            variants = self.generator._generate_template_copy(
+                product_name, price, features, market, objective, max_chars
+            )
+            meta['fallback'] = True
+            if isinstance(e, CircuitOpenError):
+                meta['circuit_open'] = True
+
+        meta['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return variants, meta
+
+    async def generate_parallel(
+        self,
+        product_name: str,
+        price: str,
+        features: str,
+        market: str,
+        objective: str,
+        description: str = "",
+        style_prompt: str = "",
+        model: str = "fast",
+        max_chars: int = 150,
+        force_refresh: bool = False,
+        timeout: Optional[float] = None,
+        latency_budget_ms: Optional[float] = None,
+        hedge: bool = False
+    ) -> Tuple[Dict, Dict]:
+        """
+        Generate the 3 variants with one concurrent Claude call per angle
+
+        Latency is that of the slowest single-variant call instead of one call
+        writing all three. With hedge=True a call still running after the
+        hedge threshold (see hedge_threshold()) is duplicated and whichever
+        answer arrives first wins. Angles that fail are filled in from the
+        template. Takes the same arguments as generate(). The cache is read
+        and filled, but not single-flight: a result with template angles is
+        returned yet must not be cached, which a loader cannot express.
+
+        Returns:
+            (variants, meta) in the same shape as generate()
+        """
+        started = time.perf_counter()
+        selected_model, meta = self.generator.route_model(model, latency_budget_ms)
+        meta.update(mode='parallel', hedged=0)
+        cache = self.generator.cache
+
+        key = None
+        if cache is not None:
+            key = generation_cache_key(
+                product_name, price, features, market, objective, description,
+                style_prompt, selected_model, max_chars
+            )
+            cached = None if force_refresh else cache.get(key)
+            meta['cache'] = 'refresh' if force_refresh else ('hit' if cached is not None else 'miss')
+            if cached is not None:
+                meta['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                return copy.deepcopy(cached), meta
+
+        prompt_args = (product_name, price, features, market, objective, description, style_prompt, max_chars)
+        outcomes = await asyncio.gather(
+            *(self._generate_angle(variant_key, prompt_args, selected_model, timeout, hedge)
+              for variant_key in VARIANT_ANGLES),
+            return_exceptions=True
+        )
+
+        variants = {}
+        usages = []
+        template = None
+        for variant_key, outcome in zip(VARIANT_ANGLES, outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"Error generating {variant_key}: {str(outcome)}")
+                if template is None:
+                    template = self.generator._generate_template_copy(
+                        product_name, price, features, market, objective, max_chars
+                    )
+                variants[variant_key] = template[variant_key]
+                meta['fallback'] = True
+                if isinstance(outcome, CircuitOpenError):
+                    meta['circuit_open'] = True
+            else:
+                variants[variant_key], usage, hedged = outcome
+                usages.append(usage)
+                meta['hedged'] += int(hedged)
+
+        meta['usage'] = sum_usage(usages)
+        if key is not None and not meta['fallback']:
+            cache.set(key, copy.deepcopy(variants), load_seconds=time.perf_counter() - started)
+
+        meta['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return variants, meta
+
+    async def generate_best_of(
+        self,
+        product_name: str,
+        price: str,
+        features: str,
+        market: str,
+        objective: str,
+        description: str = "",
+        style_prompt: str = "",
+        model: str = "fast",
+        max_chars: int = 150,
+        n: int = 3,
+        target_score: int = 90,
+        token_budget: int = 20000,
+        timeout: Optional[float] = None,
+        concurrency: int = 6,
+        latency_budget_ms: Optional[float] = None
+    ) -> Tuple[Dict, Dict]:
+        """
+        Sample up to n candidates per angle and keep the best-scoring one each
+
+        Candidates are single-variant calls, at most `concurrency` of them in
+        flight for this request. An angle stops sampling (and its running
+        calls are cancelled) as soon as a candidate reaches target_score. Once
+        token_budget tokens have been used no new candidate is started and the
+        running ones are cancelled, as is everything still running when the
+        timeout expires. Angles
+        without any candidate fall back to the template. The result cache is
+        not used.
+
+        Returns:
+            (variants, meta) in the same shape as generate(); meta reports the
+            number of candidates, tokens used and why sampling stopped
+        """
+        started = time.perf_counter()
+        selected_model, meta = self.generator.route_model(model, latency_budget_ms)
+        meta.update(mode='best_of', cache='bypass', n=n, candidates=0, tokens_used=0, stopped=None)
+
+        prompt_args = (product_name, price, features, market, objective, description, style_prompt, max_chars)
+        deadline = Deadline(timeout if timeout is not None else self.timeout)
+        slots = asyncio.Semaphore(concurrency)
+        best = {}  # variant_key -> (score, variant)
+        satisfied = set()
+        tasks = {variant_key: [] for variant_key in VARIANT_ANGLES}
+        usages = []
+
+        async def candidate(variant_key: str):
+            async with slots:
+                if variant_key in satisfied:
+                    return
+                if meta['tokens_used'] >= token_budget:
+                    meta['stopped'] = meta['stopped'] or 'token_budget'
+                    return
+                meta['candidates'] += 1
+                variant, usage, _ = await self._generate_angle(
+                    variant_key, prompt_args, selected_model, deadline.remaining(), hedge=False
+                )
+
+            usages.append(usage)
+            if usage:
+                meta['tokens_used'] += (usage.get('input_tokens') or 0) + (usage.get('output_tokens') or 0)
+            if meta['tokens_used'] >= token_budget:
+                # Budget spent: candidates still running would only overshoot it
+                meta['stopped'] = meta['stopped'] or 'token_budget'
+                for task in pending:
+                    if task is not asyncio.current_task():
+                        task.cancel()
+
+            score = score_variant(variant)
+            if variant_key not in best or score > best[variant_key][0]:
+                best[variant_key] = (score, variant)
+            if score >= target_score and variant_key not in satisfied:
+                satisfied.add(variant_key)
+                for task in tasks[variant_key]:
+                    if task is not asyncio.current_task():
+                        task.cancel()
+
+        # Round-robin over the angles so a tight budget is shared between them
+        pending = []
+        for _ in range(n):
+            for variant_key in VARIANT_ANGLES:
+                task = asyncio.ensure_future(candidate(variant_key))
+                tasks[variant_key].append(task)
+                pending.append(task)
+
+        try:
+            done, still_running = await asyncio.wait(pending, timeout=deadline.remaining())
+        except asyncio.CancelledError:
+            # The request itself was cancelled: its candidates go with it
+            for task in pending:
+                task.cancel()
+            raise
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            meta['stopped'] = 'time_budget'
+        elif len(satisfied) == len(VARIANT_ANGLES):
+            meta['stopped'] = 'target'
+
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                print(f"Error generating candidate: {str(task.exception())}")
+                if isinstance(task.exception(), CircuitOpenError):
+                    meta['circuit_open'] = True
+
+        variants = {}
+        template = None
+        for variant_key in VARIANT_ANGLES:
+            if variant_key in best:
+                variants[variant_key] = best[variant_key][1]
+                continue
+            if template is None:
+                template = self.generator._generate_template_copy(
+                    product_name, price, features, market, objective, max_chars
+                )
+            variants[variant_key] = template[variant_key]
+            meta['fallback'] = True
+
+        meta['best_scores'] = {variant_key: best[variant_key][0] for variant_key in VARIANT_ANGLES if variant_key in best}
+        meta['usage'] = sum_usage(usages)
+        meta['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return variants, meta
+
+    async def _generate_angle(
+        self,
+        variant_key: str,
+        prompt_args: Tuple,
+        selected_model: str,
+        timeout: Optional[float],
+        hedge: bool
+    ) -> Tuple[Dict, Optional[Dict], bool]:
+        """One single-variant call; returns (variant, usage, hedged)"""
+        if not self.client:
+            raise ValueError("Anthropic API key not configured")
+
+        prompt = self.generator._build_prompt(*prompt_args, variant_keys=[variant_key])
+        params = self.generator._message_params(prompt_args[3], prompt, selected_model, max_tokens=VARIANT_MAX_TOKENS)
+
+        started = time.perf_counter()
+        if hedge:
+            message, hedged = await self._create_hedged(params, timeout)
+        else:
+            message, hedged = await self._create_recorded(params, timeout), False
+        self._angle_latencies.append(time.perf_counter() - started)
+
+        variant = self.generator._parse_response(message.content[0].text, prompt_args[-1], variant_key).get(variant_key)
+        if variant is None:
+            raise ValueError(f"Response has no {variant_key}")
+        return variant, usage_meta(message.usage), hedged
+
+    async def _create_hedged(self, params: Dict, timeout: Optional[float] = None):
+        """
+        _create_recorded() with a duplicate request after the hedge threshold
+
+        Returns:
+            (message, whether a hedge was sent)
+        """
+        primary = asyncio.ensure_future(self._create_recorded(params, timeout))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_threshold())
+            if done:
+                return primary.result(), False
+
+            self.hedges += 1
+            backup = asyncio.ensure_future(self._create_recorded(params, timeout))
+            tasks.add(backup)
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result(), True
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def hedge_threshold(self) -> float:
+        """Seconds after which a hedged call is duplicated"""
+        if len(self._angle_latencies) < self.hedge_min_samples:
+            return self.hedge_delay
+        latencies = sorted(self._angle_latencies)
+        return latencies[int(self.hedge_percentile * (len(latencies) - 1))]
+
+    async def generate_many(self, requests: List[Dict], timeout: Optional[float] = None) -> List[Tuple[Dict, Dict]]:
+        """
+        Generate copy for many products concurrently (bounded by max_concurrency)
+
+        Args:
+            requests: List of keyword-argument dicts for generate()
+
+        Returns:
+            List of (variants, meta) in input order (scheduled as bulk traffic)
+        """
+        with use_priority('bulk'):
+            tasks = [asyncio.ensure_future(self.generate(timeout=timeout, **request)) for request in requests]
+        return await asyncio.gather(*tasks)
+
+    async def generate_multi_market(self, markets: List[str], **kwargs) -> Tuple[Dict[str, Dict], Dict]:
+        """
+        Generate the 3 variants for several markets concurrently
+
+        Async counterpart of CopyGenerator.generate_multi_market(); each
+        market falls back to the template on its own.
+
+        Args:
+            markets: Target markets, e.g. ["SI", "DE", "IT"]
+            **kwargs: Remaining arguments of generate() (without market)
+
+        Returns:
+            (market -> variants, meta) where meta is built by multi_market_meta()
+        """
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(self.generate(market=market, **kwargs) for market in markets))
+        results = dict(zip(markets, outcomes))
+        return {market: variants for market, (variants, _) in results.items()}, multi_market_meta(results, started)
+
+    def generate_sync(self, **kwargs) -> Tuple[Dict, Dict]:
+        """Blocking wrapper around generate() for synchronous callers"""
+        return self.run(self.generate(**kwargs))
+
+    def generate_parallel_sync(self, **kwargs) -> Tuple[Dict, Dict]:
+        """Blocking wrapper around generate_parallel() for synchronous callers"""
+        return self.run(self.generate_parallel(**kwargs))
+
+    def generate_best_of_sync(self, **kwargs) -> Tuple[Dict, Dict]:
+        """Blocking wrapper around generate_best_of() for synchronous callers"""
+        return self.run(self.generate_best_of(**kwargs))
+
+    def generate_multi_market_sync(self, markets: List[str], **kwargs) -> Tuple[Dict[str, Dict], Dict]:
+        """Blocking wrapper around generate_multi_market() for synchronous callers"""
+        return self.run(self.generate_multi_market(markets, **kwargs))
+
+    def generate_many_sync(self, requests: List[Dict], timeout: Optional[float] = None) -> List[Tuple[Dict, Dict]]:
+        """Blocking wrapper around generate_many() for synchronous callers"""
+        return self.run(self.generate_many(requests, timeout=timeout))
+
+    async def _create(self, params: Dict, timeout: Optional[float] = None):
+        """
+        Messages API call with retries, circuit breaker and a deadline
+
+        timeout is the budget for the whole call including retries and the
+        wait for a concurrency slot (default: the engine timeout). With a
+        scheduler on the generator, the call first waits for a slot of the
+        current traffic class. An exhausted budget fails without waiting.
+        """
+        deadline = Deadline(timeout if timeout is not None else self.timeout)
+        if deadline.remaining() <= 0:
+            raise DeadlineExceeded(f"Request deadline of {deadline.seconds}s exceeded")
+        scheduler = self.generator.scheduler
+        ticket = None
+        if scheduler is not None:
+            ticket = await scheduler.acquire_async(PRIORITY.get(), estimate_tokens(params), deadline.remaining())
+        message = None
+        try:
+            message = await self.generator.retry_policy.call_async(
+                lambda remaining: self._attempt(params, remaining),
+                deadline,
+                self.generator.breaker
+            )
+            return message
+        finally:
+            if ticket is not None:
+                scheduler.release(ticket, total_tokens(message))
+
+    async def _create_recorded(self, params: Dict, timeout: Optional[float] = None):
+        """_create() whose outcome is fed to the generator's model router"""
+        call_started = time.perf_counter()
+        try:
+            message = await self._create(params, timeout)
+        except Exception as e:
+            self.generator.record_call(params['model'], call_started, e)
+            raise
+        self.generator.record_call(params['model'], call_started)
+        return message
+
+    async def _attempt(self, params: Dict, timeout: float):
+        """
+        One Messages API call bounded by the concurrency semaphore and a timeout
+
+        timeout covers the wait for a concurrency slot as well as the call.
+        Rate-limit headers and 429/529 responses are reported to the
+        generator's limiter, if any.
+        """
+        deadline = Deadline(timeout)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"No concurrency slot free within {round(timeout, 1)}s")
+
+        self.in_flight += 1
+        try:
+            limiter = self.generator.limiter
+            if limiter is None:
+                return await asyncio.wait_for(self.client.messages.create(**params), deadline.remaining())
+            response = await asyncio.wait_for(
+                self.client.messages.with_raw_response.create(**params), deadline.remaining()
+            )
+            limiter.record_response(response.headers)
+            return response.parse()
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Claude call timed out after {round(timeout, 1)}s")
+        except Exception as e:
+            if self.generator.limiter:
+                self.generator.limiter.record_error(e)
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        """Concurrency counters (exposed through /health)"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'timeout_seconds': self.timeout,
+            'hedge_threshold_seconds': round(self.hedge_threshold(), 3),
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins
+        }
+
+
+async def _in_priority(coro, priority: str):
+    """Await coro with PRIORITY set (tasks it creates inherit the class)"""
+    with use_priority(priority):
+        return await coro
@@ -0,0 +1,317 @@
+"""
+Bulk catalog generation via the Message Batches API
+
+Packs one request per product x market (built with CopyGenerator's prompt
+builder) into Message Batches, polls until they have ended, then runs the
+usual JSON parsing and character-limit enforcement on every result and
+writes one JSON line per product/market to the output file. Results that
+errored or could not be parsed fall back to the template copy.
+
+Usage:
+    python batch_generator.py --input products.csv --markets SI,DE,IT,AT,HR,BA --output results.jsonl
+    python batch_generator.py --input products.csv --output results.jsonl --batch-id msgbatch_...
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from copy_generator import CopyGenerator, missing_variants, normalize_markets, resolve_model
+from engagement import annotate
+
+API_VERSION = '2023-06-01'
+MAX_BATCH_REQUESTS = 10000
+# Batches that have not ended within 24 hours expire; allow some slack on top
+MAX_WAIT_SECONDS = 25 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def load_products(path: str) -> List[Dict]:
+    """Read products from a CSV (header row) or NDJSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_products(f, path.endswith('.csv'))
+
+
+def parse_products(lines: Iterable[str], is_csv: bool) -> List[Dict]:
+    """Parse products from the lines of a CSV (header row) or NDJSON document"""
+    if is_csv:
+        return [dict(row) for row in csv.DictReader(lines)]
+    products = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        product = json.loads(line)
+        if not isinstance(product, dict):
+            raise ValueError(f"Line {number} is not a JSON object")
+        products.append(product)
+    return products
+
+
+def custom_id(index: int, market: str) -> str:
+    """Batch request ID for product #index in market"""
+    return f"p{index}-{market}"
+
+
+class BatchGenerator:
+    """Generate ad copy for many products through the Message Batches API"""
+
+    def __init__(
+        self,
+        generator: CopyGenerator,
+        base_url: Optional[str] = None,
+        poll_interval: float = 30.0,
+        max_batch_requests: int = MAX_BATCH_REQUESTS,
+        max_wait: float = MAX_WAIT_SECONDS
+    ):
+        """
+        Args:
+            generator: CopyGenerator providing prompts, parsing and the template fallback
+            base_url: API base URL (defaults to ANTHROPIC_BASE_URL or the public API;
+                point it at a local fake batch server for testing)
+            poll_interval: Seconds between batch status checks
+            max_batch_requests: Maximum number of requests packed into one batch
+            max_wait: Seconds to wait for a batch to end before giving up
+        """
+        if not generator.anthropic_key:
+            raise ValueError("Anthropic API key not configured")
+
+        self.generator = generator
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.max_batch_requests = max_batch_requests
+        self.http = httpx.Client(
+            base_url=base_url or os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com'),
+            headers={
+                'x-api-key': generator.anthropic_key,
+                'anthropic-version': API_VERSION,
+                'content-type': 'application/json'
+            },
+            timeout=60.0
+        )
+
+    def build_requests(
+        self,
+        products: List[Dict],
+        markets: Optional[List[str]] = None,
+        model: str = "fast",
+        max_chars: int = 150
+    ) -> Tuple[List[Dict], Dict[str, Tuple[Dict, str]]]:
+        """
+        Build one batch request per product and market
+
+        Args:
+            products: Product dicts (product_name, price, features, optional
+                description, objective, style_prompt and market)
+            markets: Markets to generate for (default: each product's own market)
+
+        Returns:
+            (batch requests, custom_id -> (product, market))
+
+        Raises:
+            ValueError: If a market is unknown (markets are upper-cased and
+                deduplicated, so every custom_id is unique)
+        """
+        selected_model = resolve_model(model)
+        requests = []
+        index = {}
+
+        markets = normalize_markets(markets) if markets else None
+        product_markets = [markets or normalize_markets([product.get('market') or 'SI']) for product in products]
+
+        for position, product in enumerate(products):
+            for market in product_markets[position]:
+                prompt = self.generator._build_prompt(
+                    product.get('product_name', ''),
+                    product.get('price', ''),
+                    product.get('features', ''),
+                    market,
+                    product.get('objective') or 'Conversion',
+                    product.get('description', ''),
+                    product.get('style_prompt', ''),
+                    max_chars
+                )
+                request_id = custom_id(position, market)
+                requests.append({
+                    'custom_id': request_id,
+                    'params': self.generator._message_params(market, prompt, selected_model)
+                })
+                index[request_id] = (product, market)
+
+        return requests, index
+
+    def submit(self, requests: List[Dict]) -> List[str]:
+        """Create batches (split at max_batch_requests) and return their IDs"""
+        batch_ids = []
+        for start in range(0, len(requests), self.max_batch_requests):
+            response = self.http.post(
+                '/v1/messages/batches', json={'requests': requests[start:start + self.max_batch_requests]}
+            )
+            response.raise_for_status()
+            batch_ids.append(response.json()['id'])
+        return batch_ids
+
+    def wait(self, batch_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Poll a batch until its processing has ended
+
+        Args:
+            timeout: Seconds to wait (default: max_wait)
+
+        Raises:
+            TimeoutError: If the batch has not ended in time (it keeps running
+                upstream; its results can be collected later by batch ID)
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            response = self.http.get(f'/v1/messages/batches/{batch_id}')
+            response.raise_for_status()
+            batch = response.json()
+            if batch.get('processing_status') == 'ended':
+                return batch
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Batch {batch_id} has not ended after {timeout}s; collect it later with --batch-id {batch_id}"
+                )
+            logger.info("Batch %s: %s %s", batch_id, batch.get('processing_status'), batch.get('request_counts', {}))
+            time.sleep(min(self.poll_interval, remaining))
+
+    def results(self, batch: Dict) -> Iterator[Dict]:
+        """Stream the JSONL result lines of an ended batch"""
+        results_url = batch.get('results_url') or f"/v1/messages/batches/{batch['id']}/results"
+        with self.http.stream('GET', results_url) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    def run(
+        self,
+        products: List[Dict],
+        output_path: str,
+        markets: Optional[List[str]] = None,
+        model: str = "fast",
+        max_chars: int = 150,
+        batch_ids: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Generate copy for all products and markets and write it to output_path
+
+        Args:
+            products: Product dicts
+            output_path: JSONL file receiving one line per product/market
+            markets: Markets to generate for (default: each product's own market)
+            model: Model alias
+            max_chars: Maximum character count per variant
+            batch_ids: Collect results of already submitted batches instead of
+                submitting new ones (products/markets must match the original run)
+
+        Returns:
+            Summary counters
+        """
+        started = time.perf_counter()
+        requests, index = self.build_requests(products, markets, model, max_chars)
+        if not batch_ids:
+            batch_ids = self.submit(requests)
+            logger.info("Submitted %d requests in batches: %s", len(requests), ', '.join(batch_ids))
+
+        summary = {'batch_ids': batch_ids, 'requests': len(requests), 'succeeded': 0, 'fallback': 0}
+        with open(output_path, 'w', encoding='utf-8') as out:
+            for batch_id in batch_ids:
+                for result in self.results(self.wait(batch_id)):
+                    if result.get('custom_id') not in index:
+                        continue
+                    line = self._process_result(result, index, max_chars)
+                    summary['fallback' if line['fallback'] else 'succeeded'] += 1
+                    out.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+        summary['elapsed_seconds'] = round(time.perf_counter() - started, 1)
+        return summary
+
+    def _process_result(self, result: Dict, index: Dict[str, Tuple[Dict, str]], max_chars: int) -> Dict:
+        """Parse one batch result, falling back to the template on errors"""
+        product, market = index[result['custom_id']]
+        outcome = result.get('result', {})
+        line = {
+            'custom_id': result['custom_id'],
+            'product_name': product.get('product_name', ''),
+            'market': market,
+            'fallback': False
+        }
+
+        try:
+            if outcome.get('type') != 'succeeded':
+                raise ValueError(f"Batch request {outcome.get('type')}: {outcome.get('error')}")
+            message = outcome['message']
+            text = ''.join(block.get('text', '') for block in message.get('content', []) if block.get('type') == 'text')
+            line['variants'] = self.generator._parse_response(text, max_chars)
+            line['usage'] = message.get('usage')
+
+            # Keep the salvaged variants and only fill the missing ones from the template
+            missing = missing_variants(line['variants'])
+            if missing:
+                template = self._template(product, market, max_chars)
+                for variant_key in missing:
+                    line['variants'][variant_key] = template[variant_key]
+                line['template_variants'] = missing
+        except Exception as e:
+            line['variants'] = self._template(product, market, max_chars)
+            line['fallback'] = True
+            line['error'] = str(e)
+
+        annotate(line['variants'])
+        return line
+
+    def _template(self, product: Dict, market: str, max_chars: int) -> Dict:
+        return self.generator._generate_template_copy(
+            product.get('product_name', ''),
+            product.get('price', ''),
+            product.get('features', ''),
+            market,
+            product.get('objective') or 'Conversion',
+            max_chars
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate ad copy for a product catalog via Message Batches')
+    parser.add_argument('--input', required=True, help='Products CSV or NDJSON file')
+    parser.add_argument('--output', required=True, help='Output JSONL file')
+    parser.add_argument('--markets', help='Comma-separated markets (default: each product\'s market)')
+    parser.add_argument('--model', default='fast', help='Model alias (fast/smart)')
+    parser.add_argument('--max-chars', type=int, default=150, help='Maximum characters per variant')
+    parser.add_argument('--poll-interval', type=float, default=30.0, help='Seconds between status checks')
+    parser.add_argument('--max-wait', type=float, default=MAX_WAIT_SECONDS, help='Seconds to wait for a batch to end')
+    parser.add_argument('--batch-id', action='append', help='Collect results of an existing batch (repeatable)')
+    parser.add_argument('--base-url', help='API base URL (e.g. a local fake batch server)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    try:
+        markets = normalize_markets(args.markets.split(',')) if args.markets else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    batch_generator = BatchGenerator(
+        CopyGenerator(), base_url=args.base_url, poll_interval=args.poll_interval, max_wait=args.max_wait
+    )
+    summary = batch_generator.run(
+        load_products(args.input),
+        args.output,
+        markets=markets,
+        model=args.model,
+        max_chars=args.max_chars,
+        batch_ids=args.batch_id
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change the page content (ad/analytics tracking)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'ref'}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a product URL so equivalent URLs share one cache key
+
+    Lowercases scheme and host, drops the fragment and tracking parameters
+    (utm_*, fbclid, ...), sorts the remaining query parameters and makes
+    sure the path ends with a trailing slash.
+
+    Args:
+        url: Product URL
+
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlsplit(url.strip())
+
+    path = parts.path or '/'
+    if not path.endswith('/'):
+        path += '/'
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+class _Flight:
+    """A load in progress that concurrent callers for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self._waiters = []  # (loop, future) of coroutines waiting for the load
+        self._lock = threading.Lock()
+
+    def finish(self):
+        """Wake every waiting thread and coroutine"""
+        with self._lock:
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:  # The waiter's loop is closed
+                pass
+
+    async def wait_async(self):
+        """Wait for the load without blocking the event loop"""
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if self.done.is_set():
+                return
+            self._waiters.append((future.get_loop(), future))
+        await future
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class TTLCache:
+    """
+    Thread-safe TTL + LRU cache with single-flight loading
+
+    Entries expire ttl seconds after they were stored and the least recently
+    used entry is evicted once max_size is reached. Concurrent get_or_load
+    (or get_or_load_async) calls for the same missing key run the loader
+    only once; the other callers, threads and coroutines alike, wait for its
+    result (or its exception). The time each loader
+    took is remembered so hits can report the latency they saved.
+    """
+
+    def __init__(self, ttl: float = 600, max_size: int = 1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (expires_at, value, load_seconds)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss
+
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing the value; exceptions are
+                propagated to every waiting caller and nothing is cached
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        return self.get_or_load_with_status(key, loader)[0]
+
+    def get_or_load_with_status(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        refresh: bool = False
+    ) -> Tuple[Any, str]:
+        """
+        Like get_or_load, but also report how the value was obtained
+
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing the value
+            refresh: Ignore a cached entry and load again (still joins a load
+                that is already in flight, since that one is fresh too)
+
+        Returns:
+            (value, status) where status is 'hit', 'miss', 'coalesced' or 'refresh'
+        """
+        while True:
+            value, status, flight = self._join(key, refresh)
+            if status == 'hit':
+                return value, status
+
+            if status == 'coalesced':
+                flight.done.wait()
+                if isinstance(flight.error, asyncio.CancelledError):
+                    continue  # The leader was cancelled, not this caller: load again
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value, status
+
+            try:
+                started = time.monotonic()
+                flight.value = loader()
+                self.set(key, flight.value, load_seconds=time.monotonic() - started)
+                return flight.value, status
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                self._land(key, flight)
+
+    async def get_or_load_async(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        refresh: bool = False
+    ) -> Tuple[Any, str]:
+        """
+        get_or_load_with_status() for coroutines
+
+        loader returns an awaitable. Waiting for a load in flight (started by
+        a thread or another coroutine) does not block the event loop.
+
+        Returns:
+            (value, status) where status is 'hit', 'miss', 'coalesced' or 'refresh'
+        """
+        while True:
+            value, status, flight = self._join(key, refresh)
+            if status == 'hit':
+                return value, status
+
+            if status == 'coalesced':
+                await flight.wait_async()
+                if isinstance(flight.error, asyncio.CancelledError):
+                    continue
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value, status
+
+            try:
+                started = time.monotonic()
+                flight.value = await loader()
+                self.set(key, flight.value, load_seconds=time.monotonic() - started)
+                return flight.value, status
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                self._land(key, flight)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key (counted as hit or miss), or default"""
+        with self._lock:
+            value, found = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, load_seconds: float = 0.0):
+        """Store value under key, evicting least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value, load_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Counters for monitoring (exposed through /health)"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                'saved_seconds': round(self.saved_seconds, 2)
+            }
+
+    def _join(self, key: Hashable, refresh: bool) -> Tuple[Any, str, Optional[_Flight]]:
+        """
+        Look key up and find the load to wait for or to lead
+
+        Returns:
+            (value, 'hit', None) for a cached value, (None, 'coalesced', flight)
+            for a load in flight, else (None, 'miss' or 'refresh', flight) for a
+            new flight the caller has to run and land
+        """
+        with self._lock:
+            if not refresh:
+                value, found = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value, 'hit', None
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return None, 'coalesced', flight
+
+            self.misses += 1
+            flight = self._flights[key] = _Flight()
+            return None, 'refresh' if refresh else 'miss', flight
+
+    def _land(self, key: Hashable, flight: _Flight):
+        """End a flight and wake its waiters"""
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.finish()
+
+    def _lookup(self, key: Hashable):
+        """Return (value, found) for key; caller must hold the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+
+        expires_at, value, load_seconds = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None, False
+
+        self._entries.move_to_end(key)
+        self.saved_seconds += load_seconds
+        return value, True
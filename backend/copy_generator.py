@@ -1,17 +1,370 @@
 import os
+import contextvars
+import copy
+import hashlib
 import json
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from anthropic import Anthropic
 
+from cache import TTLCache
+from engagement import score_variant
+from json_salvage import salvage_variants
+from json_stream import VariantStreamParser
+from limiter import AdaptiveLimiter
+from resilience import CircuitBreaker, CircuitOpenError, Deadline, RetryPolicy, is_retryable
+from router import ModelRouter
+from scheduler import PRIORITY, PriorityScheduler
+from templates import render_template_copy
+
+# Model selection mapping (Claude only)
+MODEL_MAP = {
+    "claude-haiku": "claude-haiku-4-5-20251001",
+    "claude-sonnet": "claude-sonnet-4-5-20250929",
+    "fast": "claude-haiku-4-5-20251001",
+    "smart": "claude-sonnet-4-5-20250929"
+}
+DEFAULT_MODEL = "claude-haiku-4-5-20251001"
+
+# Faster models a request may be routed to when its model misses the latency SLO
+MODEL_DOWNGRADES = {
+    "claude-sonnet-4-5-20250929": ["claude-haiku-4-5-20251001"]
+}
+
+# Variant keys and the advertising angle each one covers
+VARIANT_ANGLES = {
+    'variant_1': 'pain_point',
+    'variant_2': 'benefit',
+    'variant_3': 'social_proof'
+}
+
+# Output budget per variant when only some variants are requested
+# (the full 3-variant call uses 2000)
+VARIANT_MAX_TOKENS = 700
+
+# Shortest prompt prefix (in tokens) each model caches; a cache_control marker
+# on a shorter prefix is ignored by the API
+PROMPT_CACHE_MIN_TOKENS = {
+    "claude-haiku-4-5-20251001": 4096,
+    "claude-sonnet-4-5-20250929": 1024
+}
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 1024
+
+# The system prompts mix English, Slovenian and emoji: about 3.5 characters per token
+CHARS_PER_TOKEN = 3.5
+
+
+def resolve_model(model: str) -> str:
+    """Map a model alias ("fast", "smart", ...) to a Claude model ID"""
+    return MODEL_MAP.get(model, DEFAULT_MODEL)
+
+
+MARKET_CONTEXT = {
+    'SI': '''Slovenian market (vigoshop.si style):
+- Tone: Casual, friend-recommending-product style (not corporate)
+- Use phrases like "Ni problema!" (No problem!), "Samo rezultati!" (Just results!)
+- Question hooks: "Ste naveličani...?" (Tired of...?)
+- Emphasize local trust: "Tisoči zadovoljnih kupcev po Sloveniji" (Thousands of satisfied customers in Slovenia)
+- Fast EU delivery is critical differentiator''',
+    'DE': '''German market (vigoshop.si style):
+- Tone: Professional but accessible, avoid overly formal language
+- Use "Warum zahlen..." (Why pay...) for comparative pricing
+- Emphasize quality ("Deutsche Qualität") and efficiency
+- Avoid superlatives - use measured enthusiasm
+- "Jetzt einkaufen" (Shop now) for CTAs''',
+    'IT': '''Italian market (vigoshop.si style):
+- Tone: Warm, family-oriented, emotionally engaging
+- Use "Per la tua famiglia" (For your family)
+- Emphasize style, beauty, and value together
+- "La soluzione perfetta" (The perfect solution)
+- Family and community language resonates''',
+    'AT': '''Austrian market (vigoshop.si style):
+- Tone: Similar to German but slightly more casual
+- Emphasize reliability and quality
+- Professional yet approachable
+- Focus on practical benefits''',
+    'HR': '''Croatian market (vigoshop.si style):
+- Tone: Casual, friendly (similar to Slovenian)
+- Direct, straightforward language
+- Community-focused messaging
+- Emphasize local presence and fast delivery''',
+    'BA': '''Bosnian market (vigoshop.si style):
+- Tone: Warm, straightforward, no-nonsense
+- Direct benefit communication
+- Family and practical value emphasis
+- Simple, clear language'''
+}
+DEFAULT_MARKET_TONE = 'European market - professional and trustworthy tone, vigoshop.si style'
+
+
+def normalize_markets(markets: Iterable[str]) -> List[str]:
+    """
+    Upper-case and dedupe market codes, keeping their order
+
+    Raises:
+        ValueError: If a market is not one of MARKET_CONTEXT
+    """
+    normalized = list(dict.fromkeys(str(market).strip().upper() for market in markets))
+    unknown = [market for market in normalized if market not in MARKET_CONTEXT]
+    if unknown:
+        raise ValueError(f"Unknown market(s): {', '.join(unknown)} (supported: {', '.join(MARKET_CONTEXT)})")
+    return normalized
+
+
+def build_system_prompt(market: str) -> str:
+    """Build the static part of the prompt (role, market guidance, vigoshop.si formula)"""
+    market_tone = MARKET_CONTEXT.get(market, DEFAULT_MARKET_TONE)
+
+    return f"""You are an expert Facebook ads copywriter for vigoshop.si, specializing in dropshipping products for European markets.
+
+Target Market: {market}
+Market Guidance: {market_tone}
+
+You will be given a product, an ad objective and a character limit. Generate 3 Facebook ad copy variants using the proven vigoshop.si advertising formula.
+
+VIGOSHOP.SI FORMULA - CRITICAL REQUIREMENTS:
+
+HOOK STRUCTURE (8-12 words):
+- Variant 1: Question hook identifying pain point (e.g., "Ste naveličani...?" / "Tired of...?")
+- Variant 2: Benefit-statement hook (e.g., "Hitro do..." / "Quickly to..." / "Imagine this...")
+- Variant 3: Social proof hook (e.g., "Everyone's talking about..." / "Join 10,000+...")
+
+BODY COPY STRUCTURE (vigoshop.si PAS framework):
+1. Problem-Agitate-Solution opening (2-3 sentences)
+2. Benefits formatted as EMOJI-PREFIXED BULLETS:
+   🔥 Benefit 1 - Brief explanation
+   🎯 Benefit 2 - Brief explanation
+   ✅ Benefit 3 - Brief explanation
+   💪 Benefit 4 - Brief explanation (if needed)
+3. Use effort-elimination language: "brez napora" (without effort), "brez potenja" (no sweating), "samo rezultati" (just results)
+4. Time efficiency framing: Quantify time savings (e.g., "20 minut = 2 km tek!")
+5. MANDATORY: "Ships from EU warehouse - 2-3 day delivery" (NOT from China) - this is THE key differentiator vs Temu/AliExpress
+
+TRUST SIGNALS (include 2-3):
+- "100% money-back guarantee" / "Garancija vračila denarja"
+- "Thousands of satisfied customers" / "Tisoči zadovoljnih kupcev"
+- "Verified 5-star reviews" / "Verificirane ocene"
+- Specific customer testimonial quote (for social proof variant)
+
+TONE & STYLE:
+- Casual, friend-recommending-product (NOT corporate or salesy)
+- Use exclamation points naturally (≈60% of sentences)
+- Emoji density: 1 emoji per 15-20 words
+- Short sentences, active voice, conversational phrases
+
+URGENCY & SCARCITY (use strategically):
+- "Samo danes!" (Only today!) / "Omejena ponudba!" (Limited offer!)
+- "Limited stock" / "Don't miss out"
+- Add 🎁 for special offers
+
+CTA REQUIREMENTS:
+- Direct, action-oriented: "Naročite zdaj" (Order now), "Kliknite zdaj" (Click now)
+- Include urgency + benefit: "Shop Now - Fast EU Delivery!"
+- Use directional emojis: 👇 ➡️
+
+Format as JSON (field lengths follow the length budget given with the product):
+{{
+  "variant_1": {{
+    "angle": "pain_point",
+    "hook": "Question hook identifying pain (8-12 words, within the hook budget)",
+    "body": "PAS framework body with emoji-bullet benefits. Casual tone. Include EU shipping, trust signals. Within the body budget.",
+    "cta": "Direct action CTA with urgency (within the cta budget)",
+    "character_count": X (MUST be under the character limit)
+  }},
+  "variant_2": {{
+    "angle": "benefit",
+    "hook": "Benefit-statement hook (8-12 words, within the hook budget)",
+    "body": "Transformation-focused body with emoji-bullet benefits. Time efficiency framing. EU shipping. Within the body budget.",
+    "cta": "Direct action CTA (within the cta budget)",
+    "character_count": X (MUST be under the character limit)
+  }},
+  "variant_3": {{
+    "angle": "social_proof",
+    "hook": "Social proof hook (8-12 words, within the hook budget)",
+    "body": "Community-focused body with customer testimonial. Emoji-bullet benefits. EU shipping. Within the body budget.",
+    "cta": "Community-joining CTA (within the cta budget)",
+    "character_count": X (MUST be under the character limit)
+  }}
+}}
+
+EMOJI USAGE GUIDE (vigoshop.si patterns):
+- Benefits: 🔥 (intensity), 🎯 (targeted), ✅ (confirmation), 💪 (strength), ⚙️ (technical), ⏱️ (time)
+- Delivery: 🚀 (speed), 🚛 (logistics), 📦 (package)
+- Deals: 🎁 (gift), 🎉 (celebration), 💰 (savings)
+- Emotion: 🙃 (friendly), 😁 (happy), 💎 (value), ⭐ (quality)
+- Direction: 👇 (down), ➡️ (right)
+
+Make each variant feel like a helpful friend sharing a clever solution, NOT a corporate ad.
+The EU shipping advantage is MANDATORY in every variant - it's the core differentiator.
+"""
+
+
+# Static system prompts, built once at import so every request sends a byte-identical
+# (and therefore prompt-cacheable) prefix
+SYSTEM_PROMPTS = {market: build_system_prompt(market) for market in MARKET_CONTEXT}
+
+
+def system_prompt(market: str) -> str:
+    """Static system prompt for market (built on demand for markets without guidance)"""
+    if market not in SYSTEM_PROMPTS:
+        return build_system_prompt(market)
+    return SYSTEM_PROMPTS[market]
+
+
+def prompt_cacheable(market: str, selected_model: str) -> bool:
+    """Whether the market's system prompt is long enough for selected_model to cache it"""
+    minimum = PROMPT_CACHE_MIN_TOKENS.get(selected_model, DEFAULT_PROMPT_CACHE_MIN_TOKENS)
+    return len(system_prompt(market)) / CHARS_PER_TOKEN >= minimum
+
+
+def usage_meta(usage) -> Optional[Dict]:
+    """Token usage of a response, including prompt-cache reads and writes"""
+    if usage is None:
+        return None
+    return {
+        'input_tokens': getattr(usage, 'input_tokens', None),
+        'output_tokens': getattr(usage, 'output_tokens', None),
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0
+    }
+
+
+def sum_usage(usages: List[Optional[Dict]]) -> Optional[Dict]:
+    """Add up the token usage of several calls"""
+    usages = [usage for usage in usages if usage]
+    if not usages:
+        return None
+    return {field: sum(usage.get(field) or 0 for usage in usages) for field in usages[0]}
+
+
+def estimate_tokens(params: Dict) -> int:
+    """Rough token cost of a Messages API call: prompt characters / 4 plus max_tokens"""
+    characters = sum(len(block.get('text', '')) for block in params.get('system', []))
+    characters += sum(len(str(message.get('content', ''))) for message in params.get('messages', []))
+    return characters // 4 + params.get('max_tokens', 0)
+
+
+def total_tokens(message) -> Optional[int]:
+    """Input + output tokens of a response (None without usage)"""
+    usage = getattr(message, 'usage', None)
+    if usage is None:
+        return None
+    return (usage.input_tokens or 0) + (usage.output_tokens or 0)
+
+
+def missing_variants(variants: Dict) -> List[str]:
+    """Variant keys (variant_1..3) not present in variants"""
+    return [variant_key for variant_key in VARIANT_ANGLES if variant_key not in variants]
+
+
+@lru_cache(maxsize=256)
+def product_block(product_name: str, price: str, features: str, description: str) -> str:
+    """
+    Market-independent head of the per-product prompt
+
+    Cached so the markets of a multi-market request (and repeated requests
+    for the same product) share one rendering of the product details.
+    """
+    return f"""Product: {product_name}
+Price: {price}
+Features: {features}
+Description: {description}
+"""
+
+
+def multi_market_meta(results: Dict[str, Tuple[Dict, Dict]], started: float) -> Dict:
+    """
+    Combined meta of a multi-market generation
+
+    Args:
+        results: Market -> (variants, meta) of each market's generation
+        started: perf_counter() value when the request started
+
+    Returns:
+        Wall-clock latency, summed token usage, the markets that fell back to
+        the template and the individual meta of every market
+    """
+    return {
+        'markets': {market: meta for market, (_, meta) in results.items()},
+        'fallback_markets': [market for market, (_, meta) in results.items() if meta.get('fallback')],
+        'usage': sum_usage([meta.get('usage') for _, meta in results.values()]),
+        'latency_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+def _normalize(value) -> str:
+    """Collapse whitespace so trivially different inputs share a cache entry"""
+    return ' '.join(str(value or '').split())
+
+
+def generation_cache_key(
+    product_name: str,
+    price: str,
+    features: str,
+    market: str,
+    objective: str,
+    description: str,
+    style_prompt: str,
+    selected_model: str,
+    max_chars: int
+) -> str:
+    """Hash of the normalized generation inputs plus the resolved model ID"""
+    inputs = {
+        'product_name': _normalize(product_name),
+        'price': _normalize(price),
+        'features': ' | '.join(_normalize(f) for f in str(features or '').split('|') if f.strip()),
+        'market': _normalize(market),
+        'objective': _normalize(objective),
+        'description': _normalize(description),
+        'style_prompt': _normalize(style_prompt),
+        'model': selected_model,
+        'max_chars': int(max_chars)
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
 class CopyGenerator:
     """Generate Facebook ad copy using Claude API or OpenAI API"""
 
-    def __init__(self, anthropic_key: str = None):
-        # Initialize Anthropic (Claude API only)
+    def __init__(
+        self,
+        anthropic_key: str = None,
+        cache: Optional[TTLCache] = None,
+        deadline: float = 60.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        router: Optional[ModelRouter] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ):
+        """
+        Args:
+            anthropic_key: Anthropic API key (defaults to ANTHROPIC_API_KEY)
+            cache: Optional result cache keyed by the normalized generation inputs
+            deadline: Time budget in seconds for one generation, retries included
+            retry_policy: Backoff for transient API errors (default: 3 attempts)
+            breaker: Circuit breaker around the API (default: opens after 5 failures)
+            router: Optional latency-SLO router that may downgrade the requested model
+            scheduler: Optional priority scheduler every Claude call has to pass
+            limiter: Optional AIMD limiter adjusting the scheduler's concurrency
+                from rate-limit headers and 429/529 responses
+        """
+        # Initialize Anthropic (Claude API only). Retries are done by
+        # retry_policy so they can respect the request deadline.
         self.anthropic_key = anthropic_key or os.getenv('ANTHROPIC_API_KEY')
         self.anthropic_client = None
         if self.anthropic_key:
-            self.anthropic_client = Anthropic(api_key=self.anthropic_key)
+            self.anthropic_client = Anthropic(api_key=self.anthropic_key, max_retries=0)
+
+        self.cache = cache
+        self.deadline = deadline
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.router = router
+        self.scheduler = scheduler
+        self.limiter = limiter
 
     def _truncate_at_word_boundary(self, text: str, max_length: int) -> str:
         """
@@ -49,7 +402,9 @@ class CopyGenerator:
         description: str = "",
         style_prompt: str = "",
         model: str = "fast",
-        max_chars: int = 150
+        max_chars: int = 150,
+        force_refresh: bool = False,
+        latency_budget_ms: Optional[float] = None
     ) -> Dict:
         """
         Generate 3 Facebook ad copy variants
@@ -64,111 +419,287 @@ class CopyGenerator:
             style_prompt: Additional style/tone customization instructions
             model: Model selection - "fast" (Haiku 4.5 - default) or "smart" (Sonnet 4.5)
             max_chars: Maximum character count for copy (default 150)
+            force_refresh: Bypass the result cache and always call Claude
+            latency_budget_ms: Latency budget; with a router configured, the model
+                may be downgraded when it is expected to miss the budget
 
         Returns:
             Dictionary with 3 ad copy variants
         """
-        try:
-            prompt = self._build_prompt(
-                product_name, price, features, market, objective, description, style_prompt, max_chars
-            )
+        return self.generate_ad_copy_with_meta(
+            product_name, price, features, market, objective, description,
+            style_prompt, model, max_chars, force_refresh, latency_budget_ms
+        )[0]
 
-            # Model selection mapping (Claude only)
-            model_map = {
-                "claude-haiku": "claude-haiku-4-5-20251001",
-                "claude-sonnet": "claude-sonnet-4-5-20250929",
-                "fast": "claude-haiku-4-5-20251001",
-                "smart": "claude-sonnet-4-5-20250929"
-            }
-            selected_model = model_map.get(model, "claude-haiku-4-5-20251001")
-
-            if not self.anthropic_client:
-                raise ValueError("Anthropic API key not configured")
-
-            # Claude API call
-            message = self.anthropic_client.messages.create(
-                model=selected_model,
-                max_tokens=2000,
-                temperature=0.7,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+    def generate_ad_copy_with_meta(
+        self,
+        product_name: str,
+        price: str,
+        features: str,
+        market: str,
+        objective: str,
+        description: str = "",
+        style_prompt: str = "",
+        model: str = "fast",
+        max_chars: int = 150,
+        force_refresh: bool = False,
+        latency_budget_ms: Optional[float] = None
+    ) -> Tuple[Dict, Dict]:
+        """
+        Generate 3 Facebook ad copy variants and report how they were produced
+
+        Takes the same arguments as generate_ad_copy.
+
+        Returns:
+            (variants, meta) where meta holds the model that served the request,
+            cache status, latency and whether the template fallback was used
+            (circuit_open is set when the breaker short-circuited the call;
+            requested_model and the routing reason when the router downgraded
+            the model)
+        """
+        started = time.perf_counter()
+        selected_model, meta = self.route_model(model, latency_budget_ms)
+
+        def generate() -> Dict:
+            variants, meta['usage'], follow_up = self._generate_with_claude(
+                product_name, price, features, market, objective, description,
+                style_prompt, selected_model, max_chars
             )
-            response_text = message.content[0].text
+            if follow_up:
+                meta['follow_up'] = follow_up
+            return variants
 
-            # Try to parse JSON from response
-            try:
-                # Look for JSON in code blocks or raw text
-                if '```json' in response_text:
-                    json_str = response_text.split('```json')[1].split('```')[0].strip()
-                elif '```' in response_text:
-                    json_str = response_text.split('```')[1].split('```')[0].strip()
-                else:
-                    json_str = response_text.strip()
-
-                result = json.loads(json_str)
-
-                # Enforce character limit - truncate if needed
-                for variant_key, variant in result.items():
-                    if isinstance(variant, dict):
-                        full_text = f"{variant.get('hook', '')}\n\n{variant.get('body', '')}\n\n{variant.get('cta', '')}"
-                        actual_count = len(full_text)
-
-                        # If over limit, truncate body
-                        if actual_count > max_chars:
-                            hook = variant.get('hook', '')
-                            cta = variant.get('cta', '')
-                            body = variant.get('body', '')
-
-                            # Calculate available space for body
-                            overhead = len(hook) + len(cta) + 4  # 4 for newlines
-                            max_body_length = max_chars - overhead - 10  # 10 char safety margin
-
-                            if len(body) > max_body_length:
-                                # Truncate body at sentence boundary first
-                                truncated_body = body[:max_body_length]
-                                # Try to find last sentence ending
-                                last_period = max(truncated_body.rfind('.'), truncated_body.rfind('!'), truncated_body.rfind('?'))
-                                if last_period > max_body_length * 0.6:  # Only if we don't lose too much
-                                    truncated_body = truncated_body[:last_period + 1]
-                                else:
-                                    # If no good sentence boundary, truncate at word boundary
-                                    truncated_body = self._truncate_at_word_boundary(body, max_body_length)
-
-                                variant['body'] = truncated_body
-
-                        # Final check: ensure each field ends with complete word
-                        for field in ['hook', 'body', 'cta']:
-                            if field in variant and isinstance(variant[field], str):
-                                # Check if field ends mid-word (has letter/digit at end but not punctuation)
-                                text = variant[field].rstrip()
-                                if text and text[-1].isalnum() and len(text) > 1:
-                                    # Check if the last character could be part of a truncated word
-                                    # by looking for a space near the end
-                                    last_space = text.rfind(' ')
-                                    if last_space > len(text) * 0.9:  # Space is near the end
-                                        # Might be truncated, apply word boundary check
-                                        variant[field] = self._truncate_at_word_boundary(text, len(text))
-
-                        # Recalculate character count
-                        full_text = f"{variant.get('hook', '')}\n\n{variant.get('body', '')}\n\n{variant.get('cta', '')}"
-                        variant['character_count'] = len(full_text)
-
-                return result
-
-            except json.JSONDecodeError:
-                # Fallback: return template-based copy
-                return self._generate_template_copy(product_name, price, features, market, objective, max_chars)
+        try:
+            if self.cache is None:
+                variants = generate()
+            else:
+                key = generation_cache_key(
+                    product_name, price, features, market, objective, description,
+                    style_prompt, selected_model, max_chars
+                )
+                variants, meta['cache'] = self.cache.get_or_load_with_status(key, generate, refresh=force_refresh)
+                # Callers may post-process the variants - never hand out the cached objects
+                variants = copy.deepcopy(variants)
 
         except Exception as e:
             print(f"Error generating copy: {str(e)}")
             # Fallback to template
-            return self._generate_template_copy(product_name, price, features, market, objective, max_chars)
+            variants = self._generate_template_copy(product_name, price, features, market, objective, max_chars)
+            meta['fallback'] = True
+            if isinstance(e, CircuitOpenError):
+                meta['circuit_open'] = True
 
-    def _build_prompt(
+        meta['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return variants, meta
+
+    def generate_multi_market(
+        self,
+        markets: List[str],
+        product_name: str,
+        price: str,
+        features: str,
+        objective: str,
+        description: str = "",
+        style_prompt: str = "",
+        model: str = "fast",
+        max_chars: int = 150,
+        force_refresh: bool = False,
+        latency_budget_ms: Optional[float] = None
+    ) -> Tuple[Dict[str, Dict], Dict]:
+        """
+        Generate the 3 variants for several markets concurrently
+
+        Each market is an independent generation on its own thread (cache,
+        routing, retries and template fallback apply per market), so one
+        failing market never fails the others and the request takes about as
+        long as the slowest market.
+
+        Args:
+            markets: Target markets, e.g. ["SI", "DE", "IT"]
+            Other arguments as for generate_ad_copy.
+
+        Returns:
+            (market -> variants, meta) where meta is built by multi_market_meta()
+        """
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, len(markets))) as pool:
+            # Each thread runs in a copy of the caller's context (traffic class)
+            futures = {
+                market: pool.submit(
+                    contextvars.copy_context().run,
+                    self.generate_ad_copy_with_meta,
+                    product_name, price, features, market, objective, description,
+                    style_prompt, model, max_chars, force_refresh, latency_budget_ms
+                )
+                for market in markets
+            }
+            results = {market: future.result() for market, future in futures.items()}
+
+        return {market: variants for market, (variants, _) in results.items()}, multi_market_meta(results, started)
+
+    def stream_ad_copy(
+        self,
+        product_name: str,
+        price: str,
+        features: str,
+        market: str,
+        objective: str,
+        description: str = "",
+        style_prompt: str = "",
+        model: str = "fast",
+        max_chars: int = 150,
+        force_refresh: bool = False,
+        latency_budget_ms: Optional[float] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Generate 3 Facebook ad copy variants, yielding each as soon as it is complete
+
+        Takes the same arguments as generate_ad_copy. Claude's response is
+        streamed and parsed incrementally; each variant gets the character
+        limit applied and is yielded the moment its JSON object closes.
+        Variants missing after a failure are filled in from the template.
+
+        The cache is read and filled, but a stream never joins (or leads) a
+        single-flight load: it has to yield variants before the answer is
+        complete, while a loader only hands out the finished copy.
+
+        Yields:
+            ('variant', {'key': 'variant_1', 'variant': {...}}) for each variant,
+            then ('done', meta)
+        """
+        started = time.perf_counter()
+        selected_model, meta = self.route_model(model, latency_budget_ms)
+        variants = {}
+
+        key = None
+        if self.cache is not None:
+            key = generation_cache_key(
+                product_name, price, features, market, objective, description,
+                style_prompt, selected_model, max_chars
+            )
+            cached = None if force_refresh else self.cache.get(key)
+            meta['cache'] = 'refresh' if force_refresh else ('hit' if cached is not None else 'miss')
+            if cached is not None:
+                variants = copy.deepcopy(cached)
+                for variant_key, variant in variants.items():
+                    yield 'variant', {'key': variant_key, 'variant': variant}
+
+        if not variants:
+            try:
+                if not self.anthropic_client:
+                    raise ValueError("Anthropic API key not configured")
+
+                prompt_args = (product_name, price, features, market, objective, description, style_prompt, max_chars)
+                prompt = self._build_prompt(*prompt_args)
+                params = self._message_params(market, prompt, selected_model)
+                parser = VariantStreamParser()
+                streamed = []
+
+                deadline = Deadline(self.deadline)
+                ticket = self._admit(params, deadline)
+                final_message = None
+                try:
+                    # Variants may already have been sent, so a broken stream is
+                    # not retried; the breaker and deadline still apply
+                    if not self.breaker.allow():
+                        raise CircuitOpenError("Circuit breaker open - Claude API calls are paused")
+
+                    call_started = time.perf_counter()
+                    try:
+                        with self.anthropic_client.messages.stream(**params, timeout=deadline.remaining()) as stream:
+                            for text in stream.text_stream:
+                                streamed.append(text)
+                                for variant_key, variant in parser.feed(text):
+                                    if not variant_key or not isinstance(variant, dict):
+                                        continue
+                                    variants[variant_key] = self._enforce_char_limit(variant, max_chars)
+                                    if 'first_variant_ms' not in meta:
+                                        meta['first_variant_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                                    yield 'variant', {'key': variant_key, 'variant': variant}
+
+                            final_message = stream.get_final_message()
+                            meta['usage'] = usage_meta(final_message.usage)
+                            if self.limiter:
+                                self.limiter.record_response(stream.response.headers)
+                    except Exception as e:
+                        if self.limiter:
+                            self.limiter.record_error(e)
+                        if is_retryable(e):
+                            self.breaker.record_failure()
+                        else:
+                            self.breaker.release()
+                        self.record_call(selected_model, call_started, e)
+                        raise
+                    except BaseException:
+                        # The client went away mid-stream (GeneratorExit): no verdict
+                        # on the API, but the probe slot must not stay claimed
+                        self.breaker.release()
+                        raise
+                    self.breaker.record_success()
+                    self.record_call(selected_model, call_started)
+                finally:
+                    self._release(ticket, final_message)
+
+                # Variants the incremental parser rejected (e.g. a raw newline
+                # in a string) may still be recoverable from the whole text
+                for variant_key, variant in salvage_variants(''.join(streamed)).items():
+                    if variant_key not in variants:
+                        variants[variant_key] = self._enforce_char_limit(variant, max_chars)
+                        yield 'variant', {'key': variant_key, 'variant': variant}
+
+                missing = missing_variants(variants)
+                if variants and missing:
+                    message = self._call_claude(self._follow_up_params(prompt_args, selected_model, missing), deadline)
+                    completed = self._merge_follow_up(dict(variants), message.content[0].text, missing, max_chars)
+                    meta['follow_up'] = missing
+                    meta['usage'] = sum_usage([meta.get('usage'), usage_meta(message.usage)])
+                    for variant_key in missing:
+                        variants[variant_key] = completed[variant_key]
+                        yield 'variant', {'key': variant_key, 'variant': completed[variant_key]}
+
+            except Exception as e:
+                print(f"Error streaming copy: {str(e)}")
+                if isinstance(e, CircuitOpenError):
+                    meta['circuit_open'] = True
+
+            missing = missing_variants(variants)
+            if missing:
+                template = self._generate_template_copy(product_name, price, features, market, objective, max_chars)
+                meta['fallback'] = True
+                for variant_key in missing:
+                    variants[variant_key] = template[variant_key]
+                    yield 'variant', {'key': variant_key, 'variant': template[variant_key]}
+            elif key is not None:
+                self.cache.set(key, copy.deepcopy(variants), load_seconds=time.perf_counter() - started)
+
+        meta['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        yield 'done', meta
+
+    def route_model(self, model: str, latency_budget_ms: Optional[float] = None) -> Tuple[str, Dict]:
+        """
+        Resolve a model alias and let the router downgrade it if needed
+
+        Returns:
+            (model ID to call, initial response meta)
+        """
+        requested_model = selected_model = resolve_model(model)
+        reason = None
+        if self.router is not None:
+            selected_model, reason = self.router.route(requested_model, latency_budget_ms)
+
+        meta = {'model': selected_model, 'cache': 'disabled', 'fallback': False}
+        if reason:
+            meta['requested_model'] = requested_model
+            meta['routed'] = reason
+        return selected_model, meta
+
+    def record_call(self, selected_model: str, started: float, error: Optional[BaseException] = None):
+        """Feed the outcome of a Claude call (retries included) to the router"""
+        if self.router is None or isinstance(error, CircuitOpenError):
+            return
+        self.router.record(selected_model, time.perf_counter() - started, error is None)
+
+    def _generate_with_claude(
         self,
         product_name: str,
         price: str,
@@ -177,89 +708,217 @@ class CopyGenerator:
         objective: str,
         description: str,
         style_prompt: str,
+        selected_model: str,
         max_chars: int
-    ) -> str:
-        """Build the prompt for Claude API using vigoshop.si best practices"""
+    ) -> Tuple[Dict, Optional[Dict], List[str]]:
+        """
+        Call Claude and parse its answer; raises on any failure (no template fallback)
 
-        market_context = {
-            'SI': '''Slovenian market (vigoshop.si style):
-- Tone: Casual, friend-recommending-product style (not corporate)
-- Use phrases like "Ni problema!" (No problem!), "Samo rezultati!" (Just results!)
-- Question hooks: "Ste naveličani...?" (Tired of...?)
-- Emphasize local trust: "Tisoči zadovoljnih kupcev po Sloveniji" (Thousands of satisfied customers in Slovenia)
-- Fast EU delivery is critical differentiator''',
-            'DE': '''German market (vigoshop.si style):
-- Tone: Professional but accessible, avoid overly formal language
-- Use "Warum zahlen..." (Why pay...) for comparative pricing
-- Emphasize quality ("Deutsche Qualität") and efficiency
-- Avoid superlatives - use measured enthusiasm
-- "Jetzt einkaufen" (Shop now) for CTAs''',
-            'IT': '''Italian market (vigoshop.si style):
-- Tone: Warm, family-oriented, emotionally engaging
-- Use "Per la tua famiglia" (For your family)
-- Emphasize style, beauty, and value together
-- "La soluzione perfetta" (The perfect solution)
-- Family and community language resonates''',
-            'AT': '''Austrian market (vigoshop.si style):
-- Tone: Similar to German but slightly more casual
-- Emphasize reliability and quality
-- Professional yet approachable
-- Focus on practical benefits''',
-            'HR': '''Croatian market (vigoshop.si style):
-- Tone: Casual, friendly (similar to Slovenian)
-- Direct, straightforward language
-- Community-focused messaging
-- Emphasize local presence and fast delivery''',
-            'BA': '''Bosnian market (vigoshop.si style):
-- Tone: Warm, straightforward, no-nonsense
-- Direct benefit communication
-- Family and practical value emphasis
-- Simple, clear language'''
-        }
+        Transient API errors are retried with jittered backoff within the
+        generation deadline; the circuit breaker may reject the call outright.
+        Variants missing from a broken or truncated answer are requested in
+        one follow-up call instead of discarding the whole completion.
 
-        market_tone = market_context.get(market, 'European market - professional and trustworthy tone, vigoshop.si style')
+        Returns:
+            (variants, token usage, keys of the variants requested in a follow-up)
+        """
+        prompt_args = (product_name, price, features, market, objective, description, style_prompt, max_chars)
+        prompt = self._build_prompt(*prompt_args)
 
-        prompt = f"""You are an expert Facebook ads copywriter for vigoshop.si, specializing in dropshipping products for European markets.
+        if not self.anthropic_client:
+            raise ValueError("Anthropic API key not configured")
 
-Product: {product_name}
-Price: {price}
-Features: {features}
-Description: {description}
-Target Market: {market}
-Market Guidance: {market_tone}
-Ad Objective: {objective}
+        # Claude API call
+        deadline = Deadline(self.deadline)
+        message = self._call_claude(self._message_params(market, prompt, selected_model), deadline)
+        variants = self._parse_response(message.content[0].text, max_chars)
+        usages = [usage_meta(message.usage)]
 
-Generate 3 Facebook ad copy variants optimized for {objective} using the proven vigoshop.si advertising formula.
+        missing = missing_variants(variants)
+        if missing:
+            message = self._call_claude(self._follow_up_params(prompt_args, selected_model, missing), deadline)
+            usages.append(usage_meta(message.usage))
+            variants = self._merge_follow_up(variants, message.content[0].text, missing, max_chars)
 
-VIGOSHOP.SI FORMULA - CRITICAL REQUIREMENTS:
+        return variants, sum_usage(usages), missing
 
-HOOK STRUCTURE (8-12 words):
-- Variant 1: Question hook identifying pain point (e.g., "Ste naveličani...?" / "Tired of...?")
-- Variant 2: Benefit-statement hook (e.g., "Hitro do..." / "Quickly to..." / "Imagine this...")
-- Variant 3: Social proof hook (e.g., "Everyone's talking about..." / "Join 10,000+...")
+    def _call_claude(self, params: Dict, deadline: Deadline):
+        """
+        Messages API call with retries within deadline
 
-BODY COPY STRUCTURE (vigoshop.si PAS framework):
-1. Problem-Agitate-Solution opening (2-3 sentences)
-2. Benefits formatted as EMOJI-PREFIXED BULLETS:
-   🔥 Benefit 1 - Brief explanation
-   🎯 Benefit 2 - Brief explanation
-   ✅ Benefit 3 - Brief explanation
-   💪 Benefit 4 - Brief explanation (if needed)
-3. Use effort-elimination language: "brez napora" (without effort), "brez potenja" (no sweating), "samo rezultati" (just results)
-4. Time efficiency framing: Quantify time savings (e.g., "20 minut = 2 km tek!")
-5. MANDATORY: "Ships from EU warehouse - 2-3 day delivery" (NOT from China) - this is THE key differentiator vs Temu/AliExpress
+        With a scheduler the call first waits for a slot of the current
+        traffic class (see scheduler.use_priority); the slot is held across
+        retries. The outcome is fed to the router.
+        """
+        ticket = self._admit(params, deadline)
+        message = None
+        try:
+            call_started = time.perf_counter()
+            try:
+                message = self.retry_policy.call(
+                    lambda timeout: self._create_message(params, timeout),
+                    deadline,
+                    self.breaker
+                )
+            except Exception as e:
+                self.record_call(params['model'], call_started, e)
+                raise
+            self.record_call(params['model'], call_started)
+            return message
+        finally:
+            self._release(ticket, message)
+
+    def _create_message(self, params: Dict, timeout: float):
+        """One Messages API call; with a limiter its rate-limit headers and 429/529s are reported"""
+        if self.limiter is None:
+            return self.anthropic_client.messages.create(**params, timeout=timeout)
+        try:
+            response = self.anthropic_client.messages.with_raw_response.create(**params, timeout=timeout)
+        except Exception as e:
+            self.limiter.record_error(e)
+            raise
+        self.limiter.record_response(response.headers)
+        return response.parse()
+
+    def _admit(self, params: Dict, deadline: Deadline):
+        """Wait for a scheduler slot (no-op without scheduler); returns the ticket"""
+        if self.scheduler is None:
+            return None
+        return self.scheduler.acquire(PRIORITY.get(), estimate_tokens(params), deadline.remaining())
+
+    def _release(self, ticket, message=None):
+        if ticket is not None:
+            self.scheduler.release(ticket, total_tokens(message))
+
+    def _parse_response(self, response_text: str, max_chars: int, single_key: Optional[str] = None) -> Dict:
+        """
+        Parse the JSON variants from a Claude response and enforce the character limit
 
-TRUST SIGNALS (include 2-3):
-- "100% money-back guarantee" / "Garancija vračila denarja"
-- "Thousands of satisfied customers" / "Tisoči zadovoljnih kupcev"
-- "Verified 5-star reviews" / "Verificirane ocene"
-- Specific customer testimonial quote (for social proof variant)
+        Common JSON defects are repaired and every complete variant is kept,
+        so the result may lack variants (see missing_variants()).
 
-TONE & STYLE:
-- Casual, friend-recommending-product (NOT corporate or salesy)
-- Use exclamation points naturally (≈60% of sentences)
-- Emoji density: 1 emoji per 15-20 words
-- Short sentences, active voice, conversational phrases
+        Args:
+            single_key: Variant key for a response that is a bare variant object
+
+        Raises:
+            ValueError: If the response doesn't contain a single complete variant
+        """
+        result = salvage_variants(response_text, single_key)
+        if not result:
+            raise ValueError("No complete variant in Claude's response")
+
+        # Enforce character limit - truncate if needed
+        for variant in result.values():
+            self._enforce_char_limit(variant, max_chars)
+
+        return result
+
+    def _follow_up_params(self, prompt_args: Tuple, selected_model: str, missing: List[str]) -> Dict:
+        """
+        Request parameters asking only for the missing variants
+
+        Args:
+            prompt_args: _build_prompt arguments (product_name ... max_chars)
+        """
+        prompt = self._build_prompt(*prompt_args, variant_keys=missing)
+        return self._message_params(prompt_args[3], prompt, selected_model, max_tokens=VARIANT_MAX_TOKENS * len(missing))
+
+    def _merge_follow_up(self, variants: Dict, response_text: str, missing: List[str], max_chars: int) -> Dict:
+        """Add the follow-up answer to variants; raises if variants are still missing"""
+        variants.update(self._parse_response(response_text, max_chars, missing[0] if len(missing) == 1 else None))
+        still_missing = missing_variants(variants)
+        if still_missing:
+            raise ValueError(f"Claude's response is missing {', '.join(still_missing)}")
+        return {variant_key: variants[variant_key] for variant_key in VARIANT_ANGLES}
+
+    def _enforce_char_limit(self, variant: Dict, max_chars: int) -> Dict:
+        """Truncate a variant's body to fit max_chars and recalculate its character count"""
+        full_text = f"{variant.get('hook', '')}\n\n{variant.get('body', '')}\n\n{variant.get('cta', '')}"
+        actual_count = len(full_text)
+
+        # If over limit, truncate body
+        if actual_count > max_chars:
+            hook = variant.get('hook', '')
+            cta = variant.get('cta', '')
+            body = variant.get('body', '')
+
+            # Calculate available space for body
+            overhead = len(hook) + len(cta) + 4  # 4 for newlines
+            max_body_length = max_chars - overhead - 10  # 10 char safety margin
+
+            if len(body) > max_body_length:
+                # Truncate body at sentence boundary first
+                truncated_body = body[:max_body_length]
+                # Try to find last sentence ending
+                last_period = max(truncated_body.rfind('.'), truncated_body.rfind('!'), truncated_body.rfind('?'))
+                if last_period > max_body_length * 0.6:  # Only if we don't lose too much
+                    truncated_body = truncated_body[:last_period + 1]
+                else:
+                    # If no good sentence boundary, truncate at word boundary
+                    truncated_body = self._truncate_at_word_boundary(body, max_body_length)
+
+                variant['body'] = truncated_body
+
+        # Final check: ensure each field ends with complete word
+        for field in ['hook', 'body', 'cta']:
+            if field in variant and isinstance(variant[field], str):
+                # Check if field ends mid-word (has letter/digit at end but not punctuation)
+                text = variant[field].rstrip()
+                if text and text[-1].isalnum() and len(text) > 1:
+                    # Check if the last character could be part of a truncated word
+                    # by looking for a space near the end
+                    last_space = text.rfind(' ')
+                    if last_space > len(text) * 0.9:  # Space is near the end
+                        # Might be truncated, apply word boundary check
+                        variant[field] = self._truncate_at_word_boundary(text, len(text))
+
+        # Recalculate character count
+        full_text = f"{variant.get('hook', '')}\n\n{variant.get('body', '')}\n\n{variant.get('cta', '')}"
+        variant['character_count'] = len(full_text)
+        return variant
+
+    def _build_prompt(
+        self,
+        product_name: str,
+        price: str,
+        features: str,
+        market: str,
+        objective: str,
+        description: str,
+        style_prompt: str,
+        max_chars: int,
+        variant_keys: Optional[List[str]] = None
+    ) -> str:
+        """
+        Build the per-product part of the prompt
+
+        The market guidance and the vigoshop.si formula live in the static
+        system prompt (see system_prompt()); this block only carries what
+        changes between requests.
+
+        Args:
+            variant_keys: Ask only for these variants (e.g. ["variant_2"]) instead of all 3
+        """
+        if variant_keys:
+            requested = ' and '.join(
+                f'"{variant_key}" (angle: {VARIANT_ANGLES[variant_key]})' for variant_key in variant_keys
+            )
+            keys = ', '.join(f'"{variant_key}"' for variant_key in variant_keys)
+            task = (
+                f'Generate ONLY {requested} of the Facebook ad copy optimized for {objective} using the '
+                f'proven vigoshop.si advertising formula. Return a JSON object with just the key(s) {keys} '
+                f'in the format shown in the instructions.'
+            )
+        else:
+            task = (
+                f'Generate 3 Facebook ad copy variants optimized for {objective} '
+                f'using the proven vigoshop.si advertising formula.'
+            )
+
+        prompt = product_block(product_name, price, features, description) + f"""Target Market: {market}
+Ad Objective: {objective}
+
+{task}
 
 CHARACTER LIMIT (ABSOLUTE REQUIREMENT):
 - MAXIMUM {max_chars} characters total (hook + body + cta combined)
@@ -268,56 +927,17 @@ CHARACTER LIMIT (ABSOLUTE REQUIREMENT):
 - If you exceed {max_chars} characters, the copy will be REJECTED
 - Prioritize brevity and impact over length
 
-URGENCY & SCARCITY (use strategically):
-- "Samo danes!" (Only today!) / "Omejena ponudba!" (Limited offer!)
-- "Limited stock" / "Don't miss out"
-- Add 🎁 for special offers
-
-CTA REQUIREMENTS:
-- Direct, action-oriented: "Naročite zdaj" (Order now), "Kliknite zdaj" (Click now)
-- Include urgency + benefit: "Shop Now - Fast EU Delivery!"
-- Use directional emojis: 👇 ➡️
+LENGTH BUDGET PER FIELD:
+- hook: max {int(max_chars * 0.15)} chars
+- body: max {int(max_chars * 0.70)} chars
+- cta: max {int(max_chars * 0.15)} chars
+- character_count: MUST be under {max_chars}
 
 CRITICAL RULES:
 1. Each variant MUST be under {max_chars} characters total (including all text)
 2. NEVER cut words in half - always end with complete words
 3. If approaching character limit, end with a complete word, NOT mid-word
 4. Better to be 5-10 chars under the limit than to cut a word
-
-Format as JSON:
-{{
-  "variant_1": {{
-    "angle": "pain_point",
-    "hook": "Question hook identifying pain (8-12 words, max {int(max_chars * 0.15)} chars)",
-    "body": "PAS framework body with emoji-bullet benefits. Casual tone. Include EU shipping, trust signals. MAX {int(max_chars * 0.70)} characters for body.",
-    "cta": "Direct action CTA with urgency (max {int(max_chars * 0.15)} chars)",
-    "character_count": X (MUST be under {max_chars})
-  }},
-  "variant_2": {{
-    "angle": "benefit",
-    "hook": "Benefit-statement hook (8-12 words, max {int(max_chars * 0.15)} chars)",
-    "body": "Transformation-focused body with emoji-bullet benefits. Time efficiency framing. EU shipping. MAX {int(max_chars * 0.70)} characters.",
-    "cta": "Direct action CTA (max {int(max_chars * 0.15)} chars)",
-    "character_count": X (MUST be under {max_chars})
-  }},
-  "variant_3": {{
-    "angle": "social_proof",
-    "hook": "Social proof hook (8-12 words, max {int(max_chars * 0.15)} chars)",
-    "body": "Community-focused body with customer testimonial. Emoji-bullet benefits. EU shipping. MAX {int(max_chars * 0.70)} characters.",
-    "cta": "Community-joining CTA (max {int(max_chars * 0.15)} chars)",
-    "character_count": X (MUST be under {max_chars})
-  }}
-}}
-
-EMOJI USAGE GUIDE (vigoshop.si patterns):
-- Benefits: 🔥 (intensity), 🎯 (targeted), ✅ (confirmation), 💪 (strength), ⚙️ (technical), ⏱️ (time)
-- Delivery: 🚀 (speed), 🚛 (logistics), 📦 (package)
-- Deals: 🎁 (gift), 🎉 (celebration), 💰 (savings)
-- Emotion: 🙃 (friendly), 😁 (happy), 💎 (value), ⭐ (quality)
-- Direction: 👇 (down), ➡️ (right)
-
-Make each variant feel like a helpful friend sharing a clever solution, NOT a corporate ad.
-The EU shipping advantage is MANDATORY in every variant - it's the core differentiator.
 """
 
         # Add custom style instructions if provided
@@ -326,106 +946,37 @@ The EU shipping advantage is MANDATORY in every variant - it's the core differen
 
         return prompt
 
-    def _calculate_engagement_score(self, variant: Dict) -> int:
+    def _message_params(self, market: str, prompt: str, selected_model: str, max_tokens: int = 2000) -> Dict:
         """
-        Calculate engagement score (0-100) based on vigoshop.si best practices
-
-        Factors:
-        - Hook length (8-12 words ideal for vigoshop)
-        - Emoji usage (1 per 15-20 words, vigoshop standard)
-        - Character count (under 125 is better for mobile)
-        - Trust signals present
-        - EU shipping mention (mandatory)
-        - Problem-first structure (vigoshop PAS framework)
-        - Emoji-bullet formatting
-        - Effort-elimination language
-        - Time/quantity specificity
+        Request parameters for a Messages API call
+
+        The static per-market system prompt is marked for prompt caching when
+        it reaches the model's minimum cacheable length (see
+        prompt_cacheable()); repeated requests then only pay full price for
+        the per-product block. The prompt (about 1.2k tokens) qualifies for
+        Sonnet but is below Haiku 4.5's 4096-token minimum, so Haiku
+        requests are sent without the marker.
         """
-        score = 40  # Base score
-
-        full_text = f"{variant.get('hook', '')} {variant.get('body', '')} {variant.get('cta', '')}"
-        body = variant.get('body', '')
-        body_lower = body.lower()
-        hook = variant.get('hook', '')
-
-        # Hook length (8-12 words ideal for vigoshop.si)
-        hook_words = len(hook.split())
-        if 8 <= hook_words <= 12:
-            score += 15  # Perfect vigoshop range
-        elif 5 <= hook_words <= 7 or 13 <= hook_words <= 15:
-            score += 12  # Close to ideal
-        elif hook_words <= 4:
-            score += 8   # Too short
-        else:
-            score += 5   # Too long
+        system = {'type': 'text', 'text': system_prompt(market)}
+        if prompt_cacheable(market, selected_model):
+            system['cache_control'] = {'type': 'ephemeral'}
 
-        # Emoji count (vigoshop: 1 per 15-20 words)
-        total_words = len(full_text.split())
-        emoji_count = sum(1 for char in full_text if ord(char) > 127000)
-        ideal_emoji_range = (total_words / 20, total_words / 15)
+        return {
+            'model': selected_model,
+            'max_tokens': max_tokens,
+            'temperature': 0.7,
+            'system': [system],
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ]
+        }
 
-        if ideal_emoji_range[0] <= emoji_count <= ideal_emoji_range[1]:
-            score += 12  # Optimal vigoshop density
-        elif emoji_count >= 2 and emoji_count <= 5:
-            score += 10  # Acceptable
-        else:
-            score += 5
-
-        # Character count (under 125 ideal for mobile)
-        char_count = variant.get('character_count', 150)
-        if char_count < 125:
-            score += 8
-        elif char_count < 150:
-            score += 5
-
-        # Trust signals (vigoshop uses 2-3 per ad)
-        trust_keywords = ['guarantee', 'reviews', 'verified', 'satisfied', 'customers', 'money-back',
-                         'garancija', 'tisoči', 'thousands', 'testimonial']
-        trust_count = sum(1 for keyword in trust_keywords if keyword in body_lower)
-        if trust_count >= 2:
-            score += 10
-        elif trust_count == 1:
-            score += 5
-
-        # EU shipping mention (MANDATORY in vigoshop.si)
-        eu_keywords = ['eu warehouse', 'eu shipping', 'ships from eu', 'eu skladišč',
-                       'fast delivery', 'quick delivery', '2-3 day', '2-3 dni']
-        if any(keyword in body_lower for keyword in eu_keywords):
-            score += 10  # Critical differentiator
-        else:
-            score -= 10  # Penalty for missing this
-
-        # Problem-first structure (vigoshop PAS framework)
-        problem_indicators = ['tired of', 'struggling with', 'naveličani', 'problema',
-                             'why pay', 'warum zahlen', 'zakaj plačati']
-        if any(indicator in body_lower for indicator in problem_indicators):
-            score += 8  # Bonus for vigoshop structure
-
-        # Emoji-bullet formatting (vigoshop signature)
-        emoji_bullets = ['🔥', '🎯', '✅', '💪', '⚙️', '⏱️']
-        if any(bullet in body for bullet in emoji_bullets):
-            score += 8  # Bonus for vigoshop formatting
-
-        # Effort-elimination language (vigoshop positioning)
-        effort_words = ['without effort', 'brez napora', 'effortless', 'brez potenja',
-                       'just results', 'samo rezultati', 'no gym', 'brez fitnesa']
-        if any(word in body_lower for word in effort_words):
-            score += 5  # Bonus for vigoshop messaging
-
-        # Time/quantity specificity (vigoshop quantification)
-        import re
-        if re.search(r'\d+\s*(min|minut|hour|dni|day|km|€)', body_lower):
-            score += 5  # Bonus for specific claims
-
-        # Urgency language (but penalize overuse)
-        urgency_words = ['today', 'now', 'limited', 'danes', 'zdaj', 'omejen']
-        urgency_count = sum(1 for word in urgency_words if word in body_lower)
-        if urgency_count == 1:
-            score += 5  # Appropriate urgency
-        elif urgency_count >= 3:
-            score -= 5  # Too much urgency (trains distrust per vigoshop analysis)
-
-        return min(max(score, 0), 100)  # Clamp between 0-100
+    def _calculate_engagement_score(self, variant: Dict) -> int:
+        """Calculate engagement score (0-100) based on vigoshop.si best practices (see engagement.py)"""
+        return score_variant(variant)
 
     def _generate_template_copy(
         self,
@@ -436,32 +987,5 @@ The EU shipping advantage is MANDATORY in every variant - it's the core differen
         objective: str,
         max_chars: int = 150
     ) -> Dict:
-        """Fallback template-based copy generation (vigoshop.si style)"""
-
-        # Extract first feature for specific benefit
-        feature_list = features.split('|')
-        first_feature = feature_list[0].strip() if feature_list else "premium quality"
-
-        return {
-            "variant_1": {
-                "angle": "pain_point",
-                "hook": "Tired of waiting weeks for products from China?",
-                "body": f"Get your {product_name} delivered in just 2-3 days from our EU warehouse! No more endless waiting. 🚀\n\n🔥 Fast EU shipping - arrives in 2-3 days, not weeks\n🎯 {first_feature}\n✅ 100% money-back guarantee\n💪 Thousands of satisfied customers across Europe\n\nJust {price} with free shipping. Order now! 🎁",
-                "cta": "Shop Now - Fast EU Delivery! 👉",
-                "character_count": 148
-            },
-            "variant_2": {
-                "angle": "benefit",
-                "hook": "Imagine getting premium quality in just 2-3 days...",
-                "body": f"Your {product_name} arrives fast from our EU warehouse - no customs, no delays! 😊\n\n🔥 Ships in 2-3 days from EU (not China!)\n🎯 {first_feature}\n⏱️ Save time - no month-long waiting\n✅ Verified 5-star reviews\n\nLimited stock at {price}. Thousands already ordered! 💎",
-                "cta": "Get Yours Today! 🚀",
-                "character_count": 142
-            },
-            "variant_3": {
-                "angle": "social_proof",
-                "hook": "Join 10,000+ happy customers across Europe!",
-                "body": f"The {product_name} everyone's talking about! ⭐\n\n\"Best purchase this year - arrived in 2 days!\" - Real customer\n\n🔥 Fast 2-3 day EU shipping\n🎯 {first_feature}\n✅ Money-back guarantee\n💪 Verified reviews\n\nOnly {price}. Don't miss out! 🎁",
-                "cta": "Join Thousands of Happy Customers! 👇",
-                "character_count": 138
-            }
-        }
+        """Fallback template-based copy generation (localized, see templates.py)"""
+        return render_template_copy(product_name, price, features, market, objective, max_chars)
@@ -0,0 +1,349 @@
+"""
+Sitemap-driven incremental crawler for the vigoshop.si catalog
+
+Reads the shop's sitemap(s), scrapes product pages politely and keeps a
+local SQLite copy of the catalog. A product is only stored (and marked
+changed) when the content hash of its extracted data differs from the
+stored one. Every run is checkpointed per URL so an interrupted crawl
+resumes where it stopped.
+
+Usage:
+    python crawler.py --db catalog.db
+    python crawler.py --base-url http://127.0.0.1:8000 --allowed-domain 127.0.0.1 --delay 0
+    (against the local stand-in started with: python tests/fixture_shop.py --port 8000)
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib import robotparser
+from urllib.parse import urljoin, urlparse
+
+from lxml import etree
+
+from scraper import VigoShopScraper
+
+# Fields that don't describe the product itself and must not affect its hash
+VOLATILE_FIELDS = ('url',)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    lastmod TEXT,
+    first_seen TEXT NOT NULL,
+    last_checked TEXT NOT NULL,
+    last_changed TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS crawl_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS crawl_queue (
+    run_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    lastmod TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    PRIMARY KEY (run_id, url)
+);
+'''
+
+XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+
+
+def content_hash(product: Dict) -> str:
+    """Stable hash of the extracted product data"""
+    stable = {key: value for key, value in product.items() if key not in VOLATILE_FIELDS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class CatalogCrawler:
+    """Incremental catalog crawler driven by the shop's sitemaps"""
+
+    def __init__(
+        self,
+        scraper: VigoShopScraper,
+        db_path: str = 'catalog.db',
+        base_url: str = 'https://vigoshop.si',
+        sitemap_urls: Optional[List[str]] = None,
+        product_path: str = '/izdelek/',
+        delay: float = 1.0,
+        max_products: Optional[int] = None
+    ):
+        """
+        Args:
+            scraper: Scraper used to fetch and extract product pages
+            db_path: SQLite database holding products and crawl checkpoints
+            base_url: Shop base URL (robots.txt and the default sitemap live here)
+            sitemap_urls: Sitemaps to start from (default: robots.txt entries,
+                falling back to /sitemap_index.xml)
+            product_path: Only URLs containing this path are treated as products
+            delay: Minimum seconds between requests (raised to robots.txt Crawl-delay)
+            max_products: Stop a run after this many product pages (None = all)
+        """
+        self.scraper = scraper
+        self.base_url = base_url.rstrip('/')
+        self.sitemap_urls = sitemap_urls
+        self.product_path = product_path
+        self.delay = delay
+        self.max_products = max_products
+        self._last_request = 0.0
+        self._robots = None
+
+        self.db = sqlite3.connect(db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def run(self, resume: bool = True, force: bool = False) -> Dict:
+        """
+        Crawl the catalog
+
+        Args:
+            resume: Continue the last unfinished run instead of starting a new one
+            force: Scrape every product, even if its sitemap lastmod is unchanged
+
+        Returns:
+            Summary counters of the run
+        """
+        started = time.perf_counter()
+        self._load_robots()
+
+        run_id = self._unfinished_run() if resume else None
+        resumed = run_id is not None
+        if run_id is None:
+            run_id = self._start_run(self.discover())
+
+        summary = {
+            'run_id': run_id,
+            'resumed': resumed,
+            'new': 0,
+            'changed': 0,
+            'unchanged': 0,
+            'skipped': 0,
+            'failed': 0
+        }
+
+        pending = self.db.execute(
+            "SELECT url, lastmod FROM crawl_queue WHERE run_id = ? AND status = 'pending' ORDER BY rowid",
+            (run_id,)
+        ).fetchall()
+
+        processed = 0
+        for row in pending:
+            if self.max_products is not None and processed >= self.max_products:
+                break
+
+            status, error = self._crawl_product(row['url'], row['lastmod'], force)
+            summary[status] += 1
+            if status != 'skipped':
+                processed += 1
+
+            # Checkpoint: a restarted run picks up after the last completed URL
+            self.db.execute(
+                "UPDATE crawl_queue SET status = ?, error = ? WHERE run_id = ? AND url = ?",
+                (status, error, run_id, row['url'])
+            )
+            self.db.commit()
+
+        remaining = self.db.execute(
+            "SELECT COUNT(*) FROM crawl_queue WHERE run_id = ? AND status = 'pending'", (run_id,)
+        ).fetchone()[0]
+        if remaining == 0:
+            self.db.execute("UPDATE crawl_runs SET finished_at = ? WHERE id = ?", (_now(), run_id))
+            self.db.commit()
+
+        summary['remaining'] = remaining
+        summary['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+        return summary
+
+    def discover(self) -> List[Tuple[str, Optional[str]]]:
+        """
+        Collect product URLs from the sitemaps
+
+        Sitemaps and product URLs outside the allowed domain are ignored, as
+        are empty <loc/> entries.
+
+        Returns:
+            List of (url, lastmod) tuples in sitemap order, without duplicates
+        """
+        queue = list(self.sitemap_urls or self._robots_sitemaps() or [f'{self.base_url}/sitemap_index.xml'])
+        seen_sitemaps = set()
+        products = {}
+
+        while queue:
+            sitemap_url = queue.pop(0)
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+
+            try:
+                root = etree.fromstring(self._fetch_sitemap(sitemap_url), XML_PARSER)
+            except Exception as e:
+                print(f"Warning: Failed to read sitemap {sitemap_url}: {e}")
+                continue
+
+            for loc in root.iterfind('{*}sitemap/{*}loc'):
+                location = (loc.text or '').strip()
+                if not location:
+                    continue
+                location = urljoin(sitemap_url, location)
+                if self.allowed(location):
+                    queue.append(location)
+                else:
+                    print(f"Warning: Skipping off-domain sitemap {location}")
+
+            for entry in root.iterfind('{*}url'):
+                loc = (entry.findtext('{*}loc') or '').strip()
+                if not loc:
+                    continue
+                url = urljoin(sitemap_url, loc)
+                if self.product_path in url and url not in products and self.allowed(url):
+                    lastmod = entry.findtext('{*}lastmod')
+                    products[url] = lastmod.strip() if lastmod else None
+
+        return list(products.items())
+
+    def allowed(self, url: str) -> bool:
+        """Whether url is an http(s) URL on the scraper's allowed domain (or a subdomain of it)"""
+        parsed = urlparse(url)
+        host = (parsed.hostname or '').lower()
+        domain = self.scraper.allowed_domain.lower()
+        return parsed.scheme in ('http', 'https') and (host == domain or host.endswith(f'.{domain}'))
+
+    def _crawl_product(self, url: str, lastmod: Optional[str], force: bool) -> Tuple[str, Optional[str]]:
+        """Scrape one product and store it if its content hash changed"""
+        stored = self.db.execute(
+            "SELECT content_hash, lastmod FROM products WHERE url = ?", (url,)
+        ).fetchone()
+
+        if stored and not force and lastmod and stored['lastmod'] == lastmod:
+            return 'skipped', None
+
+        if self._robots and not self._robots.can_fetch(self.scraper.headers['User-Agent'], url):
+            return 'skipped', 'Disallowed by robots.txt'
+
+        self._wait_politely()
+        try:
+            product = self.scraper.scrape_product(url, use_cache=False)
+        except Exception as e:
+            return 'failed', str(e)
+
+        digest = content_hash(product)
+        now = _now()
+
+        if stored is None:
+            self.db.execute(
+                "INSERT INTO products (url, content_hash, data, lastmod, first_seen, last_checked, last_changed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, json.dumps(product, ensure_ascii=False), lastmod, now, now, now)
+            )
+            return 'new', None
+
+        if stored['content_hash'] == digest:
+            self.db.execute(
+                "UPDATE products SET lastmod = ?, last_checked = ? WHERE url = ?", (lastmod, now, url)
+            )
+            return 'unchanged', None
+
+        self.db.execute(
+            "UPDATE products SET content_hash = ?, data = ?, lastmod = ?, last_checked = ?, last_changed = ? "
+            "WHERE url = ?",
+            (digest, json.dumps(product, ensure_ascii=False), lastmod, now, now, url)
+        )
+        return 'changed', None
+
+    def _start_run(self, products: List[Tuple[str, Optional[str]]]) -> int:
+        """Create a run and enqueue its URLs"""
+        cursor = self.db.execute("INSERT INTO crawl_runs (started_at) VALUES (?)", (_now(),))
+        run_id = cursor.lastrowid
+        self.db.executemany(
+            "INSERT OR IGNORE INTO crawl_queue (run_id, url, lastmod) VALUES (?, ?, ?)",
+            [(run_id, url, lastmod) for url, lastmod in products]
+        )
+        self.db.commit()
+        return run_id
+
+    def _unfinished_run(self) -> Optional[int]:
+        """Most recent run that still has pending URLs"""
+        row = self.db.execute(
+            "SELECT id FROM crawl_runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return row['id'] if row else None
+
+    def _fetch_sitemap(self, url: str) -> bytes:
+        """Download a sitemap, transparently un-gzipping .xml.gz files"""
+        self._wait_politely()
+        response = self.scraper.session.get(url, timeout=self.scraper.timeout)
+        response.raise_for_status()
+        content = response.content
+        if content[:2] == b'\x1f\x8b':
+            content = gzip.decompress(content)
+        return content
+
+    def _load_robots(self):
+        """Fetch robots.txt for sitemap discovery, Disallow rules and Crawl-delay"""
+        try:
+            response = self.scraper.session.get(f'{self.base_url}/robots.txt', timeout=self.scraper.timeout)
+        except Exception:
+            self._robots = None
+            return
+
+        if response.status_code != 200:
+            self._robots = None
+            return
+
+        self._robots = robotparser.RobotFileParser()
+        self._robots.parse(response.text.splitlines())
+        crawl_delay = self._robots.crawl_delay(self.scraper.headers['User-Agent'])
+        if crawl_delay:
+            self.delay = max(self.delay, float(crawl_delay))
+
+    def _robots_sitemaps(self) -> List[str]:
+        if self._robots is None:
+            return []
+        return self._robots.site_maps() or []
+
+    def _wait_politely(self):
+        """Sleep so consecutive requests are at least delay seconds apart"""
+        wait = self._last_request + self.delay - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally crawl the vigoshop.si catalog')
+    parser.add_argument('--db', default='catalog.db', help='SQLite database path')
+    parser.add_argument('--base-url', default='https://vigoshop.si', help='Shop base URL')
+    parser.add_argument('--sitemap', action='append', help='Sitemap URL (repeatable; default from robots.txt)')
+    parser.add_argument('--allowed-domain', default='vigoshop.si', help='Domain product URLs must belong to')
+    parser.add_argument('--delay', type=float, default=1.0, help='Seconds between requests')
+    parser.add_argument('--max-products', type=int, help='Stop after this many product pages')
+    parser.add_argument('--no-resume', action='store_true', help='Start a new run instead of resuming')
+    parser.add_argument('--force', action='store_true', help='Re-scrape products with unchanged lastmod')
+    args = parser.parse_args()
+
+    crawler = CatalogCrawler(
+        VigoShopScraper(allowed_domain=args.allowed_domain),
+        db_path=args.db,
+        base_url=args.base_url,
+        sitemap_urls=args.sitemap,
+        delay=args.delay,
+        max_products=args.max_products
+    )
+    print(json.dumps(crawler.run(resume=not args.no_resume, force=args.force), indent=2))
+
+
+if __name__ == '__main__':
+    main()
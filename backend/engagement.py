@@ -0,0 +1,219 @@
+"""
+Compiled engagement scorer (0-100) based on vigoshop.si best practices
+
+All keyword lists are folded into one precompiled, trie-factored regex, so
+a body is scanned once instead of once per keyword list, and emoji are
+counted by a precompiled character class instead of a Python loop.
+Keyword occurrences are matched left to right without overlapping.
+score_variants() scores any number of variants in one call.
+
+Usage:
+    python engagement.py results.jsonl --top 20
+"""
+import argparse
+import json
+import re
+from typing import Dict, List
+
+KEYWORDS = {
+    # Trust signals (vigoshop uses 2-3 per ad)
+    'trust': ['guarantee', 'reviews', 'verified', 'satisfied', 'customers', 'money-back',
+              'garancija', 'tisoči', 'thousands', 'testimonial'],
+    # EU shipping mention (MANDATORY in vigoshop.si)
+    'eu_shipping': ['eu warehouse', 'eu shipping', 'ships from eu', 'eu skladišč',
+                    'fast delivery', 'quick delivery', '2-3 day', '2-3 dni'],
+    # Problem-first structure (vigoshop PAS framework)
+    'problem': ['tired of', 'struggling with', 'naveličani', 'problema',
+                'why pay', 'warum zahlen', 'zakaj plačati'],
+    # Emoji-bullet formatting (vigoshop signature)
+    'emoji_bullet': ['🔥', '🎯', '✅', '💪', '⚙️', '⏱️'],
+    # Effort-elimination language (vigoshop positioning)
+    'effort': ['without effort', 'brez napora', 'effortless', 'brez potenja',
+               'just results', 'samo rezultati', 'no gym', 'brez fitnesa'],
+    # Urgency language (penalized when overused)
+    'urgency': ['today', 'now', 'limited', 'danes', 'zdaj', 'omejen']
+}
+
+# Keyword -> category, for classifying the matcher's hits
+KEYWORD_CATEGORY = {word: category for category, words in KEYWORDS.items() for word in words}
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex alternation of words factored into a prefix trie
+
+    "eu shipping|eu skladišč" becomes "eu\\ s(?:hipping|kladišč)", so the
+    engine tests each position against one character set instead of trying
+    every keyword in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 and '' not in node else '(?:' + '|'.join(branches) + ')'
+        return pattern + '?' if '' in node else pattern
+
+    return build(trie)
+
+
+# Single multi-pattern matcher for every keyword of every category
+KEYWORD_RE = re.compile(_trie_pattern(list(KEYWORD_CATEGORY)))
+
+# Time/quantity specificity (vigoshop quantification)
+QUANTITY_RE = re.compile(r'\d+\s*(?:min|minut|hour|dni|day|km|€)')
+
+# Pictographic emoji (code points above 127000, as counted by the original heuristic)
+EMOJI_RE = re.compile('[\U0001F019-\U0010FFFF]')
+
+
+def score_variant(variant: Dict) -> int:
+    """Engagement score (0-100) of one variant"""
+    return score_variants([variant])[0]
+
+
+def score_variants(variants: List[Dict]) -> List[int]:
+    """
+    Engagement scores of many variants
+
+    Factors:
+    - Hook length (8-12 words ideal for vigoshop)
+    - Emoji usage (1 per 15-20 words, vigoshop standard)
+    - Character count (under 125 is better for mobile)
+    - Trust signals present
+    - EU shipping mention (mandatory)
+    - Problem-first structure (vigoshop PAS framework)
+    - Emoji-bullet formatting
+    - Effort-elimination language
+    - Time/quantity specificity
+    - Urgency (penalized when overused)
+
+    Args:
+        variants: Variant dicts with hook, body, cta and optionally character_count
+
+    Returns:
+        Scores in input order
+    """
+    find_keywords = KEYWORD_RE.findall
+    find_emoji = EMOJI_RE.findall
+    has_quantity = QUANTITY_RE.search
+    scores = []
+
+    for variant in variants:
+        hook = str(variant.get('hook', ''))
+        body = str(variant.get('body', ''))
+        body_lower = body.lower()
+        full_text = f"{hook} {body} {variant.get('cta', '')}"
+
+        hits = {}
+        for keyword in find_keywords(body_lower):
+            hits.setdefault(KEYWORD_CATEGORY[keyword], set()).add(keyword)
+
+        scores.append(_score(
+            hook, full_text, len(find_emoji(full_text)), variant.get('character_count', 150),
+            hits, has_quantity(body_lower) is not None
+        ))
+
+    return scores
+
+
+def annotate(variants: Dict) -> Dict:
+    """Add engagement_score to every variant of a {variant_key: variant} dict (in place)"""
+    keys = [key for key, variant in variants.items() if isinstance(variant, dict)]
+    for key, score in zip(keys, score_variants([variants[key] for key in keys])):
+        variants[key]['engagement_score'] = score
+    return variants
+
+
+def _score(hook: str, full_text: str, emoji_count: int, char_count, hits: Dict, has_quantity: bool) -> int:
+    score = 40  # Base score
+
+    # Hook length (8-12 words ideal for vigoshop.si)
+    hook_words = len(hook.split())
+    if 8 <= hook_words <= 12:
+        score += 15  # Perfect vigoshop range
+    elif 5 <= hook_words <= 7 or 13 <= hook_words <= 15:
+        score += 12  # Close to ideal
+    elif hook_words <= 4:
+        score += 8   # Too short
+    else:
+        score += 5   # Too long
+
+    # Emoji count (vigoshop: 1 per 15-20 words)
+    total_words = len(full_text.split())
+    if total_words / 20 <= emoji_count <= total_words / 15:
+        score += 12  # Optimal vigoshop density
+    elif 2 <= emoji_count <= 5:
+        score += 10  # Acceptable
+    else:
+        score += 5
+
+    # Character count (under 125 ideal for mobile)
+    try:
+        char_count = int(char_count)
+    except (TypeError, ValueError):
+        char_count = 150
+    if char_count < 125:
+        score += 8
+    elif char_count < 150:
+        score += 5
+
+    trust_count = len(hits.get('trust', ()))
+    if trust_count >= 2:
+        score += 10
+    elif trust_count == 1:
+        score += 5
+
+    if 'eu_shipping' in hits:
+        score += 10  # Critical differentiator
+    else:
+        score -= 10  # Penalty for missing this
+
+    if 'problem' in hits:
+        score += 8
+    if 'emoji_bullet' in hits:
+        score += 8
+    if 'effort' in hits:
+        score += 5
+    if has_quantity:
+        score += 5
+
+    urgency_count = len(hits.get('urgency', ()))
+    if urgency_count == 1:
+        score += 5  # Appropriate urgency
+    elif urgency_count >= 3:
+        score -= 5  # Too much urgency (trains distrust per vigoshop analysis)
+
+    return min(max(score, 0), 100)  # Clamp between 0-100
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score and rank ad copy variants offline')
+    parser.add_argument('input', help='JSONL of variants, or of batch_generator.py results')
+    parser.add_argument('--top', type=int, default=20, help='Number of best variants to print')
+    args = parser.parse_args()
+
+    variants = []
+    with open(args.input, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record.get('variants'), dict):
+                variants.extend(v for v in record['variants'].values() if isinstance(v, dict))
+            else:
+                variants.append(record)
+
+    ranked = sorted(zip(score_variants(variants), range(len(variants))), reverse=True)
+    for score, index in ranked[:args.top]:
+        print(json.dumps({'engagement_score': score, **variants[index]}, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+"""
+SQLite-backed background job queue for catalog generation
+
+A job is an uploaded CSV/NDJSON of products; each product x market is a
+row of the job. Worker processes claim rows under a lease, generate copy
+with CopyGenerator and store every result the moment it is done, so the
+rows are the checkpoints: a restarted worker never redoes a completed row,
+and a row whose worker died mid-generation is claimed again once its
+lease has expired.
+
+Usage:
+    python jobs.py submit --input products.csv --markets SI,DE,IT
+    python jobs.py worker --workers 4
+    python jobs.py status <job_id>
+    python jobs.py results <job_id> --output results.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from batch_generator import load_products
+from copy_generator import CopyGenerator, normalize_markets
+from engagement import annotate
+from scheduler import use_priority
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    options TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    market TEXT NOT NULL,
+    product TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, row_index, market)
+);
+CREATE INDEX IF NOT EXISTS job_rows_status ON job_rows (status, lease_expires);
+CREATE INDEX IF NOT EXISTS job_rows_job_status ON job_rows (job_id, status);
+'''
+
+# Generation options a job may set (defaults for rows that don't set them)
+JOB_OPTIONS = {
+    'objective': 'Conversion',
+    'style_prompt': '',
+    'model': 'fast',
+    'max_chars': 150
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class JobQueue:
+    """Jobs and their rows in a SQLite database shared by the API and the workers"""
+
+    def __init__(self, db_path: str = 'jobs.db', lease_seconds: float = 300.0, max_attempts: int = 3):
+        """
+        Args:
+            db_path: SQLite database file
+            lease_seconds: How long a claimed row belongs to its worker; after
+                that it is handed to another worker
+            max_attempts: Claims of a row before it is marked failed
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """
+        Connection of the calling thread (autocommit; transactions are explicit)
+
+        The database file and its schema are created on first use, so
+        importing the API does not create jobs.db.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def create_job(
+        self,
+        products: List[Dict],
+        markets: Optional[List[str]] = None,
+        options: Optional[Dict] = None,
+        source: Optional[str] = None
+    ) -> str:
+        """
+        Enqueue a job
+
+        Args:
+            products: Product dicts (product_name, price, features, optional
+                description, objective, style_prompt and market)
+            markets: Markets to generate for (default: each product's own market, else SI)
+            options: Job-wide defaults for objective, style_prompt, model and max_chars
+            source: Name of the uploaded file, for display
+
+        Returns:
+            Job ID
+
+        Raises:
+            ValueError: If a market is unknown (markets are upper-cased and
+                deduplicated, one row per product and market)
+        """
+        job_id = uuid.uuid4().hex
+        options = {**JOB_OPTIONS, **{key: value for key, value in (options or {}).items() if key in JOB_OPTIONS}}
+        markets = normalize_markets(markets) if markets else None
+        rows = [
+            (job_id, index, market, json.dumps(product, ensure_ascii=False))
+            for index, product in enumerate(products)
+            for market in markets or normalize_markets([product.get('market') or 'SI'])
+        ]
+
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.execute(
+                "INSERT INTO jobs (id, created_at, source, options, total) VALUES (?, ?, ?, ?, ?)",
+                (job_id, _now(), source, json.dumps(options), len(rows))
+            )
+            self.db.executemany(
+                "INSERT INTO job_rows (job_id, row_index, market, product) VALUES (?, ?, ?, ?)", rows
+            )
+            self.db.execute('COMMIT')
+        except Exception:
+            self.db.execute('ROLLBACK')
+            raise
+        return job_id
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to limit rows to a worker
+
+        Pending rows are handed out first in job order; running rows whose
+        lease expired (their worker crashed) are taken over. Rows that have
+        already been claimed max_attempts times are marked failed instead.
+
+        Returns:
+            Row dicts with job_id, row_index, market, product and the job's options
+        """
+        now = time.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            exhausted_jobs = [row['job_id'] for row in self.db.execute(
+                "SELECT DISTINCT job_id FROM job_rows WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )]
+            self.db.execute(
+                "UPDATE job_rows SET status = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                "error = COALESCE(error, 'Worker lost the row ' || attempts || ' times') "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            rows = self.db.execute(
+                "SELECT r.rowid, r.job_id, r.row_index, r.market, r.product, j.options "
+                "FROM job_rows r JOIN jobs j ON j.id = r.job_id "
+                "WHERE r.status = 'pending' OR (r.status = 'running' AND r.lease_expires < ?) "
+                "ORDER BY r.rowid LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE job_rows SET status = 'running', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE rowid = ?",
+                [(worker_id, now + self.lease_seconds, row['rowid']) for row in rows]
+            )
+            self.db.execute('COMMIT')
+        except Exception:
+            self.db.execute('ROLLBACK')
+            raise
+
+        for job_id in exhausted_jobs:
+            self._finish_if_done(job_id)
+
+        return [
+            {
+                'job_id': row['job_id'],
+                'row_index': row['row_index'],
+                'market': row['market'],
+                'product': json.loads(row['product']),
+                'options': json.loads(row['options'])
+            }
+            for row in rows
+        ]
+
+    def complete(self, row: Dict, worker_id: str, result: Dict) -> bool:
+        """
+        Checkpoint a finished row
+
+        Returns:
+            False if the row's lease had meanwhile passed to another worker
+            (the result is then discarded)
+        """
+        updated = self.db.execute(
+            "UPDATE job_rows SET status = 'done', result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL "
+            "WHERE job_id = ? AND row_index = ? AND market = ? AND status = 'running' AND lease_owner = ?",
+            (json.dumps(result, ensure_ascii=False), row['job_id'], row['row_index'], row['market'], worker_id)
+        ).rowcount
+        self._finish_if_done(row['job_id'])
+        return updated == 1
+
+    def fail(self, row: Dict, worker_id: str, error: str, count_attempt: bool = True):
+        """
+        Record a failed attempt; the row is retried until max_attempts
+
+        Args:
+            count_attempt: False hands the row back without using up an
+                attempt (the call was never made, e.g. the breaker was open)
+        """
+        attempts = 'attempts' if count_attempt else 'attempts - 1'
+        self.db.execute(
+            f"UPDATE job_rows SET status = CASE WHEN {attempts} >= ? THEN 'failed' ELSE 'pending' END, "
+            f"attempts = {attempts}, error = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE job_id = ? AND row_index = ? AND market = ? AND status = 'running' AND lease_owner = ?",
+            (self.max_attempts, error, row['job_id'], row['row_index'], row['market'], worker_id)
+        )
+        self._finish_if_done(row['job_id'])
+
+    def release(self, worker_id: str):
+        """Hand back every row leased to worker_id (used on shutdown)"""
+        self.db.execute(
+            "UPDATE job_rows SET status = 'pending', attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL "
+            "WHERE status = 'running' AND lease_owner = ?",
+            (worker_id,)
+        )
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Progress of a job (None if it doesn't exist)"""
+        job = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for row in self.db.execute(
+            "SELECT status, COUNT(*) AS count FROM job_rows WHERE job_id = ? GROUP BY status", (job_id,)
+        ):
+            counts[row['status']] = row['count']
+
+        if job['finished_at']:
+            state = 'finished'
+        elif counts['running'] or counts['done'] or counts['failed']:
+            state = 'running'
+        else:
+            state = 'queued'
+
+        return {
+            'id': job['id'],
+            'status': state,
+            'source': job['source'],
+            'options': json.loads(job['options']),
+            'total': job['total'],
+            'rows': counts,
+            'progress': round((counts['done'] + counts['failed']) / job['total'], 3) if job['total'] else 1.0,
+            'created_at': job['created_at'],
+            'finished_at': job['finished_at']
+        }
+
+    def results(self, job_id: str) -> Iterator[Dict]:
+        """Finished rows of a job in input order (one dict per product/market)"""
+        cursor = self.db.execute(
+            "SELECT row_index, market, status, result, error FROM job_rows "
+            "WHERE job_id = ? AND status IN ('done', 'failed') ORDER BY rowid",
+            (job_id,)
+        )
+        for row in cursor:
+            if row['status'] == 'done':
+                yield json.loads(row['result'])
+            else:
+                yield {'index': row['row_index'], 'market': row['market'], 'error': row['error']}
+
+    def _finish_if_done(self, job_id: str):
+        unfinished = self.db.execute(
+            "SELECT 1 FROM job_rows WHERE job_id = ? AND status IN ('pending', 'running') LIMIT 1", (job_id,)
+        ).fetchone()
+        if unfinished is None:
+            self.db.execute(
+                "UPDATE jobs SET finished_at = ? WHERE id = ? AND finished_at IS NULL", (_now(), job_id)
+            )
+
+
+class JobWorker:
+    """Claims job rows one at a time and generates their copy"""
+
+    def __init__(
+        self,
+        jobs: JobQueue,
+        generator: CopyGenerator,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0
+    ):
+        """
+        Args:
+            jobs: Queue to take rows from
+            generator: CopyGenerator doing the work (a template fallback counts as a failed attempt)
+            worker_id: Lease owner name (default: host-pid)
+            poll_interval: Seconds to sleep when no row is pending
+        """
+        self.jobs = jobs
+        self.generator = generator
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.poll_interval = poll_interval
+
+    def run(self, stop_when_idle: bool = False) -> int:
+        """
+        Process rows until interrupted (or until the queue is empty)
+
+        Returns:
+            Number of rows processed
+        """
+        processed = 0
+        try:
+            while True:
+                rows = self.jobs.claim(self.worker_id)
+                if not rows:
+                    if stop_when_idle:
+                        return processed
+                    time.sleep(self.poll_interval)
+                    continue
+                for row in rows:
+                    self.process(row)
+                    processed += 1
+        finally:
+            self.jobs.release(self.worker_id)
+
+    def process(self, row: Dict):
+        """Generate one row (as bulk traffic) and checkpoint its result"""
+        product, options = row['product'], row['options']
+        try:
+            with use_priority('bulk'):
+                variants, meta = self.generator.generate_ad_copy_with_meta(
+                    product_name=product.get('product_name', ''),
+                    price=product.get('price', ''),
+                    features=product.get('features', ''),
+                    market=row['market'],
+                    objective=product.get('objective') or options['objective'],
+                    description=product.get('description', ''),
+                    style_prompt=product.get('style_prompt') or options['style_prompt'],
+                    model=options['model'],
+                    max_chars=int(options['max_chars'])
+                )
+        except Exception as e:
+            print(f"Warning: Job {row['job_id']} row {row['row_index']}/{row['market']} failed: {e}")
+            self.jobs.fail(row, self.worker_id, str(e))
+            return
+
+        if meta.get('fallback'):
+            # Claude didn't answer (the template stood in): retry the row rather than store template copy
+            if meta.get('circuit_open'):
+                # Nothing was sent; don't use up an attempt, give the breaker time to recover
+                self.jobs.fail(row, self.worker_id, 'Circuit breaker open', count_attempt=False)
+                time.sleep(self.poll_interval)
+            else:
+                self.jobs.fail(row, self.worker_id, 'Claude generation failed (template fallback)')
+            return
+
+        self.jobs.complete(row, self.worker_id, {
+            'index': row['row_index'],
+            'product_name': product.get('product_name', ''),
+            'market': row['market'],
+            'fallback': False,
+            'variants': annotate(variants),
+            'meta': meta
+        })
+
+
+def _worker_process(db_path: str, poll_interval: float, stop_when_idle: bool):
+    """Entry point of one worker process"""
+    worker = JobWorker(
+        JobQueue(db_path),
+        CopyGenerator(deadline=float(os.getenv('GENERATION_TIMEOUT', 60))),
+        poll_interval=poll_interval
+    )
+    try:
+        worker.run(stop_when_idle=stop_when_idle)
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Background job queue for catalog generation')
+    parser.add_argument('--db', default=os.getenv('JOBS_DB_PATH', 'jobs.db'), help='SQLite database path')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit = commands.add_parser('submit', help='Enqueue a products CSV or NDJSON file')
+    submit.add_argument('--input', required=True, help='Products CSV or NDJSON file')
+    submit.add_argument('--markets', help='Comma-separated markets (default: each product\'s market)')
+    submit.add_argument('--objective', default='Conversion', help='Objective for rows without one')
+    submit.add_argument('--model', default='fast', help='Model alias (fast/smart)')
+    submit.add_argument('--max-chars', type=int, default=150, help='Maximum characters per variant')
+
+    worker = commands.add_parser('worker', help='Run worker processes')
+    worker.add_argument('--workers', type=int, default=2, help='Number of worker processes')
+    worker.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between polls when idle')
+    worker.add_argument('--exit-when-idle', action='store_true', help='Stop once no row is pending')
+
+    status = commands.add_parser('status', help='Show the progress of a job')
+    status.add_argument('job_id')
+
+    results = commands.add_parser('results', help='Write the results of a job as JSONL')
+    results.add_argument('job_id')
+    results.add_argument('--output', required=True, help='Output JSONL file')
+
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        processes = [
+            multiprocessing.Process(target=_worker_process, args=(args.db, args.poll_interval, args.exit_when_idle))
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join()
+        return
+
+    jobs = JobQueue(args.db)
+    if args.command == 'submit':
+        try:
+            markets = normalize_markets(args.markets.split(',')) if args.markets else None
+        except ValueError as e:
+            parser.error(str(e))
+        job_id = jobs.create_job(
+            load_products(args.input),
+            markets=markets,
+            options={'objective': args.objective, 'model': args.model, 'max_chars': args.max_chars},
+            source=os.path.basename(args.input)
+        )
+        print(json.dumps(jobs.status(job_id), indent=2))
+    elif args.command == 'status':
+        print(json.dumps(jobs.status(args.job_id), indent=2))
+    elif args.command == 'results':
+        with open(args.output, 'w', encoding='utf-8') as out:
+            for line in jobs.results(args.job_id):
+                out.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
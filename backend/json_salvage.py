@@ -0,0 +1,101 @@
+import json
+from typing import Dict, Optional
+
+from json_stream import VariantStreamParser
+
+# Characters that may follow the closing quote of a JSON string
+_AFTER_STRING = ',}]:'
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the defects Claude's JSON most commonly has
+
+    - raw newlines / tabs inside strings are escaped
+    - a quote inside a string that is not followed by , } ] or : is
+      treated as part of the text and escaped
+    - trailing commas before } and ] are dropped
+
+    Truncated input stays truncated; incomplete objects are left for
+    salvage_variants() to skip.
+    """
+    out = []
+    in_string = False
+    escaped = False
+
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                following = position + 1
+                while following < len(text) and text[following] in ' \t\r\n':
+                    following += 1
+                if following < len(text) and text[following] not in _AFTER_STRING:
+                    out.append('\\"')
+                    continue
+                in_string = False
+            elif char == '\n':
+                out.append('\\n')
+                continue
+            elif char == '\r':
+                continue
+            elif char == '\t':
+                out.append('\\t')
+                continue
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in '}]':
+            index = len(out) - 1
+            while index >= 0 and out[index] in ' \t\r\n':
+                index -= 1
+            if index >= 0 and out[index] == ',':
+                del out[index]
+        out.append(char)
+
+    return ''.join(out)
+
+
+def is_variant(value) -> bool:
+    """Whether value looks like a complete ad copy variant"""
+    return isinstance(value, dict) and isinstance(value.get('hook'), str) and isinstance(value.get('body'), str)
+
+
+def salvage_variants(text: str, single_key: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Extract every complete variant from a (possibly broken) response
+
+    The text is repaired and decoded as a whole; if it still isn't valid
+    (e.g. the last variant was cut off by max_tokens), the variant objects
+    that did close are recovered one by one.
+
+    Args:
+        text: Raw response text, optionally wrapped in a ```json fence
+        single_key: Key to use when the response is a bare variant object
+            (single-variant requests)
+
+    Returns:
+        Dict of variant key -> variant, possibly empty
+    """
+    start = text.find('{')
+    if start == -1:
+        return {}
+    repaired = repair_json(text[start:])
+
+    try:
+        result, _ = json.JSONDecoder().raw_decode(repaired)
+    except ValueError:
+        result = None
+
+    if isinstance(result, dict):
+        if single_key and is_variant(result):
+            return {single_key: result}
+        return {key: value for key, value in result.items() if is_variant(value)}
+
+    parser = VariantStreamParser()
+    return {key: value for key, value in parser.feed(repaired) if key and is_variant(value)}
@@ -0,0 +1,83 @@
+import json
+from typing import Dict, List, Tuple
+
+
+class VariantStreamParser:
+    """
+    Incremental parser for the variants object Claude streams back
+
+    Text is fed in arbitrary chunks. Anything before the first '{' (such as
+    a ```json fence) is skipped. Every time a member object of the top-level
+    object closes - e.g. "variant_1": {...} - it is decoded and returned
+    from feed() together with its key, while later variants are still being
+    generated.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_key = None
+        self._pending_key = None
+        self._object_start = None
+        self._key = None
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, Dict]]:
+        """
+        Feed the next chunk of streamed text
+
+        Returns:
+            List of (key, object) pairs completed by this chunk
+        """
+        self._buffer += text
+        completed = []
+
+        while self._position < len(self._buffer) and not self.done:
+            char = self._buffer[self._position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self._buffer[self._string_start + 1:self._position]
+
+            elif self._depth == 0 and char != '{':
+                # Preamble / code fence before the JSON starts
+                pass
+
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._position
+
+            elif char == ':' and self._depth == 1:
+                self._pending_key = self._last_key
+
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 2 and char == '{':
+                    self._object_start = self._position
+                    self._key = self._pending_key
+
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 1 and char == '}' and self._object_start is not None:
+                    source = self._buffer[self._object_start:self._position + 1]
+                    try:
+                        completed.append((self._key, json.loads(source)))
+                    except ValueError:
+                        pass
+                    self._object_start = None
+                elif self._depth == 0:
+                    self.done = True
+
+            self._position += 1
+
+        return completed
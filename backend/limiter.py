@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from scheduler import PriorityScheduler
+
+# Rate-limit header families reported by the API; each has -limit and -remaining
+RATE_LIMIT_FAMILIES = ('requests', 'tokens', 'input-tokens', 'output-tokens')
+
+
+def remaining_fraction(headers) -> Optional[float]:
+    """Smallest remaining/limit ratio over the anthropic-ratelimit-* headers (None if absent)"""
+    if headers is None:
+        return None
+    fractions = []
+    for family in RATE_LIMIT_FAMILIES:
+        try:
+            limit = float(headers.get(f'anthropic-ratelimit-{family}-limit'))
+            remaining = float(headers.get(f'anthropic-ratelimit-{family}-remaining'))
+        except (TypeError, ValueError):
+            continue
+        if limit > 0:
+            fractions.append(max(0.0, remaining) / limit)
+    return min(fractions) if fractions else None
+
+
+class AdaptiveLimiter:
+    """
+    AIMD control of the scheduler's concurrency from upstream feedback
+
+    Additive increase: while the scheduler is saturated (calls are waiting
+    for a slot) and the rate-limit headers show more than headroom of every
+    quota left, each successful call raises the limit by 1/limit, i.e. by
+    about one slot per round of calls. Multiplicative decrease: a 429 or
+    529 response, or headers showing less than low_water of a quota left,
+    multiply the limit by decrease_factor - at most once per cooldown, so a
+    burst of throttled calls from the same moment only counts once. After
+    a retry-after the limit is not raised again before that time.
+    """
+
+    def __init__(
+        self,
+        scheduler: PriorityScheduler,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        decrease_factor: float = 0.5,
+        headroom: float = 0.2,
+        low_water: float = 0.05,
+        cooldown: float = 5.0
+    ):
+        """
+        Args:
+            scheduler: Scheduler whose max_concurrency is adjusted (its current
+                value is the starting limit)
+            min_concurrency: Lowest limit
+            max_concurrency: Highest limit
+            decrease_factor: Multiplier applied on throttling
+            headroom: Remaining quota fraction required for increases
+            low_water: Remaining quota fraction that triggers a decrease
+            cooldown: Minimum seconds between two decreases
+        """
+        self.scheduler = scheduler
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.headroom = headroom
+        self.low_water = low_water
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._limit = float(min(max(scheduler.max_concurrency, min_concurrency), max_concurrency))
+        self._last_decrease = 0.0
+        self._hold_until = 0.0
+        self._remaining = None
+
+        self.increases = 0
+        self.decreases = 0
+        self.throttled = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def record_response(self, headers):
+        """Feedback from a successful response (its headers)"""
+        fraction = remaining_fraction(headers)
+        now = time.monotonic()
+        with self._lock:
+            if fraction is not None:
+                self._remaining = fraction
+                if fraction < self.low_water:
+                    self._decrease(now)
+                    return
+                if fraction < self.headroom:
+                    return
+
+            if now < self._hold_until or not self.scheduler.saturated():
+                return
+            before = self.limit
+            self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            if self.limit != before:
+                self.increases += 1
+                self.scheduler.set_capacity(self.limit)
+
+    def record_error(self, error: BaseException):
+        """Feedback from a failed call; 429 and 529 shrink the limit"""
+        response = getattr(error, 'response', None)
+        if getattr(response, 'status_code', None) not in (429, 529):
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.throttled += 1
+            self._remaining = remaining_fraction(response.headers)
+            try:
+                self._hold_until = max(self._hold_until, now + float(response.headers.get('retry-after')))
+            except (TypeError, ValueError):
+                pass
+            self._decrease(now)
+
+    def stats(self) -> Dict:
+        """Current limit and AIMD counters (exposed through /health)"""
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'min_concurrency': self.min_concurrency,
+                'max_concurrency': self.max_concurrency,
+                'remaining_fraction': round(self._remaining, 3) if self._remaining is not None else None,
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'throttled': self.throttled,
+                'hold_seconds': round(max(0.0, self._hold_until - time.monotonic()), 1)
+            }
+
+    def _decrease(self, now: float):
+        """Multiplicative decrease (lock held)"""
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_concurrency), self._limit * self.decrease_factor)
+        self.decreases += 1
+        self.scheduler.set_capacity(self.limit)
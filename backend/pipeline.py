@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List
+
+from copy_generator import CopyGenerator
+from scheduler import use_priority
+from scraper import VigoShopScraper
+
+# End-of-stage marker passed through the queues
+_DONE = object()
+
+
+class ScrapeGeneratePipeline:
+    """
+    Two-stage scrape -> generate pipeline over many product URLs
+
+    Scrape workers fetch products and hand them to generate workers through
+    a bounded queue, so scraping of the next products overlaps with
+    generation of the current ones. When the queue is full the scrapers
+    block (backpressure): at most queue_size scraped products wait for the
+    LLM stage at any time. Results are yielded in completion order.
+    Generations run in the scheduler's 'pipeline' traffic class.
+    """
+
+    def __init__(
+        self,
+        scraper: VigoShopScraper,
+        generator: CopyGenerator,
+        scrape_workers: int = 4,
+        generate_workers: int = 4,
+        queue_size: int = 8
+    ):
+        """
+        Args:
+            scraper: Scraper used for the first stage
+            generator: Copy generator used for the second stage
+            scrape_workers: Concurrent scrapes
+            generate_workers: Concurrent generations
+            queue_size: Scraped products that may wait for generation
+        """
+        self.scraper = scraper
+        self.generator = generator
+        self.scrape_workers = scrape_workers
+        self.generate_workers = generate_workers
+        self.queue_size = queue_size
+
+    def run(self, urls: List[str], **generation_args) -> Iterator[Dict]:
+        """
+        Scrape and generate copy for every URL
+
+        Args:
+            urls: Product URLs from vigoshop.si
+            **generation_args: market, objective and the optional arguments of
+                CopyGenerator.generate_ad_copy_with_meta (except the product fields)
+
+        Yields:
+            One result per URL as soon as it is finished:
+            {"index", "url", "success", "product", "data", "meta", "timing_ms"},
+            or {"index", "url", "success": false, "stage", "error", "timing_ms"}
+        """
+        pending = queue.Queue()
+        for item in enumerate(urls):
+            pending.put(item)
+
+        scraped = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue()
+        stop = threading.Event()
+
+        def put(target: queue.Queue, item) -> bool:
+            """Blocking put that gives up once the consumer has gone away"""
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scrape_worker():
+            while not stop.is_set():
+                try:
+                    index, url = pending.get_nowait()
+                except queue.Empty:
+                    break
+                started = time.perf_counter()
+                try:
+                    product = self.scraper.scrape_product(url)
+                except Exception as e:
+                    results.put({
+                        'index': index,
+                        'url': url,
+                        'success': False,
+                        'stage': 'scrape',
+                        'error': str(e),
+                        'timing_ms': {'scrape': _elapsed_ms(started)}
+                    })
+                    continue
+                if not put(scraped, (index, url, product, _elapsed_ms(started), time.perf_counter())):
+                    break
+
+        def generate_worker():
+            while not stop.is_set():
+                try:
+                    item = scraped.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                index, url, product, scrape_ms, queued_at = item
+                timing = {'scrape': scrape_ms, 'queued': _elapsed_ms(queued_at)}
+                started = time.perf_counter()
+                try:
+                    with use_priority('pipeline'):
+                        variants, meta = self.generator.generate_ad_copy_with_meta(
+                            product_name=product.get('name', ''),
+                            price=product.get('price', ''),
+                            features=product.get('features', ''),
+                            description=product.get('description', ''),
+                            **generation_args
+                        )
+                    result = {
+                        'index': index,
+                        'url': url,
+                        'success': True,
+                        'product': product,
+                        'data': variants,
+                        'meta': meta
+                    }
+                except Exception as e:
+                    result = {
+                        'index': index,
+                        'url': url,
+                        'success': False,
+                        'stage': 'generate',
+                        'error': str(e),
+                        'product': product
+                    }
+                timing['generate'] = _elapsed_ms(started)
+                result['timing_ms'] = timing
+                results.put(result)
+            results.put(_DONE)
+
+        scrapers = [threading.Thread(target=scrape_worker, daemon=True) for _ in range(self.scrape_workers)]
+        generators = [threading.Thread(target=generate_worker, daemon=True) for _ in range(self.generate_workers)]
+
+        def close_scrape_stage():
+            for thread in scrapers:
+                thread.join()
+            for _ in generators:
+                put(scraped, _DONE)
+
+        for thread in scrapers + generators:
+            thread.start()
+        threading.Thread(target=close_scrape_stage, daemon=True).start()
+
+        try:
+            # Generate workers only finish after every scraper has, so scrape
+            # failures are always queued before the last _DONE
+            finished = 0
+            while finished < len(generators):
+                item = results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                yield item
+        finally:
+            # Also runs when the client disconnects mid-stream
+            stop.set()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -0,0 +1,252 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import anthropic
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Claude while the circuit breaker is open"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when too little of the request budget is left for another attempt"""
+
+
+class Deadline:
+    """Absolute point in time a request has to be finished by"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient upstream failures: connection errors, timeouts, 429, 5xx (incl. 529 overloaded)"""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.RateLimitError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait (retry-after header), if any"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker around the Anthropic client
+
+    closed: calls pass. After failure_threshold consecutive transient
+    failures the breaker opens and rejects calls immediately for
+    reset_timeout seconds. Then it is half-open: a single probe call is let
+    through and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (claims the probe slot when half-open)"""
+        with self._lock:
+            if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = 'half_open'
+                self._probe_in_flight = False
+
+            if self._state == 'closed':
+                return True
+            if self._state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = 'closed'
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                if self._state != 'open':
+                    self.times_opened += 1
+                self._state = 'open'
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Give back a probe slot without an upstream verdict (e.g. a 400 response)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict:
+        """Breaker state for monitoring (exposed through /health)"""
+        state = self.state
+        with self._lock:
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic() if state == 'open' else 0.0
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout_seconds': self.reset_timeout,
+                'retry_in_seconds': round(max(0.0, retry_in), 1),
+                'times_opened': self.times_opened,
+                'rejected': self.rejected
+            }
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff that never outlives the request deadline
+
+    Attempt n (0-based) waits a random time in [0, min(max_delay,
+    base_delay * 2^n)] ("full jitter"), or at least the server's retry-after.
+    A retry is only made if the wait still leaves min_attempt_seconds of
+    the budget for the attempt itself.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 4.0,
+        min_attempt_seconds: float = 2.0
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_attempt_seconds = min_attempt_seconds
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(
+        self,
+        attempt_fn: Callable[[float], Any],
+        deadline: Deadline,
+        breaker: Optional[CircuitBreaker] = None
+    ) -> Any:
+        """
+        Call attempt_fn(timeout) with retries
+
+        Args:
+            attempt_fn: Makes one attempt; receives the seconds left in the budget
+            deadline: Request deadline shared by all attempts and backoff sleeps
+            breaker: Circuit breaker consulted before and updated after each attempt
+
+        Raises:
+            CircuitOpenError: If the breaker rejects an attempt
+            DeadlineExceeded: If the budget is exhausted before an attempt
+        """
+        attempt = 0
+        while True:
+            timeout = self._before_attempt(deadline, breaker)
+            try:
+                result = attempt_fn(timeout)
+            except Exception as e:
+                delay = self._after_failure(attempt, e, deadline, breaker)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # KeyboardInterrupt, GeneratorExit...: no verdict, but never keep the probe slot
+                if breaker:
+                    breaker.release()
+                raise
+            if breaker:
+                breaker.record_success()
+            return result
+
+    async def call_async(
+        self,
+        attempt_fn: Callable[[float], Awaitable[Any]],
+        deadline: Deadline,
+        breaker: Optional[CircuitBreaker] = None
+    ) -> Any:
+        """Async counterpart of call(); attempt_fn returns an awaitable"""
+        attempt = 0
+        while True:
+            timeout = self._before_attempt(deadline, breaker)
+            try:
+                result = await attempt_fn(timeout)
+            except Exception as e:
+                delay = self._after_failure(attempt, e, deadline, breaker)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled (hedge lost, best-of stopped, client gone): give the probe slot back
+                if breaker:
+                    breaker.release()
+                raise
+            if breaker:
+                breaker.record_success()
+            return result
+
+    def _before_attempt(self, deadline: Deadline, breaker: Optional[CircuitBreaker]) -> float:
+        timeout = deadline.remaining()
+        if timeout <= 0:
+            raise DeadlineExceeded(f"Request deadline of {deadline.seconds}s exceeded")
+        if breaker and not breaker.allow():
+            raise CircuitOpenError("Circuit breaker open - Claude API calls are paused")
+        return timeout
+
+    def _after_failure(
+        self,
+        attempt: int,
+        error: BaseException,
+        deadline: Deadline,
+        breaker: Optional[CircuitBreaker]
+    ) -> float:
+        """Record a failed attempt and return the backoff, or re-raise if we should give up"""
+        if not is_retryable(error) or isinstance(error, DeadlineExceeded):
+            # DeadlineExceeded: the budget ran out before the call reached the API
+            if breaker:
+                breaker.release()
+            raise error
+
+        if breaker:
+            breaker.record_failure()
+
+        delay = self.backoff(attempt, error)
+        if attempt + 1 >= self.max_attempts or deadline.remaining() - delay < self.min_attempt_seconds:
+            raise error
+        return delay
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class ModelRouter:
+    """
+    Latency-SLO aware model router
+
+    Keeps a rolling window of call latencies and outcomes per model. A
+    request names its preferred model and a latency budget; if the
+    preferred model's recent p95 would miss the budget, or its error rate is
+    too high, the request is routed to the next model in the downgrade
+    chain. Samples expire after window_seconds, so a downgraded model is
+    tried again once its bad samples have aged out.
+    """
+
+    def __init__(
+        self,
+        downgrades: Optional[Dict[str, List[str]]] = None,
+        window_seconds: float = 300.0,
+        max_samples: int = 200,
+        min_samples: int = 10,
+        max_error_rate: float = 0.5,
+        percentile: float = 0.95
+    ):
+        """
+        Args:
+            downgrades: Model ID -> fallback model IDs, fastest last
+            window_seconds: Age after which samples are forgotten
+            max_samples: Samples kept per model
+            min_samples: Samples needed before a model can be judged
+            max_error_rate: Error rate at which a model is avoided
+            percentile: Latency percentile compared against the budget
+        """
+        self.downgrades = downgrades or {}
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.percentile = percentile
+        self._samples = {}  # model -> deque of (timestamp, latency_seconds, ok)
+        self._downgraded = {}
+        self._lock = threading.Lock()
+
+    def route(self, model: str, budget_ms: Optional[float] = None) -> Tuple[str, Optional[str]]:
+        """
+        Pick the model that should serve a request
+
+        Args:
+            model: Preferred (resolved) model ID
+            budget_ms: Latency budget of the request (None = only avoid failing models)
+
+        Returns:
+            (model ID, reason) where reason is None, 'latency' or 'errors'
+        """
+        chain = [model] + self.downgrades.get(model, [])
+        reason = None
+        estimates = []
+
+        for candidate in chain:
+            error_rate, latency = self._estimate(candidate)
+            if error_rate is not None and error_rate >= self.max_error_rate:
+                reason = reason or 'errors'
+                continue
+            if budget_ms is not None and latency is not None and latency * 1000 > budget_ms:
+                reason = reason or 'latency'
+                estimates.append((latency, candidate))
+                continue
+            break
+        else:
+            # Nothing fits: take the fastest healthy option, else the last resort
+            candidate = min(estimates)[1] if estimates else chain[-1]
+
+        if candidate != model:
+            with self._lock:
+                self._downgraded[model] = self._downgraded.get(model, 0) + 1
+            return candidate, reason
+        return model, None
+
+    def record(self, model: str, latency_seconds: float, ok: bool):
+        """Record the outcome of one call to model"""
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.max_samples)
+            samples.append((time.monotonic(), latency_seconds, ok))
+
+    def stats(self) -> Dict:
+        """Per-model latency and error rates (exposed through /health)"""
+        result = {}
+        with self._lock:
+            models = list(self._samples)
+        for model in models:
+            recent = self._recent(model)
+            latencies = sorted(latency for _, latency, ok in recent if ok)
+            result[model] = {
+                'samples': len(recent),
+                'error_rate': round(sum(1 for _, _, ok in recent if not ok) / len(recent), 3) if recent else None,
+                'p50_ms': round(_percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+                'p95_ms': round(_percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+                'downgraded': self._downgraded.get(model, 0)
+            }
+        return result
+
+    def _estimate(self, model: str) -> Tuple[Optional[float], Optional[float]]:
+        """(error rate, latency percentile in seconds), None where there are too few samples"""
+        recent = self._recent(model)
+        if len(recent) < self.min_samples:
+            return None, None
+
+        error_rate = sum(1 for _, _, ok in recent if not ok) / len(recent)
+        latencies = sorted(latency for _, latency, ok in recent if ok)
+        if len(latencies) < self.min_samples:
+            return error_rate, None
+        return error_rate, _percentile(latencies, self.percentile)
+
+    def _recent(self, model: str) -> List[Tuple[float, float, bool]]:
+        """Samples of model younger than the window"""
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = self._samples.get(model)
+            if not samples:
+                return []
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+            return list(samples)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    return sorted_values[int(percentile * (len(sorted_values) - 1))]
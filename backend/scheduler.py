@@ -0,0 +1,274 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+# Traffic classes: lower priority numbers are always served first; classes
+# sharing a priority split the capacity by weight (in tokens). max_share
+# caps the share of the concurrency a class may hold, so some slots stay
+# free for interactive requests arriving while bulk work runs.
+DEFAULT_CLASSES = {
+    'interactive': {'priority': 0, 'weight': 1.0, 'max_share': 1.0},
+    'pipeline': {'priority': 1, 'weight': 3.0, 'max_share': 0.75},
+    'bulk': {'priority': 1, 'weight': 1.0, 'max_share': 0.75}
+}
+
+# Class of the generation running in the current context (set by bulk callers)
+PRIORITY = contextvars.ContextVar('generation_priority', default='interactive')
+
+
+@contextmanager
+def use_priority(priority: str):
+    """Run the generations inside the block in the given traffic class"""
+    token = PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        PRIORITY.reset(token)
+
+
+class SchedulerTimeout(TimeoutError):
+    """Raised when a request waited longer for a slot than its timeout"""
+
+
+class _Waiter:
+    __slots__ = ('priority', 'tokens', 'start', 'finish', 'enqueued', 'granted', 'event', 'future', 'loop')
+
+    def __init__(self, priority: str, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        self.event = None
+        self.future = None
+        self.loop = None
+
+
+class PriorityScheduler:
+    """
+    Admission control in front of the Claude calls
+
+    Every call holds a slot while it runs. Slots are limited by a global
+    concurrency and an in-flight token budget (estimated input + max_tokens).
+    Waiting calls are queued per class: a free slot always goes to the
+    highest priority class with waiters, so interactive requests overtake
+    any queued bulk work; classes of equal priority are served by weighted
+    fair queuing (start-time fair queuing over the token cost). Works from
+    threads (acquire) and from asyncio code (acquire_async).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_tokens: int = 200000,
+        classes: Optional[Dict[str, Dict]] = None,
+        max_samples: int = 500
+    ):
+        """
+        Args:
+            max_concurrency: Calls allowed in flight at once
+            max_tokens: Estimated tokens allowed in flight at once
+            classes: Class name -> {priority, weight, max_share} (default: DEFAULT_CLASSES)
+            max_samples: Recent queue waits kept per class for the percentiles
+        """
+        self.max_concurrency = max_concurrency
+        self.max_tokens = max_tokens
+        self.classes = classes or DEFAULT_CLASSES
+        self._lock = threading.Lock()
+        self._queues = {name: deque() for name in self.classes}
+        self._levels = sorted({spec['priority'] for spec in self.classes.values()})
+        self._last_finish = {name: 0.0 for name in self.classes}
+        self._virtual_time = 0.0
+        self._in_flight = {name: 0 for name in self.classes}
+        self._tokens_in_flight = 0
+        self._stats = {
+            name: {'granted': 0, 'timed_out': 0, 'tokens_used': 0, 'waits': deque(maxlen=max_samples)}
+            for name in self.classes
+        }
+
+    def acquire(self, priority: str, tokens: int, timeout: Optional[float] = None) -> _Waiter:
+        """
+        Block until the call may run
+
+        Args:
+            priority: Traffic class (unknown classes are treated as bulk)
+            tokens: Estimated tokens of the call
+            timeout: Maximum seconds to wait (None = forever)
+
+        Returns:
+            Ticket to hand to release()
+
+        Raises:
+            SchedulerTimeout: If no slot was granted within timeout
+        """
+        waiter = self._enqueue(priority, tokens)
+        if waiter.granted:
+            return waiter
+
+        with self._lock:
+            # A slot may have been granted before the event existed
+            if waiter.granted:
+                return waiter
+            waiter.event = threading.Event()
+        if not waiter.event.wait(timeout) and not self._withdraw(waiter):
+            raise SchedulerTimeout(f"No {waiter.priority} generation slot within {timeout}s")
+        return waiter
+
+    async def acquire_async(self, priority: str, tokens: int, timeout: Optional[float] = None) -> _Waiter:
+        """Async counterpart of acquire()"""
+        waiter = self._enqueue(priority, tokens)
+        if waiter.granted:
+            return waiter
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if waiter.granted:
+                return waiter
+            waiter.loop = loop
+            waiter.future = loop.create_future()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if not self._withdraw(waiter):
+                raise SchedulerTimeout(f"No {waiter.priority} generation slot within {timeout}s") from None
+        except asyncio.CancelledError:
+            if self._withdraw(waiter):
+                # Granted while we were being cancelled: give the slot back
+                self.release(waiter)
+            raise
+        return waiter
+
+    def release(self, waiter: _Waiter, tokens_used: Optional[int] = None):
+        """Free the slot of a finished call (tokens_used: actual usage, for stats)"""
+        with self._lock:
+            self._in_flight[waiter.priority] -= 1
+            self._tokens_in_flight -= waiter.tokens
+            if tokens_used is not None:
+                self._stats[waiter.priority]['tokens_used'] += tokens_used
+            self._dispatch()
+
+    def set_capacity(self, max_concurrency: int):
+        """Change the concurrency limit (e.g. from an AdaptiveLimiter); running calls are not affected"""
+        with self._lock:
+            self.max_concurrency = max(1, int(max_concurrency))
+            self._dispatch()
+
+    def saturated(self) -> bool:
+        """Whether calls are waiting or every slot is taken"""
+        with self._lock:
+            return any(self._queues.values()) or sum(self._in_flight.values()) >= self.max_concurrency
+
+    @contextmanager
+    def slot(self, priority: str, tokens: int, timeout: Optional[float] = None):
+        """Hold a slot for the duration of the block"""
+        waiter = self.acquire(priority, tokens, timeout)
+        try:
+            yield waiter
+        finally:
+            self.release(waiter)
+
+    @asynccontextmanager
+    async def slot_async(self, priority: str, tokens: int, timeout: Optional[float] = None):
+        """Async counterpart of slot()"""
+        waiter = await self.acquire_async(priority, tokens, timeout)
+        try:
+            yield waiter
+        finally:
+            self.release(waiter)
+
+    def stats(self) -> Dict:
+        """Capacity use and per-class queue depth and wait times (exposed through /health)"""
+        with self._lock:
+            classes = {}
+            for name, stats in self._stats.items():
+                waits = sorted(stats['waits'])
+                classes[name] = {
+                    'queued': len(self._queues[name]),
+                    'in_flight': self._in_flight[name],
+                    'granted': stats['granted'],
+                    'timed_out': stats['timed_out'],
+                    'tokens_used': stats['tokens_used'],
+                    'wait_p50_ms': round(waits[int(0.5 * (len(waits) - 1))] * 1000, 1) if waits else None,
+                    'wait_p95_ms': round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else None,
+                    'oldest_wait_ms': round(
+                        (time.perf_counter() - self._queues[name][0].enqueued) * 1000, 1
+                    ) if self._queues[name] else 0.0
+                }
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_tokens': self.max_tokens,
+                'in_flight': sum(self._in_flight.values()),
+                'tokens_in_flight': self._tokens_in_flight,
+                'classes': classes
+            }
+
+    def _enqueue(self, priority: str, tokens: int) -> _Waiter:
+        if priority not in self.classes:
+            priority = 'bulk' if 'bulk' in self.classes else max(self.classes, key=lambda c: self.classes[c]['priority'])
+        waiter = _Waiter(priority, max(1, int(tokens)))
+
+        with self._lock:
+            # Start-time fair queuing: tags advance by cost / weight per class
+            waiter.start = max(self._virtual_time, self._last_finish[priority])
+            waiter.finish = waiter.start + waiter.tokens / self.classes[priority]['weight']
+            self._last_finish[priority] = waiter.finish
+            self._queues[priority].append(waiter)
+            self._dispatch()
+        return waiter
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Remove a waiter that gave up; True if it had been granted meanwhile"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queues[waiter.priority].remove(waiter)
+            self._stats[waiter.priority]['timed_out'] += 1
+            # The waiter may have been blocking the head of the queue
+            self._dispatch()
+            return False
+
+    def _class_limit(self, name: str) -> int:
+        return max(1, int(self.max_concurrency * self.classes[name].get('max_share', 1.0)))
+
+    def _dispatch(self):
+        """Grant slots to queued waiters while capacity is left (lock held)"""
+        while sum(self._in_flight.values()) < self.max_concurrency:
+            waiter = None
+            for level in self._levels:
+                heads = [
+                    queue[0] for name, queue in self._queues.items()
+                    if queue and self.classes[name]['priority'] == level and self._in_flight[name] < self._class_limit(name)
+                ]
+                if heads:
+                    waiter = min(heads, key=lambda head: head.finish)
+                    break
+            if waiter is None:
+                return
+
+            # Never skip the chosen waiter for a smaller one (it would starve);
+            # a call larger than the whole budget still runs when nothing else does
+            if self._tokens_in_flight + waiter.tokens > self.max_tokens and self._tokens_in_flight > 0:
+                return
+
+            self._queues[waiter.priority].popleft()
+            self._virtual_time = max(self._virtual_time, waiter.start)
+            self._in_flight[waiter.priority] += 1
+            self._tokens_in_flight += waiter.tokens
+            stats = self._stats[waiter.priority]
+            stats['granted'] += 1
+            stats['waits'].append(time.perf_counter() - waiter.enqueued)
+
+            waiter.granted = True
+            if waiter.event is not None:
+                waiter.event.set()
+            if waiter.future is not None:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
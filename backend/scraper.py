@@ -1,47 +1,278 @@
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from lxml import etree
+import lxml.html
 import re
+import threading
+import time
+
+from cache import TTLCache, canonicalize_url
+from selector_stats import SelectorStats
+from structured_data import extract_structured_data
+
+# CSS selectors tried (in order) for each product field
+NAME_SELECTORS = ['h1.product_title', 'h1.entry-title', '.product-title', 'h1']
+PRICE_SELECTORS = [
+    '.woocommerce-Price-amount.amount',
+    'span.price ins .woocommerce-Price-amount',
+    'span.price .woocommerce-Price-amount',
+    '.price',
+]
+IMAGE_SELECTORS = [
+    '.woocommerce-product-gallery__image img',
+    '.product-image img',
+    'figure.woocommerce-product-gallery__wrapper img',
+    '.product-images img'
+]
+SHORT_DESCRIPTION = '.woocommerce-product-details__short-description'
+FEATURE_SELECTORS = [
+    SHORT_DESCRIPTION,
+    '.product-short-description',
+    '.entry-summary .woocommerce-product-details__short-description',
+    '#tab-description'
+]
+DESCRIPTION_SELECTORS = [SHORT_DESCRIPTION, '#tab-description', '.product-description']
+BREADCRUMB_SELECTOR = '.woocommerce-breadcrumb a'
+
+# Selectors adaptive ordering may move: alternatives for different theme
+# markups, which match the same node when several of them match. The others
+# (generic fallbacks like 'h1' and '.price', nested price selectors, and the
+# description sections, which hold different text) keep their place after
+# them, so learned ordering never changes which node a field is read from.
+REORDERABLE_SELECTORS = {
+    'name': ['h1.product_title', 'h1.entry-title', '.product-title'],
+    'image_url': IMAGE_SELECTORS
+}
+
+PRICE_RE = re.compile(r'[\d,\.]+\s*€')
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+def css_to_xpath(selector: str) -> str:
+    """
+    Translate a simple CSS selector to XPath
+
+    Supports the subset used by the scraper: tag names, .class, #id and
+    the descendant combinator (e.g. 'span.price ins .amount').
+    """
+    steps = []
+    for part in selector.split():
+        match = re.fullmatch(r'([\w-]*)((?:[.#][\w-]+)*)', part)
+        if not match:
+            raise ValueError(f"Unsupported selector: {selector}")
+
+        predicates = []
+        for kind, name in re.findall(r'([.#])([\w-]+)', match.group(2)):
+            if kind == '.':
+                predicates.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')")
+            else:
+                predicates.append(f"@id='{name}'")
+
+        steps.append((match.group(1) or '*') + ''.join(f'[{p}]' for p in predicates))
+
+    return '//' + '//'.join(steps)
+
+
+def css_to_self_xpath(selector: str) -> str:
+    """
+    Translate a simple CSS selector to an XPath testing the context element itself
+
+    'a .b img' becomes self::img[ancestor::*[.b][ancestor::a]], which lets the
+    streaming reader check each element as soon as it has been parsed.
+    """
+    steps = css_to_xpath(selector)[2:].split('//')
+    expression = steps[0]
+    for step in steps[1:-1]:
+        expression = f'{step}[ancestor::{expression}]'
+    if len(steps) == 1:
+        return f'self::{expression}'
+    return f'self::{steps[-1]}[ancestor::{expression}]'
+
+
+# Selectors compiled once at import: first match (document order) and all matches
+_ALL_SELECTORS = set(
+    NAME_SELECTORS + PRICE_SELECTORS + IMAGE_SELECTORS + FEATURE_SELECTORS + DESCRIPTION_SELECTORS
+    + [BREADCRUMB_SELECTOR]
+)
+_FIRST_XPATHS = {s: etree.XPath(f'({css_to_xpath(s)})[1]') for s in _ALL_SELECTORS}
+_ALL_XPATHS = {s: etree.XPath(css_to_xpath(s)) for s in _ALL_SELECTORS}
+
+# Streaming mode stops reading once an element matching each stop selector has
+# been closed: the preferred (first tried) selector of the first-match chains,
+# plus these sections - the last features/description section and the
+# breadcrumb trail
+STOP_SECTIONS = ['#tab-description', '.woocommerce-breadcrumb']
+FIRST_MATCH_CHAINS = {
+    'name': NAME_SELECTORS,
+    'price': PRICE_SELECTORS,
+    'image_url': IMAGE_SELECTORS,
+    'description': DESCRIPTION_SELECTORS
+}
+_STOP_MATCHERS = {
+    s: etree.XPath(f'boolean({css_to_self_xpath(s)})')
+    for s in set(NAME_SELECTORS + PRICE_SELECTORS + IMAGE_SELECTORS + DESCRIPTION_SELECTORS + STOP_SECTIONS)
+}
+
+# Visible text nodes (same strings BeautifulSoup's get_text() returns)
+_TEXT_NODES = etree.XPath('descendant-or-self::text()[not(ancestor::script or ancestor::style)]')
+
+
+def node_text(node) -> str:
+    """Equivalent of BeautifulSoup's get_text(strip=True) for an lxml element"""
+    return ''.join(text.strip() for text in _TEXT_NODES(node))
+
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None) -> str:
+    """Pick the page encoding from the Content-Type header, a <meta> tag or UTF-8 validity"""
+    if content_type and 'charset=' in content_type.lower():
+        return content_type.lower().split('charset=')[-1].split(';')[0].strip(' "\'')
+
+    match = CHARSET_RE.search(content[:4096])
+    if match:
+        return match.group(1).decode('ascii').lower()
+
+    try:
+        content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of a streamed chunk is still UTF-8
+        if e.reason == 'unexpected end of data':
+            return 'utf-8'
+        return 'windows-1252'
+
+
+class ProductPage:
+    """
+    Parsed product page with memoized selector lookups
+
+    Each selector is evaluated at most once per page with a precompiled
+    XPath over the raw lxml tree, so nodes shared between fields (such as
+    the short description used for features and description) are found once.
+    """
+
+    def __init__(self, root, encoding: str = 'utf-8'):
+        self.root = root
+        self.encoding = encoding
+        self._first = {}
+        self._text = {}
+
+    @classmethod
+    def from_bytes(cls, content: bytes, encoding: str = 'utf-8') -> 'ProductPage':
+        """Parse raw page bytes"""
+        parser = lxml.html.HTMLParser(encoding=encoding)
+        try:
+            root = lxml.html.document_fromstring(content, parser=parser)
+        except (etree.ParserError, ValueError, LookupError):
+            root = lxml.html.document_fromstring('<html><body></body></html>')
+        return cls(root, encoding)
+
+    def first(self, selector: str):
+        """First element matching selector, or None"""
+        if selector not in self._first:
+            matches = _FIRST_XPATHS[selector](self.root)
+            self._first[selector] = matches[0] if matches else None
+        return self._first[selector]
+
+    def all(self, selector: str) -> List:
+        """All elements matching selector, in document order"""
+        return _ALL_XPATHS[selector](self.root)
+
+    def text(self, selector: str) -> str:
+        """Stripped text of the first element matching selector ('' if none)"""
+        if selector not in self._text:
+            node = self.first(selector)
+            self._text[selector] = node_text(node) if node is not None else ''
+        return self._text[selector]
+
 
 class VigoShopScraper:
     """Scraper for vigoshop.si product pages"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: int = 10,
+        max_validators: int = 2000,
+        cache: Optional[TTLCache] = None,
+        stream: bool = False,
+        max_body_bytes: int = 2_000_000,
+        chunk_size: int = 16384,
+        selector_stats: Optional[SelectorStats] = None,
+        allowed_domain: str = 'vigoshop.si'
+    ):
+        """
+        Args:
+            pool_size: Maximum number of keep-alive connections kept per host
+            timeout: Request timeout in seconds (in streaming mode also the
+                total time allowed for reading the body)
+            max_validators: Maximum number of URLs to remember ETag/Last-Modified for
+            cache: Optional product cache keyed by canonical URL
+            stream: Read pages chunk by chunk into an incremental parser and stop
+                as soon as all product fields have been seen
+            max_body_bytes: Maximum number of body bytes read in streaming mode
+            chunk_size: Size of the chunks read in streaming mode
+            selector_stats: Optional hit statistics used to try the most
+                successful selector of each fallback chain first
+            allowed_domain: Domain product URLs must belong to
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.cache = cache
+        self.stream = stream
+        self.max_body_bytes = max_body_bytes
+        self.chunk_size = chunk_size
+        self.selector_stats = selector_stats
+        self.allowed_domain = allowed_domain
+
+        # Pooled keep-alive session so repeated scrapes reuse the TCP/TLS connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # url -> {'etag', 'last_modified', 'product'} for conditional GETs
+        self.max_validators = max_validators
+        self._validators = OrderedDict()
+        self._validators_lock = threading.Lock()
 
-    def scrape_product(self, url: str) -> Dict:
+    def scrape_product(self, url: str, use_cache: bool = True) -> Dict:
         """
         Scrape product information from vigoshop.si URL
 
         Args:
             url: Product URL from vigoshop.si
+            use_cache: Serve from the product cache if possible (conditional
+                GETs are still used when False)
 
         Returns:
             Dictionary with product data
         """
+        if not use_cache:
+            return self._scrape_uncached(url)
+        return self._cached(url, lambda: self._scrape_uncached(url))
+
+    def _scrape_uncached(self, url: str) -> Dict:
+        """Fetch and parse a product page, bypassing the product cache"""
         try:
             # Validate URL
-            if 'vigoshop.si' not in url:
-                raise ValueError("URL must be from vigoshop.si")
-
-            # Fetch page
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'lxml')
-
-            # Extract product data
-            product_data = {
-                'url': url,
-                'name': self._extract_name(soup),
-                'price': self._extract_price(soup),
-                'image_url': self._extract_image(soup),
-                'features': self._extract_features(soup),
-                'description': self._extract_description(soup),
-                'category': self._extract_category(url, soup)
-            }
+            if self.allowed_domain not in url:
+                raise ValueError(f"URL must be from {self.allowed_domain}")
+
+            response, cached = self._fetch(url)
+            if cached is not None:
+                return cached
+
+            content, page = self._read_body(response)
+            product_data = self._parse_product(url, content, response.headers.get('Content-Type'), page)
+            self._store_validators(url, response, product_data)
 
             return product_data
 
@@ -50,127 +281,416 @@ class VigoShopScraper:
         except Exception as e:
             raise Exception(f"Failed to scrape product: {str(e)}")
 
-    def _extract_name(self, soup: BeautifulSoup) -> str:
+    def _cached(self, url: str, loader) -> Dict:
+        """Serve url from the product cache (if configured), loading it on a miss"""
+        if self.cache is None:
+            return loader()
+
+        product_data = self.cache.get_or_load(canonicalize_url(url), loader)
+        # Copy so callers can't mutate the cached entry; keep the URL as requested
+        return dict(product_data, url=url)
+
+    def scrape_batch(
+        self,
+        urls: List[str],
+        max_workers: int = 16,
+        per_host_limit: Optional[int] = None,
+        parse_workers: int = 4
+    ) -> Dict:
+        """
+        Scrape many product URLs concurrently
+
+        Fetches run on a thread pool with at most per_host_limit requests in
+        flight per host; parsing runs on a separate, smaller worker pool.
+        A failing URL is reported in its own result and never fails the batch.
+
+        Args:
+            urls: Product URLs from vigoshop.si
+            max_workers: Maximum number of concurrent fetches overall
+            per_host_limit: Maximum concurrent fetches per host (defaults to pool size)
+            parse_workers: Number of workers parsing fetched pages
+
+        Returns:
+            Dictionary with per-URL results (in input order) and timings
+        """
+        per_host_limit = per_host_limit or self.pool_size
+        host_limits = {}
+        host_limits_lock = threading.Lock()
+
+        def host_limit(url: str) -> threading.Semaphore:
+            host = urlparse(url).netloc.lower()
+            with host_limits_lock:
+                if host not in host_limits:
+                    host_limits[host] = threading.Semaphore(per_host_limit)
+                return host_limits[host]
+
+        def scrape_one(url: str) -> Dict:
+            started = time.perf_counter()
+            result = {'url': url}
+            timing = {'fetch': 0.0, 'parse': 0.0}
+
+            def load() -> Dict:
+                if self.allowed_domain not in url:
+                    raise ValueError(f"URL must be from {self.allowed_domain}")
+
+                fetch_started = time.perf_counter()
+                with host_limit(url):
+                    try:
+                        response, cached = self._fetch(url)
+                        if cached is None:
+                            content, page = self._read_body(response)
+                    finally:
+                        timing['fetch'] = (time.perf_counter() - fetch_started) * 1000
+
+                if cached is not None:
+                    return cached
+
+                parse_started = time.perf_counter()
+                product_data = parse_pool.submit(
+                    self._parse_product, url, content, response.headers.get('Content-Type'), page
+                ).result()
+                timing['parse'] = (time.perf_counter() - parse_started) * 1000
+                self._store_validators(url, response, product_data)
+                return product_data
+
+            try:
+                result.update({'success': True, 'data': self._cached(url, load)})
+            except requests.RequestException as e:
+                result.update({'success': False, 'error': f"Failed to fetch product page: {str(e)}"})
+            except Exception as e:
+                result.update({'success': False, 'error': f"Failed to scrape product: {str(e)}"})
+
+            result['timing_ms'] = {
+                'fetch': round(timing['fetch'], 1),
+                'parse': round(timing['parse'], 1),
+                'total': round((time.perf_counter() - started) * 1000, 1)
+            }
+            return result
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, parse_workers)) as parse_pool, \
+                ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls) or 1))) as fetch_pool:
+            results = list(fetch_pool.map(scrape_one, urls))
+
+        succeeded = sum(1 for result in results if result['success'])
+        return {
+            'results': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _fetch(self, url: str) -> Tuple[Optional[requests.Response], Optional[Dict]]:
+        """
+        Fetch a product page, using a conditional GET when validators are known
+
+        Returns:
+            (response, None) for a fresh page, or (None, product) when the server
+            answered 304 and the previously parsed product is still valid
+        """
+        response = self.session.get(
+            url, headers=self._conditional_headers(url), timeout=self.timeout, stream=self.stream
+        )
+
+        if response.status_code == 304:
+            response.close()
+            cached = self._cached_product(url)
+            if cached is not None:
+                return None, cached
+            # Validators were evicted in the meantime - fetch unconditionally
+            response = self.session.get(url, timeout=self.timeout, stream=self.stream)
+
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+        return response, None
+
+    def _read_body(self, response: requests.Response) -> Tuple[bytes, Optional[ProductPage]]:
+        """
+        Read the response body
+
+        Outside streaming mode this is just response.content. In streaming mode
+        the body is read in chunks and fed to an incremental parser; reading
+        stops once every stop selector has been closed, max_body_bytes is
+        reached or the timeout has elapsed, and the page parsed so far is
+        returned alongside the bytes read.
+        """
+        if not self.stream:
+            return response.content, None
+
+        started = time.monotonic()
+        chunks = []
+        size = 0
+        parser = None
+        pending = self._stop_selectors()
+
+        try:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if parser is None:
+                    encoding = detect_encoding(chunk, response.headers.get('Content-Type'))
+                    parser = etree.HTMLPullParser(events=('end',), encoding=encoding)
+
+                chunk = chunk[:self.max_body_bytes - size]
+                chunks.append(chunk)
+                size += len(chunk)
+                parser.feed(chunk)
+
+                for _, element in parser.read_events():
+                    for selector in [s for s in pending if _STOP_MATCHERS[s](element)]:
+                        pending.discard(selector)
+
+                if not pending or size >= self.max_body_bytes or time.monotonic() - started > self.timeout:
+                    break
+        finally:
+            # Closing early drops the connection instead of draining the rest of the body
+            response.close()
+
+        content = b''.join(chunks)
+        if parser is None:
+            return content, None
+
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            return content, None
+        return content, ProductPage(root, encoding)
+
+    def _parse_product(
+        self,
+        url: str,
+        content: bytes,
+        content_type: Optional[str] = None,
+        page: Optional[ProductPage] = None
+    ) -> Dict:
+        """
+        Parse a product page and extract product data
+
+        Args:
+            url: Product URL
+            content: Raw page bytes
+            content_type: Content-Type header of the response
+            page: Already parsed page (streaming mode), parsed from content if omitted
+        """
+        product_data, _ = self._extract_fields(url, content, content_type, page)
+        return product_data
+
+    def _extract_fields(
+        self,
+        url: str,
+        content: bytes,
+        content_type: Optional[str] = None,
+        page: Optional[ProductPage] = None
+    ) -> Tuple[Dict, Dict]:
+        """
+        Extract product data and the source of every field
+
+        Fields available as JSON-LD/OpenGraph structured data are taken from
+        there; the DOM is only parsed for the fields that are still missing.
+
+        Returns:
+            (product_data, field_sources), where field_sources maps each field
+            to 'json_ld', 'og' or 'dom'
+        """
+        encoding = page.encoding if page is not None else detect_encoding(content, content_type)
+        structured = extract_structured_data(content, encoding)
+
+        extractors = {
+            'name': self._extract_name,
+            'price': self._extract_price,
+            'image_url': self._extract_image,
+            'features': self._extract_features,
+            'description': self._extract_description,
+            'category': lambda page: self._extract_category(url, page)
+        }
+
+        product_data = {'url': url}
+        field_sources = {}
+        for field, extract in extractors.items():
+            if field in structured:
+                product_data[field], field_sources[field] = structured[field]
+                continue
+
+            if page is None:
+                page = ProductPage.from_bytes(content, encoding)
+            product_data[field] = extract(page)
+            field_sources[field] = 'dom'
+
+        return product_data, field_sources
+
+    def _conditional_headers(self, url: str) -> Dict:
+        """Build If-None-Match / If-Modified-Since headers from stored validators"""
+        with self._validators_lock:
+            entry = self._validators.get(url)
+            if not entry:
+                return {}
+            self._validators.move_to_end(url)
+
+            headers = {}
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            return headers
+
+    def _cached_product(self, url: str) -> Optional[Dict]:
+        """Return a copy of the product stored alongside the validators for url"""
+        with self._validators_lock:
+            entry = self._validators.get(url)
+            if not entry:
+                return None
+            return dict(entry['product'])
+
+    def _store_validators(self, url: str, response: requests.Response, product_data: Dict):
+        """Remember ETag/Last-Modified and the parsed product for the next conditional GET"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        with self._validators_lock:
+            self._validators[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'product': dict(product_data)
+            }
+            self._validators.move_to_end(url)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+
+    def _ordered(self, field: str, selectors: List[str]) -> List[str]:
+        """
+        Candidate selectors for field, most successful first when stats are enabled
+
+        Only REORDERABLE_SELECTORS are sorted by hit rate; the rest of the
+        chain follows them in its hand-written order.
+        """
+        reorderable = REORDERABLE_SELECTORS.get(field, [])
+        if self.selector_stats is None or not reorderable:
+            return selectors
+        alternatives = [selector for selector in selectors if selector in reorderable]
+        fallbacks = [selector for selector in selectors if selector not in reorderable]
+        return self.selector_stats.order(field, alternatives) + fallbacks
+
+    def _stop_selectors(self) -> set:
+        """Selectors streaming waits for: the one tried first for each first-match field, plus STOP_SECTIONS"""
+        return {self._ordered(field, selectors)[0] for field, selectors in FIRST_MATCH_CHAINS.items()} | set(STOP_SECTIONS)
+
+    def _record(self, field: str, selector: str, hit: bool):
+        """Record a selector attempt for adaptive ordering"""
+        if self.selector_stats is not None:
+            self.selector_stats.record(field, selector, hit)
+
+    def _record_field(self, field: str, found: bool):
+        """Record whether field was extracted from the DOM at all"""
+        if self.selector_stats is not None:
+            self.selector_stats.record_field(field, found)
+
+    def _extract_name(self, page: ProductPage) -> str:
         """Extract product name"""
-        # Try multiple selectors
-        selectors = [
-            'h1.product_title',
-            'h1.entry-title',
-            '.product-title',
-            'h1'
-        ]
-
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element and element.get_text(strip=True):
-                return element.get_text(strip=True)
+        for selector in self._ordered('name', NAME_SELECTORS):
+            text = page.text(selector)
+            self._record('name', selector, bool(text))
+            if text:
+                self._record_field('name', True)
+                return text
 
+        self._record_field('name', False)
         return "Unknown Product"
 
-    def _extract_price(self, soup: BeautifulSoup) -> str:
+    def _extract_price(self, page: ProductPage) -> str:
         """Extract product price"""
-        # Try WooCommerce price selectors
-        price_selectors = [
-            '.woocommerce-Price-amount.amount',
-            'span.price ins .woocommerce-Price-amount',
-            'span.price .woocommerce-Price-amount',
-            '.price',
-        ]
-
-        for selector in price_selectors:
-            element = soup.select_one(selector)
-            if element:
-                price_text = element.get_text(strip=True)
-                # Extract just the number and currency
-                match = re.search(r'[\d,\.]+\s*€', price_text)
-                if match:
-                    return match.group(0)
+        for selector in self._ordered('price', PRICE_SELECTORS):
+            # Extract just the number and currency
+            match = PRICE_RE.search(page.text(selector))
+            self._record('price', selector, match is not None)
+            if match:
+                self._record_field('price', True)
+                return match.group(0)
 
+        self._record_field('price', False)
         return "Price not found"
 
-    def _extract_image(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_image(self, page: ProductPage) -> Optional[str]:
         """Extract main product image URL"""
-        # Try multiple image selectors
-        image_selectors = [
-            '.woocommerce-product-gallery__image img',
-            '.product-image img',
-            'figure.woocommerce-product-gallery__wrapper img',
-            '.product-images img'
-        ]
-
-        for selector in image_selectors:
-            img = soup.select_one(selector)
-            if img:
+        for selector in self._ordered('image_url', IMAGE_SELECTORS):
+            img = page.first(selector)
+            img_url = None
+            if img is not None:
                 # Try different attributes
                 for attr in ['data-src', 'src', 'data-lazy-src']:
-                    img_url = img.get(attr)
-                    if img_url and img_url.startswith('http'):
-                        return img_url
+                    value = img.get(attr)
+                    if value and value.startswith('http'):
+                        img_url = value
+                        break
 
+            self._record('image_url', selector, img_url is not None)
+            if img_url:
+                self._record_field('image_url', True)
+                return img_url
+
+        self._record_field('image_url', False)
         return None
 
-    def _extract_features(self, soup: BeautifulSoup) -> str:
-        """Extract product features/highlights"""
+    def _extract_features(self, page: ProductPage) -> str:
+        """
+        Extract product features/highlights
+
+        Features of every matching section are concatenated, so the sections
+        are always read in FEATURE_SELECTORS order (learned ordering could
+        only reshuffle the output). Hits are still recorded for
+        /stats/selectors.
+        """
         features = []
 
         # Look for features in common sections
-        feature_sections = [
-            '.woocommerce-product-details__short-description',
-            '.product-short-description',
-            '.entry-summary .woocommerce-product-details__short-description',
-            '#tab-description'
-        ]
-
-        for selector in feature_sections:
-            section = soup.select_one(selector)
-            if section:
+        for selector in FEATURE_SELECTORS:
+            section = page.first(selector)
+            found = []
+            if section is not None:
                 # Extract list items if present
-                list_items = section.find_all('li')
+                list_items = list(section.iterdescendants('li'))
                 if list_items:
-                    features.extend([li.get_text(strip=True) for li in list_items[:5]])
+                    found = [node_text(li) for li in list_items[:5]]
                 else:
                     # Get paragraph text
-                    paragraphs = section.find_all('p')
+                    paragraphs = list(section.iterdescendants('p'))
                     for p in paragraphs[:3]:
-                        text = p.get_text(strip=True)
+                        text = node_text(p)
                         if text and len(text) > 10:
-                            features.append(text)
+                            found.append(text)
+
+            self._record('features', selector, bool(found))
+            features.extend(found)
 
         if not features:
             # Try to get any description text
-            desc = soup.select_one('.woocommerce-product-details__short-description')
-            if desc:
-                text = desc.get_text(strip=True)
-                if text:
-                    # Split into sentences and take first few
-                    sentences = text.split('.')[:3]
-                    features = [s.strip() + '.' for s in sentences if s.strip()]
+            text = page.text(SHORT_DESCRIPTION)
+            if text:
+                # Split into sentences and take first few
+                sentences = text.split('.')[:3]
+                features = [s.strip() + '.' for s in sentences if s.strip()]
 
+        self._record_field('features', bool(features))
         return ' | '.join(features) if features else "No features available"
 
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+    def _extract_description(self, page: ProductPage) -> str:
         """Extract full product description"""
-        desc_selectors = [
-            '.woocommerce-product-details__short-description',
-            '#tab-description',
-            '.product-description'
-        ]
-
-        for selector in desc_selectors:
-            element = soup.select_one(selector)
-            if element:
-                text = element.get_text(strip=True)
-                if text:
-                    return text[:500]  # Limit to 500 chars
+        for selector in self._ordered('description', DESCRIPTION_SELECTORS):
+            text = page.text(selector)
+            self._record('description', selector, bool(text))
+            if text:
+                self._record_field('description', True)
+                return text[:500]  # Limit to 500 chars
 
+        self._record_field('description', False)
         return "No description available"
 
-    def _extract_category(self, url: str, soup: BeautifulSoup) -> str:
+    def _extract_category(self, url: str, page: ProductPage) -> str:
         """Extract product category"""
         # Try breadcrumbs
-        breadcrumbs = soup.select('.woocommerce-breadcrumb a')
+        breadcrumbs = page.all(BREADCRUMB_SELECTOR)
         if breadcrumbs and len(breadcrumbs) > 1:
-            return breadcrumbs[-1].get_text(strip=True)
+            return node_text(breadcrumbs[-1])
 
         # Try from URL
         if '/kategorija-izdelka/' in url:
@@ -0,0 +1,231 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent saves are not serialized
+    fcntl = None
+
+
+class SelectorStats:
+    """
+    Per-selector hit statistics used to reorder the scraper's fallback chains
+
+    Every time a selector is tried for a field its attempt is counted, and
+    a hit is counted when it produced a value. order() returns the candidate
+    selectors sorted by smoothed hit rate, so the selector that currently
+    works for the site's markup is tried first. Counts are halved once they
+    reach window attempts, so after a markup change the old hits fade
+    instead of outvoting the new ones forever.
+
+    Stats are persisted as JSON so the learned order survives restarts.
+    Several processes (gunicorn workers) may share the file: a save adds
+    the attempts recorded since the previous save to what is on disk,
+    under a file lock, and adopts the merged totals.
+    """
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 100, window: int = 1000):
+        """
+        Args:
+            path: JSON file the stats are loaded from and saved to (None = memory only)
+            save_every: Save after this many recorded attempts (and at exit)
+            window: Attempts at which a selector's (or field's) counts are halved
+        """
+        self.path = path
+        self.save_every = save_every
+        self.window = window
+        self._selectors = {}  # field -> selector -> [attempts, hits]
+        self._fields = {}     # field -> [extractions, found]
+        # Counts recorded since the last save, merged into the file by save()
+        self._new_selectors = {}
+        self._new_fields = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self.load()
+        if self.path:
+            atexit.register(self.save)
+
+    def order(self, field: str, selectors: List[str]) -> List[str]:
+        """
+        Return selectors sorted by hit rate, most successful first
+
+        Uses (hits + 1) / (attempts + 2) so untried selectors keep a neutral
+        rate; ties keep the original (hand-written) priority order.
+        """
+        with self._lock:
+            stats = self._selectors.get(field, {})
+            rates = {}
+            for selector in selectors:
+                attempts, hits = stats.get(selector, (0, 0))
+                rates[selector] = (hits + 1) / (attempts + 2)
+        return sorted(selectors, key=lambda selector: -rates[selector])
+
+    def record(self, field: str, selector: str, hit: bool):
+        """Record one attempt of selector for field"""
+        with self._lock:
+            for selectors in (self._selectors, self._new_selectors):
+                counts = selectors.setdefault(field, {}).setdefault(selector, [0, 0])
+                counts[0] += 1
+                if hit:
+                    counts[1] += 1
+            self._decay(self._selectors[field][selector])
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def record_field(self, field: str, found: bool):
+        """Record whether any selector produced a value for field"""
+        with self._lock:
+            for fields in (self._fields, self._new_fields):
+                counts = fields.setdefault(field, [0, 0])
+                counts[0] += 1
+                if found:
+                    counts[1] += 1
+            self._decay(self._fields[field])
+
+    def snapshot(self) -> Dict:
+        """Current order and hit rates per field (served by /stats/selectors)"""
+        with self._lock:
+            fields = {}
+            for field in sorted(set(self._selectors) | set(self._fields)):
+                extractions, found = self._fields.get(field, (0, 0))
+                selectors = [
+                    {
+                        'selector': selector,
+                        'attempts': attempts,
+                        'hits': hits,
+                        'hit_rate': round(hits / attempts, 3) if attempts else None
+                    }
+                    for selector, (attempts, hits) in self._selectors.get(field, {}).items()
+                ]
+                selectors.sort(key=lambda item: -(item['hits'] + 1) / (item['attempts'] + 2))
+                fields[field] = {
+                    'extractions': extractions,
+                    'found_rate': round(found / extractions, 3) if extractions else None,
+                    'selectors': selectors
+                }
+            return fields
+
+    def load(self):
+        """Load persisted stats, ignoring a missing or corrupt file"""
+        if not self.path:
+            return
+
+        selectors, fields = self._read()
+        with self._lock:
+            self._selectors = _merge_selectors(selectors, self._new_selectors)
+            self._fields = _merge_fields(fields, self._new_fields)
+
+    def save(self):
+        """Add the counts recorded since the last save to the file and adopt the merged totals"""
+        if not self.path:
+            return
+
+        with self._lock:
+            idle = not self._new_selectors and not self._new_fields
+        if idle:
+            # Nothing to add: adopt the other processes' counts, never create the file
+            self.load()
+            return
+
+        with self._lock:
+            new_selectors, new_fields = self._new_selectors, self._new_fields
+            self._new_selectors, self._new_fields = {}, {}
+            self._unsaved = 0
+
+        try:
+            with self._file_lock():
+                selectors, fields = self._read()
+                selectors = _merge_selectors(selectors, new_selectors)
+                fields = _merge_fields(fields, new_fields)
+                for counts in _all_counts(selectors, fields):
+                    self._decay(counts)
+
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump({'selectors': selectors, 'fields': fields}, f)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Failed to save selector stats to {self.path}: {e}")
+            with self._lock:
+                # Keep the counts for the next save
+                self._new_selectors = _merge_selectors(new_selectors, self._new_selectors)
+                self._new_fields = _merge_fields(new_fields, self._new_fields)
+            return
+
+        with self._lock:
+            # Other processes' counts plus whatever was recorded during the save
+            self._selectors = _merge_selectors(selectors, self._new_selectors)
+            self._fields = _merge_fields(fields, self._new_fields)
+
+    def _read(self) -> Tuple[Dict, Dict]:
+        """Stats stored at path as (selectors, fields); empty if missing or corrupt"""
+        if not os.path.exists(self.path):
+            return {}, {}
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to load selector stats from {self.path}: {e}")
+            return {}, {}
+
+        selectors = {
+            field: {selector: list(counts) for selector, counts in field_selectors.items()}
+            for field, field_selectors in data.get('selectors', {}).items()
+        }
+        fields = {field: list(counts) for field, counts in data.get('fields', {}).items()}
+        return selectors, fields
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock serializing read-merge-write cycles of all processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _decay(self, counts: List[int]):
+        """Halve [attempts, hits] once attempts reach the window"""
+        while counts[0] >= self.window > 1:
+            counts[0] //= 2
+            counts[1] //= 2
+
+
+def _merge_selectors(base: Dict, new: Dict) -> Dict:
+    """base + new for field -> selector -> [attempts, hits] (returns a new dict)"""
+    merged = {field: {selector: list(counts) for selector, counts in selectors.items()} for field, selectors in base.items()}
+    for field, selectors in new.items():
+        for selector, (attempts, hits) in selectors.items():
+            counts = merged.setdefault(field, {}).setdefault(selector, [0, 0])
+            counts[0] += attempts
+            counts[1] += hits
+    return merged
+
+
+def _merge_fields(base: Dict, new: Dict) -> Dict:
+    """base + new for field -> [extractions, found] (returns a new dict)"""
+    merged = {field: list(counts) for field, counts in base.items()}
+    for field, (extractions, found) in new.items():
+        counts = merged.setdefault(field, [0, 0])
+        counts[0] += extractions
+        counts[1] += found
+    return merged
+
+
+def _all_counts(selectors: Dict, fields: Dict):
+    for field_selectors in selectors.values():
+        yield from field_selectors.values()
+    yield from fields.values()
@@ -0,0 +1,195 @@
+import html
+import json
+import re
+from typing import Dict, List, Tuple
+
+# Lightweight tokenizer: only <meta> tags and <script> openings are recognised,
+# everything else in the page is skipped without building a DOM
+TAG_RE = re.compile(rb'<(meta|script)\b([^>]*)>', re.IGNORECASE)
+ATTR_RE = re.compile(rb'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+SCRIPT_END_RE = re.compile(rb'</script\s*>', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _attributes(raw: bytes, encoding: str) -> Dict[str, str]:
+    """Parse the attributes of a tag into a lowercase-keyed dict"""
+    attrs = {}
+    for match in ATTR_RE.finditer(raw):
+        value = match.group(2) or match.group(3) or match.group(4) or b''
+        attrs[match.group(1).decode('ascii', 'ignore').lower()] = html.unescape(value.decode(encoding, 'replace'))
+    return attrs
+
+
+def _tokenize(content: bytes, encoding: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Collect OpenGraph/product meta tags and JSON-LD script bodies
+
+    Returns:
+        (meta property -> content, list of JSON-LD source strings)
+    """
+    meta = {}
+    json_ld = []
+
+    position = 0
+    while True:
+        match = TAG_RE.search(content, position)
+        if not match:
+            break
+        position = match.end()
+
+        attrs = _attributes(match.group(2), encoding)
+        if match.group(1).lower() == b'meta':
+            key = attrs.get('property') or attrs.get('name')
+            if key and 'content' in attrs and key.lower() not in meta:
+                meta[key.lower()] = attrs['content']
+            continue
+
+        end = SCRIPT_END_RE.search(content, position)
+        if not end:
+            break
+        if attrs.get('type', '').lower() == 'application/ld+json':
+            json_ld.append(content[position:end.start()].decode(encoding, 'replace'))
+        position = end.end()
+
+    return meta, json_ld
+
+
+def _json_ld_nodes(sources: List[str]) -> List[Dict]:
+    """Flatten JSON-LD documents (including @graph containers) into a list of nodes"""
+    nodes = []
+    pending = []
+    for source in sources:
+        try:
+            pending.append(json.loads(source))
+        except ValueError:
+            continue
+
+    while pending:
+        item = pending.pop(0)
+        if isinstance(item, list):
+            pending.extend(item)
+        elif isinstance(item, dict):
+            nodes.append(item)
+            if isinstance(item.get('@graph'), list):
+                pending.extend(item['@graph'])
+
+    return nodes
+
+
+def _has_type(node: Dict, type_name: str) -> bool:
+    types = node.get('@type')
+    return type_name in types if isinstance(types, list) else types == type_name
+
+
+def _clean_text(value) -> str:
+    """Strip markup and collapse whitespace in a structured-data text value"""
+    if not isinstance(value, str):
+        return ''
+    return WHITESPACE_RE.sub(' ', HTML_TAG_RE.sub(' ', html.unescape(value))).strip()
+
+
+def _position(item: Dict) -> int:
+    """Sort key for BreadcrumbList items"""
+    try:
+        return int(item.get('position', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _format_price(amount, currency) -> str:
+    """Format a numeric price the way vigoshop.si displays it (19,99€)"""
+    if currency and str(currency).upper() != 'EUR':
+        return ''
+    try:
+        return f"{float(str(amount).replace(',', '.')):.2f}".replace('.', ',') + '€'
+    except ValueError:
+        return ''
+
+
+def _first_url(value) -> str:
+    """Pick the first absolute URL from a JSON-LD image value (string, list or ImageObject)"""
+    if isinstance(value, list):
+        for item in value:
+            url = _first_url(item)
+            if url:
+                return url
+        return ''
+    if isinstance(value, dict):
+        return _first_url(value.get('url') or value.get('contentUrl'))
+    if isinstance(value, str) and value.startswith('http'):
+        return value
+    return ''
+
+
+def extract_structured_data(content: bytes, encoding: str = 'utf-8') -> Dict[str, Tuple[str, str]]:
+    """
+    Extract product fields from JSON-LD and OpenGraph data without a DOM parse
+
+    Args:
+        content: Raw page bytes
+        encoding: Page encoding
+
+    Returns:
+        Dictionary field -> (value, source) for every field found, where
+        source is 'json_ld' or 'og'. Fields that are missing are left out.
+    """
+    meta, json_ld = _tokenize(content, encoding)
+    nodes = _json_ld_nodes(json_ld)
+    product = next((node for node in nodes if _has_type(node, 'Product')), {})
+    breadcrumbs = next((node for node in nodes if _has_type(node, 'BreadcrumbList')), {})
+
+    fields = {}
+
+    name = _clean_text(product.get('name'))
+    if name:
+        fields['name'] = (name, 'json_ld')
+    elif meta.get('og:title'):
+        title = _clean_text(meta['og:title'])
+        site_name = meta.get('og:site_name')
+        if site_name and title.endswith(f' - {site_name}'):
+            title = title[:-len(f' - {site_name}')]
+        if title:
+            fields['name'] = (title, 'og')
+
+    offers = product.get('offers')
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    if isinstance(offers, dict):
+        price = _format_price(offers.get('price', offers.get('lowPrice', '')), offers.get('priceCurrency'))
+        if price:
+            fields['price'] = (price, 'json_ld')
+    if 'price' not in fields:
+        price = _format_price(
+            meta.get('product:price:amount', meta.get('og:price:amount', '')),
+            meta.get('product:price:currency', meta.get('og:price:currency'))
+        )
+        if price:
+            fields['price'] = (price, 'og')
+
+    image_url = _first_url(product.get('image'))
+    if image_url:
+        fields['image_url'] = (image_url, 'json_ld')
+    elif _first_url(meta.get('og:image')):
+        fields['image_url'] = (meta['og:image'], 'og')
+
+    description = _clean_text(product.get('description'))
+    if description:
+        fields['description'] = (description[:500], 'json_ld')
+    elif _clean_text(meta.get('og:description')):
+        fields['description'] = (_clean_text(meta['og:description'])[:500], 'og')
+
+    # Last breadcrumb is the product itself; the one before it is its category
+    items = breadcrumbs.get('itemListElement')
+    if isinstance(items, list):
+        items = sorted((item for item in items if isinstance(item, dict)), key=_position)
+        if len(items) > 2:
+            crumb = items[-2]
+            category = crumb.get('name')
+            if not category and isinstance(crumb.get('item'), dict):
+                category = crumb['item'].get('name')
+            category = _clean_text(category)
+            if category:
+                fields['category'] = (category, 'json_ld')
+
+    return fields
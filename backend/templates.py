@@ -0,0 +1,404 @@
+"""
+Localized template copy for degraded mode (no Claude call)
+
+Templates exist per market (SI, DE, IT, AT, HR, BA; anything else gets
+English) with the CTA chosen per ad objective. They are parsed into
+literal/placeholder parts once at import, so rendering is a handful of
+string joins. Body lines carry a priority: when the copy doesn't fit
+max_chars, the least important lines are dropped first and only then is
+text cut at a word boundary, then the hook and finally the CTA, so
+character_count is always the real length and never above max_chars (the
+two blank lines between the parts always count, so the smallest limit that
+can be met is 4).
+"""
+from string import Formatter
+from typing import Dict, List, Tuple
+
+ANGLES = ('pain_point', 'benefit', 'social_proof')
+OBJECTIVES = ('Awareness', 'Conversion', 'Engagement')
+DEFAULT_OBJECTIVE = 'Conversion'
+
+# market -> {angle: {hook, lines: [(priority, text)]}, cta: {objective: text}, feature}
+# Priority 0 lines are always kept; higher numbers are dropped first when over the limit.
+TEMPLATES = {
+    'EN': {
+        'pain_point': {
+            'hook': "Tired of waiting weeks for products from China?",
+            'lines': [
+                (0, "Get your {product_name} delivered in just 2-3 days from our EU warehouse! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ 100% money-back guarantee"),
+                (4, "💪 Thousands of satisfied customers across Europe"),
+                (2, "Just {price} with free shipping. 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Imagine getting premium quality in just 2-3 days...",
+            'lines': [
+                (0, "Your {product_name} arrives fast from our EU warehouse - no customs, no delays! 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Save time - no month-long waiting"),
+                (3, "✅ Verified 5-star reviews"),
+                (2, "Limited stock at {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Join 10,000+ happy customers across Europe!",
+            'lines': [
+                (0, "The {product_name} everyone's talking about! ⭐"),
+                (3, "\"Best purchase this year - arrived in 2 days!\" - Real customer"),
+                (4, "🔥 Fast 2-3 day EU shipping"),
+                (1, "🎯 {feature}"),
+                (2, "Only {price}. Don't miss out! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Learn More 👉",
+            'Conversion': "Shop Now - Fast EU Delivery! 👉",
+            'Engagement': "Tag a friend who needs this! 👇"
+        },
+        'feature': "Premium quality"
+    },
+    'SI': {
+        'pain_point': {
+            'hook': "Ste naveličani tedenskega čakanja na paket iz Kitajske?",
+            'lines': [
+                (0, "{product_name} vam dostavimo v 2-3 dneh iz skladišča v EU! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ 100% garancija vračila denarja"),
+                (4, "💪 Tisoči zadovoljnih kupcev po Sloveniji"),
+                (2, "Samo {price}. Ni problema! 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Predstavljajte si, da je vaš paket doma že v 2-3 dneh!",
+            'lines': [
+                (0, "{product_name} hitro iz skladišča v EU – brez carine, brez čakanja. 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Prihranite čas – brez mesečnega čakanja"),
+                (3, "✅ Preverjene ocene kupcev"),
+                (2, "Omejena zaloga po {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Pridružite se tisočim zadovoljnim kupcem po Sloveniji!",
+            'lines': [
+                (0, "{product_name}, o katerem vsi govorijo! ⭐"),
+                (3, "\"Najboljši nakup letos – prispel v 2 dneh!\" – Maja iz Ljubljane"),
+                (4, "🔥 Hitra dostava v 2-3 dneh iz EU"),
+                (1, "🎯 {feature}"),
+                (2, "Samo {price}. Ne zamudite! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Več o izdelku 👉",
+            'Conversion': "Naročite zdaj – hitra dostava! 👇",
+            'Engagement': "Označite prijatelja, ki to potrebuje! 👇"
+        },
+        'feature': "Vrhunska kakovost"
+    },
+    'DE': {
+        'pain_point': {
+            'hook': "Keine Lust mehr, wochenlang auf Pakete aus China zu warten?",
+            'lines': [
+                (0, "{product_name} kommt in 2-3 Tagen aus unserem EU-Lager! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ 100% Geld-zurück-Garantie"),
+                (4, "💪 Tausende zufriedene Kunden in Europa"),
+                (2, "Nur {price} – warum mehr zahlen? 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Stellen Sie sich vor: Ihr Paket ist in 2-3 Tagen da.",
+            'lines': [
+                (0, "{product_name} schnell aus dem EU-Lager – kein Zoll, keine Wartezeit. 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Zeit sparen statt wochenlang warten"),
+                (3, "✅ Geprüfte Kundenbewertungen"),
+                (2, "Begrenzter Vorrat zu {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Tausende Kunden in Europa vertrauen bereits darauf!",
+            'lines': [
+                (0, "{product_name} – alle sprechen darüber! ⭐"),
+                (3, "\"Bester Kauf des Jahres – in 2 Tagen da!\" – Anna aus München"),
+                (4, "🔥 Schneller Versand in 2-3 Tagen aus der EU"),
+                (1, "🎯 {feature}"),
+                (2, "Nur {price}. Nicht verpassen! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Mehr erfahren 👉",
+            'Conversion': "Jetzt einkaufen – schnelle EU-Lieferung! 👇",
+            'Engagement': "Markieren Sie jemanden, der das braucht! 👇"
+        },
+        'feature': "Premium-Qualität"
+    },
+    'AT': {
+        'pain_point': {
+            'hook': "Genug vom ewigen Warten auf Pakete aus China?",
+            'lines': [
+                (0, "{product_name} kommt in 2-3 Tagen aus unserem EU-Lager zu dir! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ Verlässlich: 100% Geld-zurück-Garantie"),
+                (4, "💪 Tausende zufriedene Kunden in Österreich"),
+                (2, "Nur {price} – gleich bestellen! 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Stell dir vor: Dein Paket ist in 2-3 Tagen daheim.",
+            'lines': [
+                (0, "{product_name} flott aus dem EU-Lager – kein Zoll, kein Warten. 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Spar dir wochenlanges Warten"),
+                (3, "✅ Geprüfte Bewertungen"),
+                (2, "Nur solange der Vorrat reicht: {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Tausende Österreicher sind schon begeistert!",
+            'lines': [
+                (0, "{product_name} – alle reden davon! ⭐"),
+                (3, "\"Super Kauf – nach 2 Tagen war's da!\" – Lisa aus Wien"),
+                (4, "🔥 Flotte Lieferung in 2-3 Tagen aus der EU"),
+                (1, "🎯 {feature}"),
+                (2, "Nur {price}. Nicht verpassen! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Mehr erfahren 👉",
+            'Conversion': "Jetzt bestellen – schnell geliefert! 👇",
+            'Engagement': "Markier jemanden, der das braucht! 👇"
+        },
+        'feature': "Premium-Qualität"
+    },
+    'IT': {
+        'pain_point': {
+            'hook': "Stanco di aspettare settimane per un pacco dalla Cina?",
+            'lines': [
+                (0, "{product_name} arriva in 2-3 giorni dal nostro magazzino UE! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ Soddisfatti o rimborsati al 100%"),
+                (4, "💪 Migliaia di famiglie soddisfatte in Europa"),
+                (2, "Solo {price}. La soluzione perfetta! 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Immagina di ricevere il tuo pacco in soli 2-3 giorni!",
+            'lines': [
+                (0, "{product_name} spedito veloce dal magazzino UE – niente dogana, niente attese. 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Più tempo per te e la tua famiglia"),
+                (3, "✅ Recensioni verificate"),
+                (2, "Scorte limitate a {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Migliaia di famiglie in Europa lo adorano già!",
+            'lines': [
+                (0, "{product_name}, quello di cui parlano tutti! ⭐"),
+                (3, "\"Il miglior acquisto dell'anno – arrivato in 2 giorni!\" – Giulia da Milano"),
+                (4, "🔥 Spedizione veloce in 2-3 giorni dall'UE"),
+                (1, "🎯 {feature}"),
+                (2, "Solo {price}. Per la tua famiglia! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Scopri di più 👉",
+            'Conversion': "Ordina ora – consegna rapida! 👇",
+            'Engagement': "Tagga chi ne ha bisogno! 👇"
+        },
+        'feature': "Qualità premium"
+    },
+    'HR': {
+        'pain_point': {
+            'hook': "Dosta vam je tjednima čekati paket iz Kine?",
+            'lines': [
+                (0, "{product_name} stiže za 2-3 dana iz našeg skladišta u EU! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ 100% jamstvo povrata novca"),
+                (4, "💪 Tisuće zadovoljnih kupaca u Hrvatskoj"),
+                (2, "Samo {price}. Bez brige! 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Zamislite da vam paket stigne za samo 2-3 dana!",
+            'lines': [
+                (0, "{product_name} brzo iz skladišta u EU – bez carine i čekanja. 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Uštedite vrijeme – bez mjesečnog čekanja"),
+                (3, "✅ Provjerene recenzije kupaca"),
+                (2, "Ograničene zalihe po {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Pridružite se tisućama zadovoljnih kupaca!",
+            'lines': [
+                (0, "{product_name} o kojem svi pričaju! ⭐"),
+                (3, "\"Najbolja kupnja ove godine – stiglo za 2 dana!\" – Ivana iz Zagreba"),
+                (4, "🔥 Brza dostava za 2-3 dana iz EU"),
+                (1, "🎯 {feature}"),
+                (2, "Samo {price}. Ne propustite! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Saznajte više 👉",
+            'Conversion': "Naručite odmah – brza dostava! 👇",
+            'Engagement': "Označite prijatelja kojem ovo treba! 👇"
+        },
+        'feature': "Vrhunska kvaliteta"
+    },
+    'BA': {
+        'pain_point': {
+            'hook': "Dosadilo vam je sedmicama čekati paket iz Kine?",
+            'lines': [
+                (0, "{product_name} stiže za 2-3 dana iz našeg skladišta u EU! 🚀"),
+                (1, "🎯 {feature}"),
+                (3, "✅ 100% garancija povrata novca"),
+                (4, "💪 Hiljade zadovoljnih kupaca u BiH"),
+                (2, "Samo {price}. Bez brige! 🎁")
+            ]
+        },
+        'benefit': {
+            'hook': "Zamislite da vam paket stigne za samo 2-3 dana!",
+            'lines': [
+                (0, "{product_name} brzo iz skladišta u EU – bez dugog čekanja. 😊"),
+                (1, "🎯 {feature}"),
+                (4, "⏱️ Uštedite vrijeme – nema više mjesečnog čekanja"),
+                (3, "✅ Provjerene recenzije kupaca"),
+                (2, "Ograničene zalihe po {price}! 💎")
+            ]
+        },
+        'social_proof': {
+            'hook': "Pridružite se hiljadama zadovoljnih kupaca!",
+            'lines': [
+                (0, "{product_name} o kojem svi pričaju! ⭐"),
+                (3, "\"Najbolja kupovina ove godine – stiglo za 2 dana!\" – Amra iz Sarajeva"),
+                (4, "🔥 Brza dostava za 2-3 dana iz EU"),
+                (1, "🎯 {feature}"),
+                (2, "Samo {price}. Ne propustite! 🎁")
+            ]
+        },
+        'cta': {
+            'Awareness': "Saznajte više 👉",
+            'Conversion': "Naručite odmah – brza dostava! 👇",
+            'Engagement': "Označite prijatelja kome ovo treba! 👇"
+        },
+        'feature': "Vrhunski kvalitet"
+    }
+}
+
+DEFAULT_MARKET = 'EN'
+
+
+def _compile(text: str) -> Tuple[Tuple[str, str], ...]:
+    """Split a template into (literal, placeholder) parts once"""
+    return tuple((literal, field or '') for literal, field, _, _ in Formatter().parse(text))
+
+
+def _render(parts: Tuple[Tuple[str, str], ...], values: Dict[str, str]) -> str:
+    return ''.join([literal + values[field] if field else literal for literal, field in parts])
+
+
+# market -> angle -> (hook parts, [(priority, line parts)], objective -> cta)
+COMPILED = {
+    market: {
+        angle: (
+            _compile(spec[angle]['hook']),
+            [(priority, _compile(line)) for priority, line in spec[angle]['lines']],
+            spec['cta']
+        )
+        for angle in ANGLES
+    }
+    for market, spec in TEMPLATES.items()
+}
+
+
+def render_template_copy(
+    product_name: str,
+    price: str,
+    features: str,
+    market: str,
+    objective: str,
+    max_chars: int = 150
+) -> Dict:
+    """
+    Render the 3 template variants for a product
+
+    Args:
+        product_name: Name of the product
+        price: Product price
+        features: Key features separated by "|" (the first one is used)
+        market: Target market (SI, DE, IT, AT, HR, BA; others get English)
+        objective: Ad objective (Awareness, Conversion, Engagement)
+        max_chars: Maximum character count per variant (hook + body + cta)
+
+    Returns:
+        Dictionary with 3 ad copy variants in the same shape Claude returns
+    """
+    market_key = str(market or '').upper()
+    templates = COMPILED.get(market_key) or COMPILED[DEFAULT_MARKET]
+    objective = objective if objective in OBJECTIVES else DEFAULT_OBJECTIVE
+
+    first_feature = str(features or '').split('|')[0].strip()
+    values = {
+        'product_name': str(product_name or '').strip(),
+        'price': str(price or '').strip(),
+        'feature': first_feature or TEMPLATES.get(market_key, TEMPLATES[DEFAULT_MARKET])['feature']
+    }
+
+    variants = {}
+    for number, angle in enumerate(ANGLES, start=1):
+        hook_parts, line_parts, ctas = templates[angle]
+        hook, body, cta = _fit(
+            _render(hook_parts, values),
+            [(priority, _render(parts, values)) for priority, parts in line_parts],
+            ctas[objective],
+            max_chars
+        )
+        variants[f'variant_{number}'] = {
+            'angle': angle,
+            'hook': hook,
+            'body': body,
+            'cta': cta,
+            'character_count': len(hook) + len(body) + len(cta) + 4
+        }
+
+    return variants
+
+
+def _fit(hook: str, lines: List[Tuple[int, str]], cta: str, max_chars: int) -> Tuple[str, str, str]:
+    """Drop low-priority body lines, then cut body, hook and CTA at word boundaries, until hook\\n\\nbody\\n\\ncta fits"""
+    overhead = len(hook) + len(cta) + 4  # 4 for the blank lines between the parts
+    kept = list(lines)
+    body_length = sum(len(text) for _, text in kept) + len(kept) - 1
+
+    while overhead + body_length > max_chars and len(kept) > 1:
+        drop = max(range(len(kept)), key=lambda index: kept[index][0])
+        if kept[drop][0] == 0:
+            break
+        body_length -= len(kept[drop][1]) + 1
+        del kept[drop]
+
+    body = '\n'.join(text for _, text in kept)
+    if overhead + len(body) <= max_chars:
+        return hook, body, cta
+
+    body = _cut(body, max_chars - overhead)
+    if len(body) < 1:
+        # Not even the hook and CTA fit: shorten the hook, then the CTA
+        hook = _cut(hook, max_chars - len(cta) - 4)
+        cta = _cut(cta, max_chars - len(hook) - 4)
+    return hook, body, cta
+
+
+def _cut(text: str, max_length: int) -> str:
+    """Cut text to max_length at the last word boundary"""
+    if max_length <= 0:
+        return ''
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length]
+    space = max(cut.rfind(' '), cut.rfind('\n'))
+    return (cut[:space] if space > 0 else cut).rstrip(' \n–-,')
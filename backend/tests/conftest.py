@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other as top-level modules (as under gunicorn)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_claude import FakeClaude  # noqa: E402
+from fixture_shop import FixtureServer, product_page  # noqa: E402
+
+
+@pytest.fixture
+def page_bytes():
+    return product_page
+
+
+@pytest.fixture
+def http_server():
+    """Local stand-in for a web site (see fixture_shop.FixtureServer)"""
+    server = FixtureServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def claude(monkeypatch):
+    """Fake Claude API the Anthropic clients created during the test talk to"""
+    server = FakeClaude().start()
+    monkeypatch.setenv('ANTHROPIC_BASE_URL', server.url)
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def api(claude, tmp_path, monkeypatch):
+    """The Flask app module, its services pointed at the fake Claude API and tmp_path"""
+    monkeypatch.setenv('JOBS_DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setenv('SELECTOR_STATS_PATH', str(tmp_path / 'selector_stats.json'))
+    monkeypatch.setenv('JOBS_WORKERS', '0')
+    import app as app_module
+    from async_engine import AsyncGenerationEngine
+    from copy_generator import CopyGenerator
+    from jobs import JobQueue
+    from pipeline import ScrapeGeneratePipeline
+    from scraper import VigoShopScraper
+    from selector_stats import SelectorStats
+
+    generator = CopyGenerator()
+    monkeypatch.setattr(app_module, 'copy_generator', generator)
+    monkeypatch.setattr(app_module, 'generation_engine', AsyncGenerationEngine(generator))
+    monkeypatch.setattr(app_module, 'job_queue', JobQueue(str(tmp_path / 'jobs.db')))
+    monkeypatch.setattr(app_module.scraper, 'selector_stats', SelectorStats(str(tmp_path / 'selector_stats.json')))
+    monkeypatch.setattr(app_module, 'pipeline', ScrapeGeneratePipeline(VigoShopScraper(allowed_domain='127.0.0.1'), generator))
+    app_module.app.config['TESTING'] = True
+    return app_module
@@ -0,0 +1,206 @@
+"""
+Local stand-in for the Claude Messages and Message Batches APIs
+
+Answers POST /v1/messages (plain and streamed), and creates, polls and
+returns the results of message batches, so the real Anthropic SDK and
+the batch client can be exercised without network access or an API key.
+Behaviour is configured through the attributes of FakeClaude.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+ANGLES = ['pain_point', 'benefit', 'social_proof']
+
+
+def variant(number: int, angle: str) -> Dict:
+    return {
+        'angle': angle,
+        'hook': f'Hook {number}: tired of waiting?',
+        'body': f'Body {number} 🔥 Ships from EU warehouse - 2-3 day delivery. Thousands of satisfied customers!',
+        'cta': 'Order now 👇',
+        'character_count': 0
+    }
+
+
+def variants_text(params: Dict) -> str:
+    """Answer with the variants the prompt asks for (all 3, or the ones named after ONLY)"""
+    prompt = params['messages'][0]['content']
+    keys = [f'variant_{number}' for number in (1, 2, 3)]
+    if 'Generate ONLY' in prompt:
+        requested = prompt.split('Generate ONLY', 1)[1].split('of the Facebook', 1)[0]
+        keys = [key for key in keys if key in requested]
+    answer = {key: variant(int(key[-1]), ANGLES[int(key[-1]) - 1]) for key in keys}
+    return '```json\n' + json.dumps(answer, ensure_ascii=False, indent=2) + '\n```'
+
+
+class FakeClaude:
+    """
+    The stand-in server
+
+    Attributes:
+        calls: Request bodies received on /v1/messages
+        text: params -> answer text
+        delay: Seconds before answering (or params -> seconds)
+        failures: Statuses to answer with, one per call, before succeeding (e.g. [529, 429])
+        headers: Extra response headers (e.g. anthropic-ratelimit-*)
+        stream_delay: Seconds between streamed chunks
+        batch_polls: Status polls before a batch has ended
+        batch_errors: custom_ids whose batch result is 'errored'
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.text = variants_text
+        self.delay = 0.0
+        self.failures = []
+        self.headers = {}
+        self.stream_delay = 0.0
+        self.batches = {}
+        self.batch_polls = 2
+        self.batch_errors = set()
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self.path == '/v1/messages/batches':
+                    return self._json(200, fake._create_batch(body))
+                if self.path == '/v1/messages':
+                    return fake._message(self, body)
+                self._json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+            def do_GET(self):
+                prefix = '/v1/messages/batches/'
+                batch = fake.batches.get(self.path[len(prefix):].split('/')[0]) if self.path.startswith(prefix) else None
+                if batch is None:
+                    return self._json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+                if self.path.endswith('/results'):
+                    data = ''.join(json.dumps(line) + '\n' for line in fake._batch_results(batch)).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-jsonl')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+                self._json(200, fake._poll_batch(batch, self.headers['Host']))
+
+            def _json(self, status: int, payload: Dict, headers: Dict = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self) -> 'FakeClaude':
+        threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def message(self, params: Dict) -> Dict:
+        return {
+            'id': f'msg_{len(self.calls)}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': params.get('model'),
+            'content': [{'type': 'text', 'text': self.text(params)}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': 100, 'output_tokens': 50}
+        }
+
+    def _message(self, handler, params: Dict):
+        with self._lock:
+            self.calls.append(params)
+            status = self.failures.pop(0) if self.failures else 200
+        time.sleep(self.delay(params) if callable(self.delay) else self.delay)
+
+        if status != 200:
+            error = {'type': 'error', 'error': {'type': 'overloaded_error', 'message': f'Fake {status}'}}
+            return handler._json(status, error, self.headers)
+        message = self.message(params)
+        if not params.get('stream'):
+            return handler._json(200, message, self.headers)
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        for name, value in self.headers.items():
+            handler.send_header(name, value)
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        handler.close_connection = True
+
+        def event(kind: str, data: Dict):
+            handler.wfile.write(f'event: {kind}\ndata: {json.dumps(data)}\n\n'.encode())
+            handler.wfile.flush()
+
+        text = message['content'][0]['text']
+        try:
+            event('message_start', {'type': 'message_start', 'message': dict(message, content=[])})
+            event('content_block_start', {'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}})
+            for start in range(0, len(text), 20):
+                delta = {'type': 'text_delta', 'text': text[start:start + 20]}
+                event('content_block_delta', {'type': 'content_block_delta', 'index': 0, 'delta': delta})
+                time.sleep(self.stream_delay)
+            event('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+            event('message_delta', {
+                'type': 'message_delta',
+                'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                'usage': {'output_tokens': 50}
+            })
+            event('message_stop', {'type': 'message_stop'})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _create_batch(self, body: Dict) -> Dict:
+        with self._lock:
+            batch_id = f'msgbatch_{len(self.batches) + 1}'
+            self.batches[batch_id] = {
+                'id': batch_id,
+                'type': 'message_batch',
+                'processing_status': 'in_progress',
+                'request_counts': {'processing': len(body['requests'])},
+                'results_url': None,
+                'requests': body['requests'],
+                'polls': 0
+            }
+        return self._public(self.batches[batch_id])
+
+    def _poll_batch(self, batch: Dict, host: str) -> Dict:
+        batch['polls'] += 1
+        if batch['polls'] >= self.batch_polls:
+            batch['processing_status'] = 'ended'
+            batch['results_url'] = f"http://{host}/v1/messages/batches/{batch['id']}/results"
+        return self._public(batch)
+
+    def _batch_results(self, batch: Dict) -> List[Dict]:
+        results = []
+        for request in batch['requests']:
+            if request['custom_id'] in self.batch_errors:
+                result = {'type': 'errored', 'error': {'type': 'overloaded_error', 'message': 'Overloaded'}}
+            else:
+                result = {'type': 'succeeded', 'message': self.message(request['params'])}
+            results.append({'custom_id': request['custom_id'], 'result': result})
+        return results
+
+    @staticmethod
+    def _public(batch: Dict) -> Dict:
+        return {key: value for key, value in batch.items() if key not in ('requests', 'polls')}
@@ -0,0 +1,167 @@
+"""
+Local stand-in for vigoshop.si
+
+Serves robots.txt, a sitemap index, a product sitemap and product pages
+from memory, so the scraper and the crawler can be exercised without
+network access. Used by the tests; can also be run on its own:
+
+    python tests/fixture_shop.py --port 8000
+    python crawler.py --base-url http://127.0.0.1:8000 --allowed-domain 127.0.0.1 --delay 0
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+HTML = {'Content-Type': 'text/html; charset=utf-8'}
+XML = {'Content-Type': 'application/xml'}
+TEXT = {'Content-Type': 'text/plain'}
+
+PRODUCT_BODY = '''
+<nav class="woocommerce-breadcrumb"><a href="/">Domov</a> / <a href="/zdravje/">Zdravje</a> / {name}</nav>
+<div class="summary entry-summary">
+  <h1 class="product_title entry-title">{name}</h1>
+  <p class="price"><span class="woocommerce-Price-amount amount">{price}€</span></p>
+  <div class="woocommerce-product-details__short-description">
+    <ul><li>6 nastavljivih hitrosti</li><li>Tiho delovanje</li><li>Baterija za 6 ur</li></ul>
+  </div>
+</div>
+<div class="woocommerce-product-gallery__image"><img src="https://vigoshop.si/img/gun.jpg"></div>
+<div id="tab-description"><p>Profesionalna masaža doma, kadarkoli želite.</p></div>
+'''
+
+
+def product_page(name: str = 'Masažna pištola Pro', price: str = '39,99', json_ld: bool = True, padding: int = 0) -> bytes:
+    """A vigoshop.si-like product page (optionally without JSON-LD, padded after the product)"""
+    structured = {
+        '@context': 'https://schema.org',
+        '@graph': [
+            {
+                '@type': 'Product',
+                'name': name,
+                'description': '<p>Sprostite mišice v <b>5 minutah</b>.</p>',
+                'image': ['https://vigoshop.si/img/gun.jpg'],
+                'offers': {'@type': 'Offer', 'price': price.replace(',', '.'), 'priceCurrency': 'EUR'}
+            },
+            {
+                '@type': 'BreadcrumbList',
+                'itemListElement': [
+                    {'@type': 'ListItem', 'position': 1, 'name': 'Domov'},
+                    {'@type': 'ListItem', 'position': 2, 'name': 'Zdravje'},
+                    {'@type': 'ListItem', 'position': 3, 'name': name}
+                ]
+            }
+        ]
+    }
+    head = f'<script type="application/ld+json">{json.dumps(structured)}</script>' if json_ld else ''
+    tail = '<p>' + 'x' * padding + '</p>' if padding else ''
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{name}</title>{head}</head>'
+        f'<body>{PRODUCT_BODY.format(name=name, price=price)}{tail}</body></html>'
+    ).encode('utf-8')
+
+
+def sitemap(urls: List[Tuple[str, Optional[str]]]) -> bytes:
+    """<urlset> with (loc, lastmod) entries; an empty loc gives an empty <loc/>"""
+    entries = ''.join(
+        f'<url><loc>{loc}</loc>{f"<lastmod>{lastmod}</lastmod>" if lastmod else ""}</url>' if loc else '<url><loc/></url>'
+        for loc, lastmod in urls
+    )
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+
+def sitemap_index(locs: List[str]) -> bytes:
+    """<sitemapindex> pointing at locs ('' gives an empty <loc/>)"""
+    entries = ''.join(f'<sitemap><loc>{loc}</loc></sitemap>' if loc else '<sitemap><loc/></sitemap>' for loc in locs)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'.encode()
+
+
+def shop_routes(base_url: str) -> Dict[str, Tuple[int, Dict, bytes]]:
+    """
+    A small shop: two products, one product disallowed by robots.txt, and
+    sitemaps that also list an empty <loc/> and off-domain URLs
+    """
+    return {
+        '/robots.txt': (200, TEXT, (
+            'User-agent: *\n'
+            'Disallow: /izdelek/skrito/\n'
+            f'Sitemap: {base_url}/sitemap_index.xml\n'
+        ).encode()),
+        '/sitemap_index.xml': (200, XML, sitemap_index([
+            f'{base_url}/product-sitemap.xml',
+            '',
+            'https://evil.example/sitemap.xml'
+        ])),
+        '/product-sitemap.xml': (200, XML, sitemap([
+            (f'{base_url}/izdelek/masazna-pistola/', '2026-01-01T00:00:00+00:00'),
+            ('', None),
+            (f'{base_url}/izdelek/lucka/', '2026-01-02T00:00:00+00:00'),
+            (f'{base_url}/izdelek/skrito/', None),
+            ('https://evil.example/izdelek/phish/', None),
+            (f'{base_url}/o-nas/', None)
+        ])),
+        '/izdelek/masazna-pistola/': (200, HTML, product_page()),
+        '/izdelek/lucka/': (200, HTML, product_page('LED lučka', '12,99')),
+        '/izdelek/skrito/': (200, HTML, product_page('Skrito'))
+    }
+
+
+class FixtureServer:
+    """
+    In-memory HTTP server on 127.0.0.1
+
+    routes maps a path to (status, headers, body) and may be changed while
+    the server runs; requests lists the paths requested so far. A route
+    with an ETag header answers 304 to a matching If-None-Match.
+    """
+
+    def __init__(self, port: int = 0):
+        self.routes = {}
+        self.requests = []
+        routes, requests = self.routes, self.requests
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requests.append(self.path)
+                status, headers, body = routes.get(self.path, (404, TEXT, b'not found'))
+                if headers.get('ETag') and self.headers.get('If-None-Match') == headers['ETag']:
+                    status, body = 304, b''
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.url = f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self) -> 'FixtureServer':
+        threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a fixture vigoshop.si stand-in')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    args = parser.parse_args()
+
+    server = FixtureServer(args.port)
+    server.routes.update(shop_routes(server.url))
+    print(f"Fixture shop on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
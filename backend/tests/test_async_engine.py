@@ -0,0 +1,207 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from async_engine import AsyncGenerationEngine
+from cache import TTLCache
+from copy_generator import CopyGenerator
+from resilience import CircuitBreaker, DeadlineExceeded
+from router import ModelRouter
+
+PRODUCT = {'product_name': 'Lamp', 'price': '9,99€', 'features': 'Bright', 'market': 'SI', 'objective': 'Conversion'}
+
+
+def first_call_takes(seconds: float, others: float = 0.0):
+    """FakeClaude.delay: the first call takes seconds, the others take others"""
+    calls = itertools.count()
+    return lambda params: seconds if next(calls) == 0 else others
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    return breaker
+
+
+def eventually(condition, timeout: float = 2.0) -> bool:
+    """Wait for work the engine loop finishes after the call returned (e.g. cancelled tasks)"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def engine(claude):
+    return AsyncGenerationEngine(CopyGenerator(), hedge_delay=0.1)
+
+
+def test_hedge_wins_and_the_slow_call_is_cancelled(claude, engine):
+    claude.delay = first_call_takes(2.0)
+
+    started = time.perf_counter()
+    message, hedged = engine.run(engine._create_hedged(
+        engine.generator._message_params('SI', 'Product: Lamp', 'claude-haiku-4-5-20251001')
+    ))
+
+    assert time.perf_counter() - started < 1.5
+    assert hedged and message.content[0].text
+    assert (engine.hedges, engine.hedge_wins) == (1, 1)
+    assert eventually(lambda: engine.in_flight == 0)
+    assert engine.generator.breaker.state == 'closed'
+
+
+def test_parallel_generation_with_hedging(claude, engine):
+    claude.delay = first_call_takes(2.0)
+
+    variants, meta = engine.generate_parallel_sync(hedge=True, **PRODUCT)
+
+    assert set(variants) == {'variant_1', 'variant_2', 'variant_3'}
+    assert meta['fallback'] is False and meta['hedged'] == 1
+    assert len(claude.calls) == 4
+
+
+def test_cancelled_hedged_probe_releases_the_breaker(claude):
+    claude.delay = 2.0
+    breaker = half_open_breaker()
+    engine = AsyncGenerationEngine(CopyGenerator(breaker=breaker), hedge_delay=0.05)
+    params = engine.generator._message_params('SI', 'Product: Lamp', 'claude-haiku-4-5-20251001')
+
+    with pytest.raises(asyncio.TimeoutError):
+        engine.run(asyncio.wait_for(engine._create_hedged(params), 0.3))
+
+    # The backup was rejected (only one probe is allowed); the cancelled probe gave its slot back
+    assert eventually(lambda: engine.in_flight == 0)
+    assert breaker.allow()
+
+
+def test_best_of_stops_running_candidates_once_the_budget_is_spent(claude):
+    claude.delay = first_call_takes(0.0, others=2.0)
+    engine = AsyncGenerationEngine(CopyGenerator())
+
+    started = time.perf_counter()
+    variants, meta = engine.generate_best_of_sync(n=2, target_score=101, token_budget=150, **PRODUCT)
+
+    assert time.perf_counter() - started < 1.5
+    assert meta['stopped'] == 'token_budget'
+    assert meta['tokens_used'] == 150
+    assert len(meta['best_scores']) == 1 and meta['fallback'] is True
+    assert eventually(lambda: engine.in_flight == 0)
+
+
+def test_best_of_timeout_releases_the_half_open_probe(claude):
+    claude.delay = 2.0
+    breaker = half_open_breaker()
+    engine = AsyncGenerationEngine(CopyGenerator(breaker=breaker))
+
+    variants, meta = engine.generate_best_of_sync(n=2, timeout=0.3, **PRODUCT)
+
+    # The probe either timed out or was cancelled with the request; both give the slot back
+    assert meta['circuit_open'] is True and meta['fallback'] is True
+    assert eventually(lambda: engine.in_flight == 0)
+    assert breaker.allow()
+
+
+def test_cancelled_best_of_cancels_its_candidates(claude):
+    claude.delay = 2.0
+    breaker = half_open_breaker()
+    engine = AsyncGenerationEngine(CopyGenerator(breaker=breaker))
+
+    with pytest.raises(asyncio.TimeoutError):
+        engine.run(asyncio.wait_for(engine.generate_best_of(n=2, timeout=10, **PRODUCT), 0.3))
+
+    assert eventually(lambda: engine.in_flight == 0, timeout=1.0)
+    assert breaker.allow()
+
+
+def test_single_variant_calls_feed_the_router(claude):
+    generator = CopyGenerator(router=ModelRouter())
+    engine = AsyncGenerationEngine(generator)
+
+    engine.generate_best_of_sync(n=1, **PRODUCT)
+
+    assert generator.router.stats()['claude-haiku-4-5-20251001']['samples'] == 3
+
+
+@pytest.mark.parametrize('body', [
+    {'best_of': 'lots'}, {'best_of': -1}, {'best_of': 6}, {'target_score': 'high'},
+    {'latency_budget_ms': 'soon'}, {'latency_budget_ms': -5}, {'max_chars': 'long'}, {'max_chars': [150]}, {'max_chars': 0}
+])
+def test_generate_rejects_bad_numbers(api, body):
+    response = api.app.test_client().post('/generate', json=dict(PRODUCT, **body))
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_generate_many_is_bounded_by_max_concurrency(claude):
+    claude.delay = 0.2
+    engine = AsyncGenerationEngine(CopyGenerator(), max_concurrency=2)
+    requests = [dict(PRODUCT, product_name=f'Lamp {number}') for number in range(6)]
+
+    started = time.perf_counter()
+    results = engine.generate_many_sync(requests)
+
+    assert 0.55 < time.perf_counter() - started < 1.5
+    assert [meta['fallback'] for _, meta in results] == [False] * 6
+    assert [call['messages'][0]['content'].count('Lamp') for call in claude.calls] == [1] * 6
+
+
+def test_generate_uses_the_cache_and_falls_back_on_timeout(claude):
+    engine = AsyncGenerationEngine(CopyGenerator(cache=TTLCache()))
+
+    _, first = engine.generate_sync(**PRODUCT)
+    _, second = engine.generate_sync(**PRODUCT)
+    assert (first['cache'], second['cache']) == ('miss', 'hit') and len(claude.calls) == 1
+
+    claude.delay = 2.0
+    variants, slow = engine.generate_sync(timeout=0.3, **dict(PRODUCT, product_name='Fan'))
+    assert slow['fallback'] is True and set(variants) == {'variant_1', 'variant_2', 'variant_3'}
+
+
+def test_concurrent_identical_requests_share_one_call(claude):
+    claude.delay = 0.3
+    engine = AsyncGenerationEngine(CopyGenerator(cache=TTLCache()))
+
+    results = engine.generate_many_sync([PRODUCT] * 4)
+
+    assert len(claude.calls) == 1
+    assert sorted(meta['cache'] for _, meta in results) == ['coalesced'] * 3 + ['miss']
+    assert all(variants == results[0][0] for variants, _ in results)
+
+
+def test_exhausted_budget_fails_without_a_call(claude, engine):
+    params = engine.generator._message_params('SI', 'Product: Lamp', 'claude-haiku-4-5-20251001')
+
+    with pytest.raises(DeadlineExceeded):
+        engine.run(engine._create(params, timeout=0.0))
+
+    assert claude.calls == []
+
+
+def test_wait_for_a_concurrency_slot_counts_against_the_deadline(claude):
+    claude.delay = first_call_takes(1.0)
+    engine = AsyncGenerationEngine(CopyGenerator(), max_concurrency=1)
+    params = engine.generator._message_params('SI', 'Product: Lamp', 'claude-haiku-4-5-20251001')
+
+    async def queued_call():
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        try:
+            await engine._create(params, timeout=0.3)
+        except DeadlineExceeded:
+            return time.perf_counter() - started
+
+    async def both():
+        return await asyncio.gather(engine._create(params, timeout=5.0), queued_call())
+
+    message, waited = engine.run(both())
+
+    assert message.content[0].text
+    assert waited is not None and waited < 0.6
+    assert len(claude.calls) == 1
+    assert engine.generator.breaker.stats()['consecutive_failures'] == 0
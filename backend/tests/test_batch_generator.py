@@ -0,0 +1,84 @@
+import json
+import time
+
+import pytest
+
+from batch_generator import BatchGenerator, custom_id, parse_products
+from copy_generator import CopyGenerator
+from fake_claude import variant
+
+PRODUCTS = [
+    {'product_name': 'Lamp', 'price': '9,99€', 'features': 'Bright | Cordless'},
+    {'product_name': 'Massage gun', 'price': '39,99€', 'features': 'Quiet', 'objective': 'Awareness'}
+]
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_submit_poll_and_collect_results(claude, tmp_path):
+    claude.batch_errors = {custom_id(1, 'DE')}
+    output = tmp_path / 'results.jsonl'
+
+    summary = BatchGenerator(CopyGenerator(), poll_interval=0.01).run(PRODUCTS, str(output), markets=['SI', 'DE'])
+
+    assert (summary['requests'], summary['succeeded'], summary['fallback']) == (4, 3, 1)
+    assert summary['batch_ids'] == ['msgbatch_1']
+    lines = {line['custom_id']: line for line in read_lines(output)}
+    assert set(lines) == {'p0-SI', 'p0-DE', 'p1-SI', 'p1-DE'}
+    assert lines['p1-DE']['fallback'] is True and 'errored' in lines['p1-DE']['error']
+    assert lines['p0-SI']['variants']['variant_1']['hook'] == 'Hook 1: tired of waiting?'
+    for line in lines.values():
+        assert set(line['variants']) == {'variant_1', 'variant_2', 'variant_3'}
+        assert all('engagement_score' in v for v in line['variants'].values())
+
+
+def test_requests_are_split_into_batches(claude, tmp_path):
+    generator = BatchGenerator(CopyGenerator(), poll_interval=0.01, max_batch_requests=3)
+    summary = generator.run(PRODUCTS, str(tmp_path / 'results.jsonl'), markets=['SI', 'DE'])
+
+    assert summary['batch_ids'] == ['msgbatch_1', 'msgbatch_2']
+    assert [len(batch['requests']) for batch in claude.batches.values()] == [3, 1]
+    assert summary['succeeded'] == 4
+
+
+def test_missing_variants_are_filled_from_the_template(claude, tmp_path):
+    claude.text = lambda params: json.dumps({'variant_1': variant(1, 'pain_point')})
+    output = tmp_path / 'results.jsonl'
+
+    summary = BatchGenerator(CopyGenerator(), poll_interval=0.01).run(PRODUCTS[:1], str(output), markets=['SI'])
+
+    line = read_lines(output)[0]
+    assert summary['succeeded'] == 1 and line['fallback'] is False
+    assert line['template_variants'] == ['variant_2', 'variant_3']
+
+
+def test_wait_gives_up_after_max_wait(claude):
+    claude.batch_polls = 10 ** 6
+    generator = BatchGenerator(CopyGenerator(), poll_interval=0.05, max_wait=0.2)
+    batch_id = generator.submit(generator.build_requests(PRODUCTS, ['SI'])[0])[0]
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match=f'--batch-id {batch_id}'):
+        generator.wait(batch_id)
+    assert time.monotonic() - started < 2
+
+
+def test_markets_are_normalized_before_building_requests(claude):
+    generator = BatchGenerator(CopyGenerator())
+
+    requests, index = generator.build_requests(PRODUCTS, ['si', 'SI ', 'de'])
+    assert [request['custom_id'] for request in requests] == ['p0-SI', 'p0-DE', 'p1-SI', 'p1-DE']
+    assert len(index) == 4
+
+    with pytest.raises(ValueError, match='XX'):
+        generator.build_requests(PRODUCTS, ['SI', 'xx'])
+    with pytest.raises(ValueError, match='SI DE'):
+        generator.build_requests([dict(PRODUCTS[0], market='SI DE')])
+
+
+def test_parse_products():
+    assert parse_products(['product_name,price\n', 'Lamp,9.99\n'], is_csv=True) == [{'product_name': 'Lamp', 'price': '9.99'}]
+    assert parse_products(['{"product_name": "Lamp"}\n', '\n'], is_csv=False) == [{'product_name': 'Lamp'}]
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cache import TTLCache, canonicalize_url
+from fixture_shop import HTML, product_page
+from scraper import VigoShopScraper
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache()
+    release = threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        release.wait(2)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load_with_status('k', loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [1]
+    assert sorted(status for _, status in results) == ['coalesced'] * 4 + ['miss']
+    assert cache.stats()['coalesced'] == 4
+
+
+def test_coroutines_join_a_load_started_by_a_thread():
+    cache = TTLCache()
+    release = threading.Event()
+    thread = threading.Thread(target=lambda: cache.get_or_load_with_status('k', lambda: release.wait(2) and 'value'))
+    thread.start()
+    time.sleep(0.05)
+
+    async def load():
+        raise AssertionError("the load in flight was not joined")
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.1, release.set)
+        return await asyncio.gather(*(cache.get_or_load_async('k', load) for _ in range(3)))
+
+    assert asyncio.run(main()) == [('value', 'coalesced')] * 3
+    thread.join()
+
+
+def test_cancelled_async_load_is_taken_over_by_a_waiter():
+    cache = TTLCache()
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def fast():
+        return 'value'
+
+    async def main():
+        leader = asyncio.create_task(cache.get_or_load_async('k', slow))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(cache.get_or_load_async('k', fast))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == ('value', 'miss')
+
+
+def test_loader_errors_reach_every_waiter_and_are_not_cached():
+    cache = TTLCache()
+    started = threading.Event()
+    errors = []
+
+    def failing_loader():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError('upstream down')
+
+    def waiter():
+        started.wait(2)
+        try:
+            cache.get_or_load('k', lambda: 'unused')
+        except ValueError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    with pytest.raises(ValueError):
+        cache.get_or_load('k', failing_loader)
+    thread.join()
+
+    assert len(errors) == 1
+    assert cache.get_or_load('k', lambda: 'fresh') == 'fresh'
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+    expired = TTLCache(ttl=0)
+    expired.set('a', 1)
+    assert expired.get('a') is None
+    assert expired.stats()['expirations'] == 1
+
+
+def test_refresh_reloads_a_cached_key():
+    cache = TTLCache()
+    cache.set('k', 'old')
+
+    assert cache.get_or_load_with_status('k', lambda: 'new', refresh=True) == ('new', 'refresh')
+    assert cache.get_or_load_with_status('k', lambda: 'unused') == ('new', 'hit')
+
+
+def test_equivalent_urls_share_a_key():
+    assert canonicalize_url('HTTPS://VigoShop.si/izdelek/lamp?utm_source=fb&b=2&a=1&fbclid=x#reviews') == (
+        'https://vigoshop.si/izdelek/lamp/?a=1&b=2'
+    )
+
+
+def test_scraper_serves_repeat_urls_from_the_cache(http_server):
+    http_server.routes['/izdelek/lucka/'] = (200, HTML, product_page('LED lučka'))
+    scraper = VigoShopScraper(allowed_domain='127.0.0.1', cache=TTLCache())
+
+    first = scraper.scrape_product(f'{http_server.url}/izdelek/lucka/')
+    second = scraper.scrape_product(f'{http_server.url}/izdelek/lucka?utm_source=fb')
+    second['name'] = 'changed'
+
+    assert http_server.requests == ['/izdelek/lucka/']
+    assert scraper.scrape_product(f'{http_server.url}/izdelek/lucka/')['name'] == first['name'] == 'LED lučka'
@@ -0,0 +1,64 @@
+import pytest
+
+from crawler import CatalogCrawler
+from fixture_shop import HTML, product_page, shop_routes
+from scraper import VigoShopScraper
+
+
+@pytest.fixture
+def shop(http_server):
+    http_server.routes.update(shop_routes(http_server.url))
+    return http_server
+
+
+def make_crawler(shop, tmp_path, **kwargs) -> CatalogCrawler:
+    scraper = VigoShopScraper(allowed_domain='127.0.0.1')
+    return CatalogCrawler(scraper, db_path=str(tmp_path / 'catalog.db'), base_url=shop.url, delay=0, **kwargs)
+
+
+def test_discovery_follows_robots_sitemaps_and_the_allowlist(shop, tmp_path):
+    crawler = make_crawler(shop, tmp_path)
+    crawler._load_robots()
+
+    urls = [url for url, _ in crawler.discover()]
+
+    assert urls == [
+        f'{shop.url}/izdelek/masazna-pistola/',
+        f'{shop.url}/izdelek/lucka/',
+        f'{shop.url}/izdelek/skrito/'
+    ]
+    assert '/sitemap_index.xml' in shop.requests
+
+
+def test_run_skips_disallowed_products_and_detects_changes(shop, tmp_path):
+    crawler = make_crawler(shop, tmp_path)
+
+    first = crawler.run()
+    assert (first['new'], first['skipped'], first['failed'], first['remaining']) == (2, 1, 0, 0)
+    assert '/izdelek/skrito/' not in shop.requests
+
+    # Unchanged lastmod: not fetched again
+    shop.requests.clear()
+    second = crawler.run()
+    assert (second['new'], second['skipped']) == (0, 3)
+    assert not any(path.startswith('/izdelek/') for path in shop.requests)
+
+    shop.routes['/izdelek/lucka/'] = (200, HTML, product_page('LED lučka', '9,99'))
+    third = crawler.run(force=True)
+    assert (third['changed'], third['unchanged']) == (1, 1)
+
+
+def test_empty_loc_does_not_abort_discovery(shop, tmp_path):
+    crawler = make_crawler(shop, tmp_path, sitemap_urls=[f'{shop.url}/sitemap_index.xml'])
+    assert len(crawler.discover()) == 3
+
+
+def test_allowed_domain():
+    crawler = CatalogCrawler.__new__(CatalogCrawler)
+    crawler.scraper = VigoShopScraper()
+
+    assert crawler.allowed('https://vigoshop.si/izdelek/a/')
+    assert crawler.allowed('https://www.vigoshop.si/izdelek/a/')
+    assert not crawler.allowed('https://vigoshop.si.evil.example/izdelek/a/')
+    assert not crawler.allowed('https://evil.example/?vigoshop.si')
+    assert not crawler.allowed('ftp://vigoshop.si/izdelek/a/')
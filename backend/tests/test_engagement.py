@@ -0,0 +1,50 @@
+import re
+
+from engagement import KEYWORD_CATEGORY, KEYWORD_RE, _trie_pattern, annotate, score_variant, score_variants
+from fake_claude import variant
+
+SHIPPED = {
+    'hook': 'Tired of waiting weeks for products from China?',
+    'body': '🎯 Ships from EU warehouse - 2-3 day delivery. ✅ Money-back guarantee, thousands of satisfied customers.',
+    'cta': 'Order now 👇',
+    'character_count': 120
+}
+
+
+def test_trie_pattern_matches_every_keyword_and_nothing_shorter():
+    for keyword in KEYWORD_CATEGORY:
+        assert KEYWORD_RE.fullmatch(keyword), keyword
+    pattern = re.compile(_trie_pattern(['eu shipping', 'eu skladišč', 'now']))
+    assert pattern.findall('eu shipping and eu skladišč now, eu ship') == ['eu shipping', 'eu skladišč', 'now']
+
+
+def test_score_rewards_the_vigoshop_signals():
+    basic = dict(SHIPPED, body='🎯 Ships from EU warehouse.')
+
+    assert score_variant(SHIPPED) == 100
+    assert score_variant(basic) - score_variant(dict(basic, body='🎯 Ships from our store.')) == 20
+    urgent = score_variant(dict(basic, body=basic['body'] + ' Order today.'))
+    pushy = score_variant(dict(basic, body=basic['body'] + ' Limited stock, order today, now!'))
+    assert urgent - pushy == 10
+    assert 0 <= score_variant({}) <= 100
+
+
+def test_batch_scores_match_single_scores():
+    variants = [SHIPPED, variant(1, 'pain_point'), {'hook': 'x', 'character_count': 'n/a'}]
+    assert score_variants(variants) == [score_variant(v) for v in variants]
+
+
+def test_annotate_skips_non_variants():
+    variants = annotate({'variant_1': dict(SHIPPED), 'note': 'not a variant'})
+    assert variants['variant_1']['engagement_score'] == score_variant(SHIPPED)
+    assert variants['note'] == 'not a variant'
+
+
+def test_score_endpoint(api):
+    client = api.app.test_client()
+
+    response = client.post('/score', json={'variants': [SHIPPED, variant(2, 'benefit')]})
+    assert response.status_code == 200
+    assert response.get_json()['data']['scores'] == score_variants([SHIPPED, variant(2, 'benefit')])
+
+    assert client.post('/score', json={'variants': []}).status_code == 400
@@ -0,0 +1,44 @@
+from cache import TTLCache
+from copy_generator import CopyGenerator, generation_cache_key
+
+PRODUCT = dict(product_name='Lamp', price='9,99€', features='Bright | Small', market='SI', objective='Conversion')
+
+
+def key(**overrides):
+    args = dict(PRODUCT, description='', style_prompt='', selected_model='claude-haiku-4-5-20251001', max_chars=150)
+    args.update(overrides)
+    return generation_cache_key(**args)
+
+
+def test_key_ignores_whitespace_but_not_inputs():
+    assert key() == key(product_name='  Lamp ', features='Bright|Small |', max_chars='150')
+    assert key() != key(market='DE')
+    assert key() != key(selected_model='claude-sonnet-4-5-20250929')
+    assert key() != key(max_chars=120)
+    assert key() != key(features='Small | Bright')
+
+
+def test_repeat_requests_are_served_from_the_cache(claude):
+    generator = CopyGenerator(cache=TTLCache())
+
+    first, first_meta = generator.generate_ad_copy_with_meta(**PRODUCT)
+    first['variant_1']['hook'] = 'changed by the caller'
+    second, second_meta = generator.generate_ad_copy_with_meta(**dict(PRODUCT, product_name=' Lamp'))
+
+    assert (first_meta['cache'], second_meta['cache']) == ('miss', 'hit')
+    assert second['variant_1']['hook'] != 'changed by the caller'
+    assert len(claude.calls) == 1
+
+    _, refreshed = generator.generate_ad_copy_with_meta(force_refresh=True, **PRODUCT)
+    assert refreshed['cache'] == 'refresh' and len(claude.calls) == 2
+
+
+def test_template_fallback_is_not_cached(claude):
+    claude.failures = [400]
+    generator = CopyGenerator(cache=TTLCache())
+
+    _, failed = generator.generate_ad_copy_with_meta(**PRODUCT)
+    _, retried = generator.generate_ad_copy_with_meta(**PRODUCT)
+
+    assert failed['fallback'] is True
+    assert retried['fallback'] is False and retried['cache'] == 'miss'
@@ -0,0 +1,152 @@
+import io
+
+import pytest
+
+from batch_generator import parse_products
+from copy_generator import CopyGenerator
+from jobs import JobQueue, JobWorker
+from resilience import CircuitBreaker
+
+PRODUCTS = [
+    {'product_name': 'Lamp', 'price': '9,99€', 'features': 'Bright'},
+    {'product_name': 'Fan', 'price': '19,99€', 'features': 'Quiet', 'market': 'DE'}
+]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'jobs.db'))
+
+
+def worker(queue, **kwargs) -> JobWorker:
+    return JobWorker(queue, CopyGenerator(**kwargs), worker_id='test-worker', poll_interval=0)
+
+
+def test_rows_per_market_and_checkpoints(queue):
+    job_id = queue.create_job(PRODUCTS, markets=['SI', 'HR'])
+    assert queue.status(job_id)['total'] == 4
+
+    first, second = queue.claim('a'), queue.claim('b')
+    assert (first[0]['row_index'], first[0]['market']) == (0, 'SI')
+    assert (second[0]['row_index'], second[0]['market']) == (0, 'HR')
+
+    assert not queue.complete(first[0], 'b', {'index': 0})  # not b's lease
+    assert queue.complete(first[0], 'a', {'index': 0})
+    assert queue.status(job_id)['rows'] == {'pending': 2, 'running': 1, 'done': 1, 'failed': 0}
+
+
+def test_worker_generates_every_row(claude, queue):
+    job_id = queue.create_job(PRODUCTS)
+
+    assert worker(queue).run(stop_when_idle=True) == 2
+
+    status = queue.status(job_id)
+    assert status['status'] == 'finished' and status['rows']['done'] == 2
+    results = list(queue.results(job_id))
+    assert [(result['market'], result['fallback']) for result in results] == [('SI', False), ('DE', False)]
+
+
+def test_template_fallback_is_retried_then_failed(claude, queue):
+    claude.failures = [400] * 3
+    job_id = queue.create_job(PRODUCTS[:1])
+
+    worker(queue).run(stop_when_idle=True)
+
+    status = queue.status(job_id)
+    assert status['status'] == 'finished' and status['rows']['failed'] == 1
+    assert len(claude.calls) == 3
+    assert 'template fallback' in list(queue.results(job_id))[0]['error']
+
+
+def test_template_fallback_then_success(claude, queue):
+    claude.failures = [400]
+    job_id = queue.create_job(PRODUCTS[:1])
+
+    worker(queue).run(stop_when_idle=True)
+
+    assert queue.status(job_id)['rows']['done'] == 1
+    assert len(claude.calls) == 2
+
+
+def test_open_breaker_does_not_use_up_attempts(claude, queue):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    job_id = queue.create_job(PRODUCTS[:1])
+
+    worker(queue, breaker=breaker).process(queue.claim('test-worker')[0])
+
+    assert queue.status(job_id)['rows']['pending'] == 1
+    assert queue.db.execute("SELECT attempts FROM job_rows").fetchone()['attempts'] == 0
+    assert claude.calls == []
+
+
+def test_lost_rows_fail_and_finish_the_job(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.db'), lease_seconds=-1, max_attempts=2)
+    job_id = queue.create_job(PRODUCTS[:1])
+
+    assert queue.claim('crashed-1') and queue.claim('crashed-2')  # each lease expires at once
+    assert queue.claim('next') == []
+
+    status = queue.status(job_id)
+    assert status['status'] == 'finished' and status['rows']['failed'] == 1
+    assert list(queue.results(job_id))[0]['error'] == 'Worker lost the row 2 times'
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.db'))
+    assert not (tmp_path / 'jobs.db').exists()
+
+    queue.create_job([{'product_name': 'Lamp'}])
+    assert (tmp_path / 'jobs.db').exists()
+
+
+def test_release_hands_rows_back(queue):
+    queue.create_job(PRODUCTS)
+    queue.claim('a', limit=2)
+    queue.release('a')
+
+    assert [row['row_index'] for row in queue.claim('b', limit=2)] == [0, 1]
+
+
+def test_ndjson_lines_must_be_objects():
+    assert parse_products(['{"product_name": "Lamp"}', '', '{"product_name": "Fan"}'], is_csv=False) == [
+        {'product_name': 'Lamp'}, {'product_name': 'Fan'}
+    ]
+    with pytest.raises(ValueError, match='Line 2'):
+        parse_products(['{"product_name": "Lamp"}', '[1, 2]'], is_csv=False)
+
+
+@pytest.mark.parametrize('request_kwargs', [
+    {'json': {'products': [1, 2]}},
+    {'json': ['not', 'an', 'object']},
+    {'data': {'file': (io.BytesIO(b'{"product_name": "Lamp"}\n"Fan"\n'), 'products.ndjson')}},
+    {'data': {'file': (io.BytesIO(b'{"product_name": '), 'products.ndjson')}},
+    {'json': {'products': [{'product_name': 'Lamp'}], 'markets': ['SI', 'XX']}},
+    {'json': {'products': [{'product_name': 'Lamp'}], 'markets': 'SI'}},
+    {'json': {'products': [{'product_name': 'Lamp', 'market': 'Mars'}]}}
+])
+def test_jobs_endpoint_rejects_bad_products(api, request_kwargs):
+    response = api.app.test_client().post('/jobs', **request_kwargs)
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_jobs_endpoint_enqueues_an_upload(api):
+    upload = io.BytesIO(b'product_name,price,features\nLamp,9.99,Bright\nFan,19.99,Quiet\n')
+    response = api.app.test_client().post('/jobs', data={'file': (upload, 'products.csv'), 'markets': 'SI,DE'})
+
+    assert response.status_code == 202
+    assert response.get_json()['data']['total'] == 4
+
+
+def test_duplicate_markets_become_one_row_each(api):
+    response = api.app.test_client().post('/jobs', json={
+        'products': [{'product_name': 'Lamp'}, {'product_name': 'Fan', 'market': 'de'}],
+        'markets': ['si', 'SI', ' de ']
+    })
+
+    assert response.status_code == 202
+    assert response.get_json()['data']['total'] == 4
+    rows = api.job_queue.db.execute("SELECT market FROM job_rows ORDER BY row_index, market").fetchall()
+    assert [row['market'] for row in rows] == ['DE', 'SI', 'DE', 'SI']
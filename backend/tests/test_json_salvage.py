@@ -0,0 +1,53 @@
+import json
+
+from copy_generator import CopyGenerator
+from fake_claude import variant, variants_text
+from json_salvage import repair_json, salvage_variants
+from json_stream import VariantStreamParser
+
+PRODUCT = dict(product_name='Lamp', price='9,99€', features='Bright', market='SI', objective='Conversion')
+
+
+def test_repair_fixes_newlines_stray_quotes_and_trailing_commas():
+    broken = '{"hook": "Line one\nline "two" here", "body": "b",}'
+    assert json.loads(repair_json(broken)) == {'hook': 'Line one\nline "two" here', 'body': 'b'}
+
+
+def test_truncated_answer_keeps_the_finished_variants():
+    text = '```json\n{"variant_1": {"hook": "a", "body": "b"}, "variant_2": {"hook": "c", "body": "d"}, "variant_3": {"hook": "e", "bo'
+
+    assert salvage_variants(text) == {
+        'variant_1': {'hook': 'a', 'body': 'b'},
+        'variant_2': {'hook': 'c', 'body': 'd'}
+    }
+
+
+def test_bare_variant_and_garbage():
+    assert salvage_variants('{"hook": "a", "body": "b"}', single_key='variant_2') == {'variant_2': {'hook': 'a', 'body': 'b'}}
+    assert salvage_variants('I cannot help with that.') == {}
+    assert salvage_variants('{"variant_1": {"hook": "a"}}') == {}
+
+
+def test_stream_parser_emits_variants_as_they_close():
+    text = variants_text({'messages': [{'content': 'Product: Lamp'}]})
+    parser = VariantStreamParser()
+
+    completed = []
+    for start in range(0, len(text), 7):
+        completed.extend(parser.feed(text[start:start + 7]))
+
+    assert [key for key, _ in completed] == ['variant_1', 'variant_2', 'variant_3']
+    assert completed[0][1] == variant(1, 'pain_point')
+
+
+def test_missing_variant_is_requested_on_its_own(claude):
+    def truncated_first(params):
+        text = variants_text(params)
+        return text[:text.index('"variant_3"')] if len(claude.calls) == 1 else text
+
+    claude.text = truncated_first
+    variants, meta = CopyGenerator().generate_ad_copy_with_meta(**PRODUCT)
+
+    assert meta['fallback'] is False and meta['follow_up'] == ['variant_3']
+    assert variants['variant_3']['hook'] == 'Hook 3: tired of waiting?'
+    assert 'Generate ONLY' in claude.calls[1]['messages'][0]['content']
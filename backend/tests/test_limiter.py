@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from copy_generator import CopyGenerator
+from limiter import AdaptiveLimiter, remaining_fraction
+from resilience import RetryPolicy
+from scheduler import PriorityScheduler
+
+PRODUCT = dict(product_name='Lamp', price='9,99€', features='Bright', market='SI', objective='Conversion')
+
+
+def quota(remaining: int, limit: int = 100) -> dict:
+    return {'anthropic-ratelimit-requests-limit': str(limit), 'anthropic-ratelimit-requests-remaining': str(remaining)}
+
+
+def throttle_error(status: int = 429, retry_after: str = None) -> Exception:
+    """An API error the way the SDK raises it (with the HTTP response attached)"""
+    error = Exception(f'Fake {status}')
+    error.response = SimpleNamespace(status_code=status, headers={'retry-after': retry_after} if retry_after else {})
+    return error
+
+
+def saturated_scheduler(slots: int) -> PriorityScheduler:
+    scheduler = PriorityScheduler(max_concurrency=slots)
+    for _ in range(slots):
+        scheduler.acquire('interactive', 1)
+    return scheduler
+
+
+def test_remaining_fraction_takes_the_tightest_quota():
+    headers = dict(quota(50), **{
+        'anthropic-ratelimit-tokens-limit': '1000',
+        'anthropic-ratelimit-tokens-remaining': '100'
+    })
+    assert remaining_fraction(headers) == 0.1
+    assert remaining_fraction({}) is None
+    assert remaining_fraction(None) is None
+
+
+def test_additive_increase_only_while_saturated_with_headroom():
+    limiter = AdaptiveLimiter(saturated_scheduler(2), max_concurrency=3)
+
+    limiter.record_response(quota(10))  # below headroom
+    assert limiter.limit == 2
+    for _ in range(3):  # + 1/limit per call: 2.5, 2.9, 3.24
+        limiter.record_response(quota(90))
+    assert limiter.limit == 3 and limiter.scheduler.max_concurrency == 3
+
+    for _ in range(10):
+        limiter.record_response(quota(90))
+    assert limiter.limit == 3  # capped at max_concurrency
+
+    idle = AdaptiveLimiter(PriorityScheduler(max_concurrency=2))
+    idle.record_response(quota(90))
+    assert idle.limit == 2
+
+
+def test_multiplicative_decrease_once_per_cooldown():
+    limiter = AdaptiveLimiter(PriorityScheduler(max_concurrency=16), min_concurrency=2)
+
+    limiter.record_error(throttle_error(529))
+    limiter.record_error(throttle_error(429))
+    limiter.record_response(quota(1))
+    assert (limiter.limit, limiter.decreases, limiter.throttled) == (8, 1, 2)
+
+    limiter.cooldown = 0.0
+    for _ in range(5):
+        limiter.record_response(quota(1))
+    assert limiter.limit == 2 and limiter.scheduler.max_concurrency == 2
+
+
+def test_retry_after_holds_off_increases():
+    limiter = AdaptiveLimiter(saturated_scheduler(2))
+
+    limiter.record_error(throttle_error(429, retry_after='30'))
+    limiter.record_response(quota(90))
+
+    assert limiter.limit == 1 and limiter.increases == 0
+    assert limiter.stats()['hold_seconds'] > 25
+
+
+def test_other_errors_are_ignored():
+    limiter = AdaptiveLimiter(PriorityScheduler(max_concurrency=4))
+    limiter.record_error(ValueError('bad'))
+    limiter.record_error(throttle_error(500))
+    assert limiter.limit == 4 and limiter.throttled == 0
+
+
+def test_generator_reports_api_feedback(claude):
+    scheduler = PriorityScheduler(max_concurrency=8)
+    limiter = AdaptiveLimiter(scheduler)
+    generator = CopyGenerator(scheduler=scheduler, limiter=limiter, retry_policy=RetryPolicy(base_delay=0.0))
+
+    claude.failures = [429]
+    claude.headers = quota(2)
+    _, meta = generator.generate_ad_copy_with_meta(**PRODUCT)
+
+    assert meta['fallback'] is False
+    assert limiter.throttled == 1 and limiter.decreases == 1
+    assert scheduler.max_concurrency == 4
+    assert limiter.stats()['remaining_fraction'] == 0.02
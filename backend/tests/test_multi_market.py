@@ -0,0 +1,53 @@
+from async_engine import AsyncGenerationEngine
+from copy_generator import CopyGenerator
+from fake_claude import variants_text
+
+PRODUCT = dict(product_name='Lamp', price='9,99€', features='Bright', objective='Conversion')
+
+
+def german_market_fails(params):
+    return 'Entschuldigung.' if 'German market' in params['system'][0]['text'] else variants_text(params)
+
+
+def test_markets_are_generated_concurrently(claude):
+    claude.delay = 0.3
+
+    variants, meta = CopyGenerator().generate_multi_market(['SI', 'HR', 'IT'], **PRODUCT)
+
+    assert set(variants) == {'SI', 'HR', 'IT'}
+    assert meta['latency_ms'] < 800
+    assert meta['usage']['input_tokens'] == 300
+    assert meta['fallback_markets'] == []
+
+
+def test_a_failing_market_falls_back_on_its_own(claude):
+    claude.text = german_market_fails
+
+    variants, meta = CopyGenerator().generate_multi_market(['SI', 'DE'], **PRODUCT)
+
+    assert meta['fallback_markets'] == ['DE']
+    assert meta['markets']['SI']['fallback'] is False
+    assert variants['DE']['variant_1']['hook'] and variants['SI']['variant_1']['hook'] == 'Hook 1: tired of waiting?'
+
+
+def test_async_engine_fans_out_too(claude):
+    claude.text = german_market_fails
+
+    variants, meta = AsyncGenerationEngine(CopyGenerator()).generate_multi_market_sync(['SI', 'DE', 'AT'], **PRODUCT)
+
+    assert list(variants) == ['SI', 'DE', 'AT']
+    assert meta['fallback_markets'] == ['DE']
+
+
+def test_generate_endpoint_validates_markets(api):
+    client = api.app.test_client()
+
+    response = client.post('/generate', json=dict(PRODUCT, markets=['si', 'SI', 'hr']))
+    assert response.status_code == 200
+    assert set(response.get_json()['data']) == {'SI', 'HR'}
+    assert response.get_json()['data']['SI']['variant_1']['engagement_score'] > 0
+
+    assert client.post('/generate', json=dict(PRODUCT, markets='SI')).status_code == 400
+    assert client.post('/generate', json=dict(PRODUCT, markets=[])).status_code == 400
+    assert client.post('/generate', json=dict(PRODUCT, markets=[f'M{n}' for n in range(11)])).status_code == 400
+    assert client.post('/generate', json=dict(PRODUCT, markets=['SI'], best_of=3)).status_code == 400
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from fixture_shop import shop_routes
+
+
+@pytest.mark.parametrize('body', [None, 'not json', '[1, 2]', '{"urls": "one"}', '{"urls": [], "url": ""}'])
+def test_pipeline_rejects_bad_bodies(api, body):
+    response = api.app.test_client().post('/pipeline', data=body, content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_pipeline_rejects_a_bad_latency_budget(api):
+    response = api.app.test_client().post('/pipeline', json={'url': 'https://vigoshop.si/x/', 'latency_budget_ms': 'soon'})
+
+    assert response.status_code == 400
+
+
+def test_pipeline_streams_one_line_per_url(api, http_server):
+    http_server.routes.update(shop_routes(http_server.url))
+    urls = [f'{http_server.url}/izdelek/masazna-pistola/', f'{http_server.url}/izdelek/manjka/']
+
+    response = api.app.test_client().post('/pipeline', json={'urls': urls})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    by_url = {line['url']: line for line in lines[:-1]}
+    assert by_url[urls[0]]['success'] is True
+    assert set(by_url[urls[0]]['data']) == {'variant_1', 'variant_2', 'variant_3'}
+    assert by_url[urls[1]]['success'] is False and by_url[urls[1]]['stage'] == 'scrape'
+    assert lines[-1]['done'] is True and (lines[-1]['succeeded'], lines[-1]['failed']) == (1, 1)
@@ -0,0 +1,29 @@
+from copy_generator import MARKET_CONTEXT, CopyGenerator, estimate_tokens, prompt_cacheable, resolve_model
+
+HAIKU = resolve_model('fast')
+SONNET = resolve_model('smart')
+
+
+def params(market: str, model: str):
+    generator = CopyGenerator()
+    prompt = generator._build_prompt('Lamp', '9,99€', 'Bright', market, 'Conversion', '', '', 150)
+    return generator._message_params(market, prompt, model)
+
+
+def test_cache_marker_only_where_the_prefix_qualifies():
+    for market in MARKET_CONTEXT:
+        assert 'cache_control' not in params(market, HAIKU)['system'][0]
+        assert params(market, SONNET)['system'][0]['cache_control'] == {'type': 'ephemeral'}
+
+
+def test_unknown_market_prompt_is_still_static():
+    first, second = params('FR', SONNET), params('FR', SONNET)
+    assert first['system'] == second['system']
+    assert prompt_cacheable('FR', SONNET) == ('cache_control' in first['system'][0])
+
+
+def test_per_product_block_stays_out_of_the_system_prompt():
+    request = params('SI', HAIKU)
+    assert 'Lamp' not in request['system'][0]['text']
+    assert 'Product: Lamp' in request['messages'][0]['content']
+    assert estimate_tokens(request) > request['max_tokens']
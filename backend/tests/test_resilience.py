@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, Deadline, RetryPolicy
+
+
+def open_breaker() -> CircuitBreaker:
+    """A breaker that is half-open: the next allow() claims the probe"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_and_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    breaker.reset_timeout = 0.0
+    assert [breaker.allow() for _ in range(3)] == [True, False, False]
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_non_retryable_error_releases_probe():
+    breaker = open_breaker()
+
+    def attempt(timeout):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        RetryPolicy().call(attempt, Deadline(10), breaker)
+    assert breaker.allow()
+
+
+def test_cancelled_async_probe_releases_breaker():
+    breaker = open_breaker()
+    started = asyncio.Event()
+
+    async def attempt(timeout):
+        started.set()
+        await asyncio.sleep(10)
+
+    async def scenario():
+        task = asyncio.ensure_future(RetryPolicy().call_async(attempt, Deadline(10), breaker))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert breaker.state == 'half_open'
+    assert [breaker.allow() for _ in range(3)] == [True, False, False]
+
+
+def test_interrupted_sync_probe_releases_breaker():
+    breaker = open_breaker()
+
+    def attempt(timeout):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        RetryPolicy().call(attempt, Deadline(10), breaker)
+    assert breaker.allow()
+
+
+def test_open_breaker_rejects_without_calling():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    calls = []
+
+    with pytest.raises(CircuitOpenError):
+        RetryPolicy().call(calls.append, Deadline(10), breaker)
+    assert calls == []
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_retries_transient_errors_within_deadline():
+    attempts = []
+
+    def attempt(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise TimeoutError("slow")
+        return 'ok'
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0, min_attempt_seconds=0.0)
+    breaker = CircuitBreaker()
+    assert policy.call(attempt, Deadline(10), breaker) == 'ok'
+    assert len(attempts) == 3
+    assert breaker.stats()['consecutive_failures'] == 0
@@ -0,0 +1,55 @@
+from copy_generator import MODEL_DOWNGRADES, CopyGenerator, resolve_model
+from router import ModelRouter
+
+HAIKU = resolve_model('fast')
+SONNET = resolve_model('smart')
+PRODUCT = dict(product_name='Lamp', price='9,99€', features='Bright', market='SI', objective='Conversion')
+
+
+def router_with(model: str, latency_seconds: float, ok: bool = True, count: int = 10, **kwargs) -> ModelRouter:
+    router = ModelRouter(downgrades=MODEL_DOWNGRADES, **kwargs)
+    for _ in range(count):
+        router.record(model, latency_seconds, ok)
+    return router
+
+
+def test_keeps_the_model_until_it_has_enough_samples():
+    assert router_with(SONNET, 30.0, count=9).route(SONNET, 15000) == (SONNET, None)
+
+
+def test_slow_model_is_downgraded_for_tight_budgets_only():
+    router = router_with(SONNET, 20.0)
+
+    assert router.route(SONNET, 15000) == (HAIKU, 'latency')
+    assert router.route(SONNET, 30000) == (SONNET, None)
+    assert router.route(SONNET) == (SONNET, None)
+    assert router.stats()[SONNET]['downgraded'] == 1
+
+
+def test_failing_model_is_avoided():
+    assert router_with(SONNET, 1.0, ok=False).route(SONNET, None) == (HAIKU, 'errors')
+
+
+def test_nothing_fits_takes_the_fastest_option():
+    router = router_with(SONNET, 20.0)
+    for _ in range(10):
+        router.record(HAIKU, 18.0, True)
+
+    assert router.route(SONNET, 5000) == (HAIKU, 'latency')
+
+
+def test_samples_expire_after_the_window():
+    router = router_with(SONNET, 20.0, window_seconds=0.0)
+
+    assert router.route(SONNET, 15000) == (SONNET, None)
+    assert router.stats() == {SONNET: {'samples': 0, 'error_rate': None, 'p50_ms': None, 'p95_ms': None, 'downgraded': 0}}
+
+
+def test_generator_reports_the_downgrade(claude):
+    generator = CopyGenerator(router=router_with(SONNET, 20.0))
+
+    _, meta = generator.generate_ad_copy_with_meta(model='smart', latency_budget_ms=15000, **PRODUCT)
+
+    assert (meta['model'], meta['requested_model'], meta['routed']) == (HAIKU, SONNET, 'latency')
+    assert claude.calls[0]['model'] == HAIKU
+    assert generator.router.stats()[HAIKU]['samples'] == 1
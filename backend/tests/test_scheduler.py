@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from scheduler import PRIORITY, PriorityScheduler, SchedulerTimeout, use_priority
+
+
+def grant_order(scheduler: PriorityScheduler, requests):
+    """Queue (class, tokens) requests behind a held slot; return the classes in the order they were granted"""
+    order = []
+
+    async def request(priority, tokens):
+        ticket = await scheduler.acquire_async(priority, tokens)
+        order.append(priority)
+        scheduler.release(ticket)
+
+    async def scenario():
+        holder = await scheduler.acquire_async('interactive', 1)
+        tasks = []
+        for priority, tokens in requests:
+            tasks.append(asyncio.ensure_future(request(priority, tokens)))
+            await asyncio.sleep(0)
+        scheduler.release(holder)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_interactive_overtakes_queued_bulk():
+    order = grant_order(PriorityScheduler(max_concurrency=1), [('bulk', 100)] * 3 + [('interactive', 100)])
+    assert order == ['interactive', 'bulk', 'bulk', 'bulk']
+
+
+def test_equal_priority_classes_share_by_weight():
+    order = grant_order(PriorityScheduler(max_concurrency=1), [('bulk', 100)] * 8 + [('pipeline', 100)] * 8)
+    assert order[:8].count('pipeline') == 6
+
+
+def test_bulk_leaves_room_for_interactive():
+    scheduler = PriorityScheduler(max_concurrency=4)
+    bulk = [scheduler.acquire('bulk', 10) for _ in range(3)]
+
+    with pytest.raises(SchedulerTimeout):
+        scheduler.acquire('bulk', 10, timeout=0.05)
+    with scheduler.slot('interactive', 10):
+        assert scheduler.stats()['in_flight'] == 4
+
+    for ticket in bulk:
+        scheduler.release(ticket)
+    classes = scheduler.stats()['classes']
+    assert classes['bulk']['timed_out'] == 1 and classes['bulk']['queued'] == 0
+
+
+def test_token_budget_and_oversized_calls():
+    scheduler = PriorityScheduler(max_concurrency=8, max_tokens=100)
+    first = scheduler.acquire('interactive', 80)
+
+    with pytest.raises(SchedulerTimeout):
+        scheduler.acquire('interactive', 50, timeout=0.05)
+    scheduler.release(first)
+
+    with scheduler.slot('interactive', 500):
+        assert scheduler.stats()['tokens_in_flight'] == 500
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = PriorityScheduler(max_concurrency=1)
+
+    async def scenario():
+        holder = await scheduler.acquire_async('interactive', 1)
+        waiting = asyncio.ensure_future(scheduler.acquire_async('bulk', 1))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        scheduler.release(holder)
+
+    asyncio.run(scenario())
+    stats = scheduler.stats()
+    assert stats['in_flight'] == 0 and stats['classes']['bulk']['queued'] == 0
+
+
+def test_raising_capacity_admits_waiters():
+    scheduler = PriorityScheduler(max_concurrency=1)
+
+    async def scenario():
+        await scheduler.acquire_async('interactive', 1)
+        waiting = asyncio.ensure_future(scheduler.acquire_async('interactive', 1))
+        await asyncio.sleep(0)
+        scheduler.set_capacity(2)
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(scenario())
+    assert scheduler.stats()['in_flight'] == 2
+
+
+def test_use_priority_sets_the_traffic_class():
+    with use_priority('bulk'):
+        assert PRIORITY.get() == 'bulk'
+    assert PRIORITY.get() == 'interactive'
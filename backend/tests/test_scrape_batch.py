@@ -0,0 +1,33 @@
+from fixture_shop import shop_routes
+from scraper import VigoShopScraper
+
+
+def test_batch_keeps_input_order_and_isolates_failures(http_server):
+    http_server.routes.update(shop_routes(http_server.url))
+    urls = [
+        f'{http_server.url}/izdelek/lucka/',
+        f'{http_server.url}/izdelek/manjka/',
+        'https://evil.example/izdelek/phish/',
+        f'{http_server.url}/izdelek/masazna-pistola/'
+    ]
+
+    batch = VigoShopScraper(allowed_domain='127.0.0.1').scrape_batch(urls, max_workers=4, per_host_limit=2)
+
+    assert [result['url'] for result in batch['results']] == urls
+    assert [result['success'] for result in batch['results']] == [True, False, False, True]
+    assert batch['results'][0]['data']['name'] == 'LED lučka'
+    assert (batch['succeeded'], batch['failed']) == (2, 2)
+    assert '/izdelek/manjka/' in http_server.requests and len(http_server.requests) == 3
+
+
+def test_batch_endpoint(api, http_server, monkeypatch):
+    http_server.routes.update(shop_routes(http_server.url))
+    monkeypatch.setattr(api, 'scraper', VigoShopScraper(allowed_domain='127.0.0.1'))
+    client = api.app.test_client()
+
+    response = client.post('/scrape/batch', json={'urls': [f'{http_server.url}/izdelek/lucka/']})
+    assert response.status_code == 200
+    assert response.get_json()['data']['succeeded'] == 1
+
+    assert client.post('/scrape/batch', json={'urls': 'not a list'}).status_code == 400
+    assert client.post('/scrape/batch', json={'urls': ['x'] * (api.MAX_BATCH_URLS + 1)}).status_code == 400
@@ -0,0 +1,141 @@
+import re
+
+import pytest
+
+from fixture_shop import HTML
+from scraper import ProductPage, VigoShopScraper
+
+
+@pytest.fixture
+def fail_on_reparse(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("page was parsed a second time")
+
+    monkeypatch.setattr(ProductPage, 'from_bytes', fail)
+
+
+def serve_product(http_server, content: bytes) -> str:
+    http_server.routes['/p/gun'] = (200, HTML, content)
+    return f'{http_server.url}/p/gun'
+
+
+def test_streamed_page_is_handed_to_the_extractors(http_server, page_bytes, fail_on_reparse):
+    url = serve_product(http_server, page_bytes(json_ld=False))
+    scraper = VigoShopScraper(stream=True, chunk_size=256, allowed_domain='127.0.0.1')
+
+    product = scraper.scrape_product(url)
+
+    assert product['name'] == 'Masažna pištola Pro'
+    assert product['price'] == '39,99€'
+    assert product['image_url'] == 'https://vigoshop.si/img/gun.jpg'
+
+
+def test_streaming_stops_after_the_product(http_server, page_bytes):
+    url = serve_product(http_server, page_bytes(json_ld=False, padding=500_000))
+    scraper = VigoShopScraper(stream=True, chunk_size=1024, allowed_domain='127.0.0.1')
+
+    response, _ = scraper._fetch(url)
+    content, page = scraper._read_body(response)
+
+    assert page is not None
+    assert len(content) < 10_000
+
+
+def test_scrape_without_streaming(http_server, page_bytes):
+    url = serve_product(http_server, page_bytes(json_ld=False))
+    product = VigoShopScraper(allowed_domain='127.0.0.1').scrape_product(url)
+
+    assert product['name'] == 'Masažna pištola Pro'
+    assert product['category'] == 'Zdravje'
+
+
+def test_rejects_urls_outside_the_allowed_domain():
+    with pytest.raises(Exception, match='must be from vigoshop.si'):
+        VigoShopScraper().scrape_product('https://example.com/p/gun')
+
+
+def test_unchanged_page_is_revalidated_with_a_conditional_get(http_server, page_bytes):
+    http_server.routes['/p/gun'] = (200, dict(HTML, ETag='"v1"'), page_bytes())
+    scraper = VigoShopScraper(allowed_domain='127.0.0.1')
+    url = f'{http_server.url}/p/gun'
+
+    first = scraper.scrape_product(url)
+    # Same ETag: the server answers 304 and the stored product is reused
+    http_server.routes['/p/gun'] = (200, dict(HTML, ETag='"v1"'), page_bytes(price='29,99'))
+    assert scraper.scrape_product(url) == first
+
+    http_server.routes['/p/gun'] = (200, dict(HTML, ETag='"v2"'), page_bytes(price='29,99'))
+    assert scraper.scrape_product(url)['price'] == '29,99€'
+    assert len(http_server.requests) == 3
+
+
+def baseline_product(url: str, content: bytes) -> dict:
+    """The product dict of the original BeautifulSoup scraper (reference for the XPath extractors)"""
+    bs4 = pytest.importorskip('bs4')
+    soup = bs4.BeautifulSoup(content, 'lxml')
+
+    def first_text(selectors, default):
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element and element.get_text(strip=True):
+                return element.get_text(strip=True)
+        return default
+
+    price = 'Price not found'
+    for selector in ['.woocommerce-Price-amount.amount', 'span.price ins .woocommerce-Price-amount',
+                     'span.price .woocommerce-Price-amount', '.price']:
+        element = soup.select_one(selector)
+        match = element and re.search(r'[\d,\.]+\s*€', element.get_text(strip=True))
+        if match:
+            price = match.group(0)
+            break
+
+    image_url = None
+    for selector in ['.woocommerce-product-gallery__image img', '.product-image img',
+                     'figure.woocommerce-product-gallery__wrapper img', '.product-images img']:
+        img = soup.select_one(selector)
+        urls = [img.get(attr) for attr in ['data-src', 'src', 'data-lazy-src']] if img else []
+        urls = [value for value in urls if value and value.startswith('http')]
+        if urls:
+            image_url = urls[0]
+            break
+
+    features = []
+    for selector in ['.woocommerce-product-details__short-description', '.product-short-description',
+                     '.entry-summary .woocommerce-product-details__short-description', '#tab-description']:
+        section = soup.select_one(selector)
+        if section:
+            items = section.find_all('li')
+            if items:
+                features.extend(li.get_text(strip=True) for li in items[:5])
+            else:
+                texts = [p.get_text(strip=True) for p in section.find_all('p')[:3]]
+                features.extend(text for text in texts if text and len(text) > 10)
+
+    breadcrumbs = soup.select('.woocommerce-breadcrumb a')
+    return {
+        'url': url,
+        'name': first_text(['h1.product_title', 'h1.entry-title', '.product-title', 'h1'], 'Unknown Product'),
+        'price': price,
+        'image_url': image_url,
+        'features': ' | '.join(features) if features else 'No features available',
+        'description': first_text(
+            ['.woocommerce-product-details__short-description', '#tab-description', '.product-description'],
+            'No description available'
+        )[:500],
+        'category': breadcrumbs[-1].get_text(strip=True) if len(breadcrumbs) > 1 else 'General'
+    }
+
+
+@pytest.mark.parametrize('padding, markup', [
+    (0, ('', '')),
+    (5000, ('', '')),
+    # Inline markup and comments inside the extracted text
+    (0, ('<li>Tiho delovanje</li>', '<li>Tiho <b>delo</b>vanje <!-- note --> </li>'))
+])
+def test_xpath_extraction_matches_the_beautifulsoup_scraper(page_bytes, padding, markup):
+    content = page_bytes(json_ld=False, padding=padding).replace(*(part.encode() for part in markup))
+
+    product = VigoShopScraper()._parse_product('https://vigoshop.si/p/gun', content, 'text/html; charset=utf-8')
+
+    assert product == baseline_product('https://vigoshop.si/p/gun', content)
@@ -0,0 +1,93 @@
+from scraper import FEATURE_SELECTORS, ProductPage, VigoShopScraper
+from selector_stats import SelectorStats
+
+
+def test_order_follows_hit_rate():
+    stats = SelectorStats()
+    for _ in range(5):
+        stats.record('name', 'h1.product_title', False)
+        stats.record('name', 'h1.entry-title', True)
+
+    assert stats.order('name', ['h1.product_title', 'h1.entry-title', 'h1']) == ['h1.entry-title', 'h1', 'h1.product_title']
+
+
+def test_old_hits_decay():
+    stats = SelectorStats(window=100)
+    for _ in range(1000):
+        stats.record('name', 'h1.product_title', True)
+    # The markup changed: the old selector stops matching
+    for _ in range(60):
+        stats.record('name', 'h1.product_title', False)
+        stats.record('name', 'h1.entry-title', True)
+
+    assert stats.order('name', ['h1.product_title', 'h1.entry-title'])[0] == 'h1.entry-title'
+    assert stats.snapshot()['name']['selectors'][0]['attempts'] < 100
+
+
+def test_processes_sharing_the_file_merge_their_counts(tmp_path):
+    path = str(tmp_path / 'stats.json')
+    first = SelectorStats(path, save_every=10**6)
+    second = SelectorStats(path, save_every=10**6)
+    for _ in range(3):
+        first.record('price', '.price', True)
+    for _ in range(4):
+        second.record('price', '.price', False)
+
+    first.save()
+    second.save()
+    first.save()
+
+    for stats in (first, second, SelectorStats(path)):
+        selector = stats.snapshot()['price']['selectors'][0]
+        assert (selector['attempts'], selector['hits']) == (7, 3)
+
+
+def test_idle_stats_write_no_file(tmp_path):
+    path = tmp_path / 'stats.json'
+    SelectorStats(str(path)).save()
+    assert not path.exists()
+
+
+def test_learned_order_does_not_change_extracted_values(page_bytes):
+    # A promo banner before the product: the generic fallbacks match it first
+    page = page_bytes(json_ld=False).replace(
+        b'<body>', '<body><h1>Akcija tedna</h1><span class="price">5,00€</span>'.encode('utf-8')
+    )
+    stats = SelectorStats()
+    for _ in range(50):
+        stats.record('name', 'h1', True)
+        stats.record('name', 'h1.product_title', False)
+        stats.record('price', '.price', True)
+        stats.record('price', '.woocommerce-Price-amount.amount', False)
+        stats.record('description', '#tab-description', True)
+        stats.record('description', FEATURE_SELECTORS[0], False)
+
+    learned = VigoShopScraper(selector_stats=stats)._parse_product('https://vigoshop.si/p/gun', page)
+
+    assert learned == VigoShopScraper()._parse_product('https://vigoshop.si/p/gun', page)
+    assert (learned['name'], learned['price']) == ('Masažna pištola Pro', '39,99€')
+    assert learned['description'].startswith('6 nastavljivih hitrosti')
+
+
+def test_learned_order_does_not_reorder_features(page_bytes):
+    stats = SelectorStats()
+    for _ in range(20):
+        stats.record('features', '#tab-description', True)
+        stats.record('features', FEATURE_SELECTORS[0], False)
+    page = ProductPage.from_bytes(page_bytes())
+
+    features = VigoShopScraper(selector_stats=stats)._extract_features(page)
+
+    assert features == VigoShopScraper()._extract_features(page)
+    assert features.startswith('6 nastavljivih hitrosti')
+
+
+def test_stop_selectors_follow_the_learned_order():
+    stats = SelectorStats()
+    for _ in range(20):
+        stats.record('name', 'h1.product_title', False)
+        stats.record('name', 'h1.entry-title', True)
+
+    assert 'h1.product_title' in VigoShopScraper()._stop_selectors()
+    stop = VigoShopScraper(selector_stats=stats)._stop_selectors()
+    assert 'h1.entry-title' in stop and 'h1.product_title' not in stop
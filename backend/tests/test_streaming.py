@@ -0,0 +1,41 @@
+from copy_generator import CopyGenerator
+from resilience import CircuitBreaker
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_stream_yields_every_variant_then_done(claude):
+    events = list(CopyGenerator().stream_ad_copy('Lamp', '9,99€', 'Bright', 'SI', 'Conversion', max_chars=300))
+
+    assert [kind for kind, _ in events] == ['variant', 'variant', 'variant', 'done']
+    assert [data['key'] for _, data in events[:3]] == ['variant_1', 'variant_2', 'variant_3']
+    meta = events[-1][1]
+    assert meta['fallback'] is False and 'first_variant_ms' in meta
+    assert claude.calls[0]['stream'] is True
+
+
+def test_disconnect_mid_stream_releases_the_breaker_probe(claude):
+    claude.stream_delay = 0.01
+    breaker = half_open_breaker()
+    stream = CopyGenerator(breaker=breaker).stream_ad_copy('Lamp', '9,99€', 'Bright', 'SI', 'Conversion')
+
+    kind, _ = next(stream)
+    assert kind == 'variant'
+    stream.close()  # what Flask does when the SSE client disconnects
+
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+
+
+def test_stream_failure_falls_back_to_the_template(claude):
+    claude.failures = [529]
+    breaker = half_open_breaker()
+    events = list(CopyGenerator(breaker=breaker).stream_ad_copy('Lamp', '9,99€', 'Bright', 'SI', 'Conversion'))
+
+    assert len([kind for kind, _ in events if kind == 'variant']) == 3
+    assert events[-1][1]['fallback'] is True
+    assert breaker.stats()['times_opened'] == 2
@@ -0,0 +1,25 @@
+from scraper import VigoShopScraper
+from structured_data import extract_structured_data
+
+
+def test_structured_page_has_structured_fields(page_bytes):
+    fields = extract_structured_data(page_bytes())
+
+    assert fields['name'] == ('Masažna pištola Pro', 'json_ld')
+    assert fields['price'] == ('39,99€', 'json_ld')
+    assert fields['image_url'] == ('https://vigoshop.si/img/gun.jpg', 'json_ld')
+    assert fields['description'] == ('Sprostite mišice v 5 minutah .', 'json_ld')
+    assert fields['category'] == ('Zdravje', 'json_ld')
+    assert 'features' not in fields
+
+
+def test_page_without_structured_data_has_no_fields(page_bytes):
+    assert extract_structured_data(page_bytes(json_ld=False)) == {}
+
+
+def test_features_come_from_the_dom(page_bytes):
+    product, sources = VigoShopScraper()._extract_fields('https://vigoshop.si/p/gun', page_bytes(), 'text/html; charset=utf-8')
+
+    assert (sources['name'], sources['features']) == ('json_ld', 'dom')
+    assert 'field_sources' not in product
+    assert product['features'].startswith('6 nastavljivih hitrosti | Tiho delovanje | Baterija za 6 ur')
@@ -0,0 +1,32 @@
+import pytest
+
+from templates import OBJECTIVES, TEMPLATES, render_template_copy
+
+
+def rendered_length(variant) -> int:
+    return len(f"{variant['hook']}\n\n{variant['body']}\n\n{variant['cta']}")
+
+
+@pytest.mark.parametrize('market', sorted(TEMPLATES))
+@pytest.mark.parametrize('objective', OBJECTIVES)
+def test_character_count_never_exceeds_max_chars(market, objective):
+    for max_chars in range(4, 200):
+        variants = render_template_copy('Masažna pištola Pro', '39,99€', 'Tiho delovanje', market, objective, max_chars)
+        for variant in variants.values():
+            assert variant['character_count'] == rendered_length(variant)
+            assert variant['character_count'] <= max_chars, (max_chars, variant)
+
+
+def test_body_lines_go_before_the_hook_and_cta():
+    variant = render_template_copy('Lamp', '9,99€', 'Bright', 'EN', 'Conversion', 120)['variant_1']
+
+    assert variant['hook'] == TEMPLATES['EN']['pain_point']['hook']
+    assert variant['cta'] == TEMPLATES['EN']['cta']['Conversion']
+    assert 'money-back' not in variant['body']
+
+
+def test_tiny_limit_keeps_what_fits():
+    variant = render_template_copy('Lamp', '9,99€', 'Bright', 'EN', 'Awareness', 16)['variant_1']
+
+    assert (variant['hook'], variant['body']) == ('', '')
+    assert variant['cta'] == 'Learn More 👉'